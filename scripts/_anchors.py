@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+"""
+Corpus-wide heading anchor index for the markdown fixer.
+
+Every markdown file's GitHub-style heading anchors and outgoing relative
+links are recorded in an ``AnchorIndex`` persisted under .cache/scripts.
+Entries are reused while a file's mtime and size are unchanged, so checking
+a link is one dictionary lookup plus (for files not seen this run) one stat.
+When the fixer renames headings (MD024 appends " (2)"), ``rename_map`` works
+out which anchors moved and ``rewrite_links`` updates the references to them.
+"""
+
+import json
+import os
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+from urllib.parse import unquote
+
+from _discovery import CACHE_DIR, REPO_ROOT
+from _writeback import write_text_atomic
+
+
+INDEX_VERSION = 1
+
+_FENCE = re.compile(r"^ {0,3}(```|~~~)")
+_ATX = re.compile(r"^ {0,3}#{1,6}(?:[ \t]+(.*?))?(?:[ \t]+#+)?[ \t]*$")
+_SETEXT = re.compile(r"^ {0,3}(?:=+|-+)[ \t]*$")
+_HTML_ANCHOR = re.compile(r"""<a\s[^>]*\b(?:name|id)=["']([^"']+)["']""", re.IGNORECASE)
+_LINK = re.compile(r"(?<!!)\[(?:[^\[\]]|\[[^\]]*\])*\]\(\s*<?([^()\s<>]*(?:\([^()\s]*\)[^()\s<>]*)*)>?(?:\s+[\"'][^\"']*[\"'])?\s*\)")
+_INLINE_CODE = re.compile(r"`+[^`]*`+")
+_SCHEME = re.compile(r"^[a-zA-Z][a-zA-Z0-9+.-]*:")
+_MARKUP = [
+    (re.compile(r"!?\[([^\]]*)\]\([^)]*\)"), r"\1"),    # links and images keep their text
+    (re.compile(r"<[^>]+>"), ""),                        # inline HTML
+    (re.compile(r"`"), ""),
+    (re.compile(r"(?<!\w)[*_]{1,3}(?=\S)|(?<=\S)[*_]{1,3}(?!\w)"), ""),  # emphasis markers
+]
+_SLUG_DROP = re.compile(r"[^\w\- ]")
+
+
+def slugify(text: str) -> str:
+    """GitHub's anchor slug for rendered heading text (before de-duplication)."""
+    for pattern, repl in _MARKUP:
+        text = pattern.sub(repl, text)
+    return _SLUG_DROP.sub("", text.strip().lower()).replace(" ", "-")
+
+
+def heading_texts(content: str) -> List[Tuple[int, str]]:
+    """Return (line number, text) for ATX and setext headings outside code fences."""
+    headings = []
+    fence = None
+    previous = ""
+    for number, line in enumerate(content.split("\n"), 1):
+        opened = _FENCE.match(line)
+        if fence:
+            if opened and opened.group(1) == fence:
+                fence = None
+            previous = ""
+            continue
+        if opened:
+            fence = opened.group(1)
+            previous = ""
+            continue
+        atx = _ATX.match(line)
+        if atx:
+            headings.append((number, atx.group(1) or ""))
+            previous = ""
+            continue
+        if _SETEXT.match(line) and previous.strip() and not previous.lstrip().startswith(("-", "*", "+", ">")):
+            headings.append((number - 1, previous.strip()))
+            previous = ""
+            continue
+        previous = line
+    return headings
+
+
+def anchors(content: str) -> List[str]:
+    """Return the document's anchors in order, de-duplicated the way GitHub does."""
+    seen: Dict[str, int] = {}
+    result = []
+    for _, text in heading_texts(content):
+        base = slug = slugify(text)
+        while slug in seen:
+            seen[base] += 1
+            slug = f"{base}-{seen[base]}"
+        seen[slug] = 0
+        result.append(slug)
+    result.extend(match.group(1).lower() for match in _HTML_ANCHOR.finditer(content))
+    return result
+
+
+@dataclass(frozen=True)
+class Link:
+    """A relative link found in a markdown file."""
+
+    line: int
+    target: str          # Root-relative path ("" for same-file anchors)
+    anchor: Optional[str]
+    raw: str
+
+
+def links(content: str, rel_path: str) -> List[Link]:
+    """Extract relative links (with their root-relative targets) outside code."""
+    found = []
+    base = os.path.dirname(rel_path)
+    fence = None
+    for number, line in enumerate(content.split("\n"), 1):
+        opened = _FENCE.match(line)
+        if fence or opened:
+            if fence and opened and opened.group(1) == fence:
+                fence = None
+            elif not fence:
+                fence = opened.group(1)
+            continue
+        if "](" not in line:
+            continue
+        for match in _LINK.finditer(_INLINE_CODE.sub(lambda m: " " * len(m.group(0)), line)):
+            raw = match.group(1)
+            if not raw or _SCHEME.match(raw) or raw.startswith("//"):
+                continue
+            path, _, anchor = raw.partition("#")
+            path = unquote(path)
+            if path:
+                joined = path.lstrip("/") if path.startswith("/") else os.path.join(base, path)
+                target = os.path.normpath(joined).replace(os.sep, "/")
+            else:
+                target = ""
+            found.append(Link(number, target, unquote(anchor).lower() if anchor else None, raw))
+    return found
+
+
+def rename_map(before: str, after: str) -> Dict[str, str]:
+    """Map anchors that changed between two versions of a document.
+
+    Headings are paired by position, so this only applies when the fixer kept
+    the same number of headings (it renames, never adds or removes them).
+    """
+    old, new = heading_texts(before), heading_texts(after)
+    if len(old) != len(new):
+        return {}
+    old_anchors, new_anchors = anchors(before)[:len(old)], anchors(after)[:len(new)]
+    return {o: n for o, n in zip(old_anchors, new_anchors) if o != n}
+
+
+def rewrite_links(content: str, rel_path: str, target: str, mapping: Dict[str, str]) -> str:
+    """Point links from ``rel_path`` at renamed anchors of ``target`` to the new anchors."""
+    if not mapping:
+        return content
+    lines = content.split("\n")
+    changed = False
+    for link in links(content, rel_path):
+        if link.anchor not in mapping or (link.target or rel_path) != target:
+            continue
+        path, _, anchor = link.raw.partition("#")
+        replacement = f"{path}#{mapping[link.anchor]}"
+        line = lines[link.line - 1]
+        updated = line.replace(f"({link.raw})", f"({replacement})").replace(f"(<{link.raw}>)", f"(<{replacement}>)")
+        if updated != line:
+            lines[link.line - 1] = updated
+            changed = True
+    return "\n".join(lines) if changed else content
+
+
+@dataclass
+class BrokenLink:
+    source: str
+    line: int
+    raw: str
+    reason: str
+
+
+class AnchorIndex:
+    """Persisted anchors and links of every markdown file seen, keyed by stat."""
+
+    def __init__(self, root: Path = REPO_ROOT, path: Path = CACHE_DIR / "markdown-anchors.json"):
+        self.root = Path(root).resolve()
+        self.path = path
+        self.entries: Dict[str, dict] = {}
+        self._anchor_sets: Dict[str, Set[str]] = {}
+        self._pending: Set[str] = set()
+        self.dirty = False
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            if data.get("version") == INDEX_VERSION and data.get("root") == str(self.root):
+                self.entries = data.get("files", {})
+        except (OSError, ValueError):
+            pass
+
+    def relative(self, path: Path) -> str:
+        return os.path.relpath(Path(path).resolve(), self.root).replace(os.sep, "/")
+
+    def record(self, rel_path: str, content: str) -> None:
+        """Index content about to be written; its stat is taken on ``save``."""
+        self.entries[rel_path] = {
+            "stat": None,
+            "anchors": anchors(content),
+            "links": [[link.line, link.target, link.anchor, link.raw] for link in links(content, rel_path)],
+        }
+        self._anchor_sets.pop(rel_path, None)
+        self._pending.add(rel_path)
+        self.dirty = True
+
+    def entry(self, rel_path: str) -> Optional[dict]:
+        """Return a fresh entry, re-parsing the file only if its stat changed."""
+        entry = self.entries.get(rel_path)
+        if rel_path in self._pending:
+            return entry
+        try:
+            st = os.stat(self.root / rel_path)
+        except OSError:
+            return None
+        if entry is not None and entry["stat"] == [st.st_mtime_ns, st.st_size]:
+            return entry
+        try:
+            content = (self.root / rel_path).read_text(encoding="utf-8")
+        except (OSError, UnicodeDecodeError):
+            return None
+        self.record(rel_path, content)
+        self._pending.discard(rel_path)
+        entry = self.entries[rel_path]
+        entry["stat"] = [st.st_mtime_ns, st.st_size]
+        return entry
+
+    def anchor_set(self, rel_path: str) -> Optional[Set[str]]:
+        entry = self.entry(rel_path)
+        if entry is None:
+            return None
+        cached = self._anchor_sets.get(rel_path)
+        if cached is None:
+            cached = self._anchor_sets[rel_path] = set(entry["anchors"])
+        return cached
+
+    def linked_from(self, target: str) -> List[str]:
+        """Indexed files with an anchor link into ``target`` (including itself)."""
+        sources = []
+        for source in list(self.entries):
+            entry = self.entry(source)
+            if entry and any((link[1] or source) == target and link[2] for link in entry["links"]):
+                sources.append(source)
+        return sources
+
+    def validate(self, sources: Iterable[str]) -> List[BrokenLink]:
+        """Check every relative link of the given files against the index."""
+        broken = []
+        for source in sources:
+            entry = self.entry(source)
+            if entry is None:
+                continue
+            for line, target, anchor, raw in entry["links"]:
+                target = target or source
+                if target.endswith(".md"):
+                    known = self.anchor_set(target)
+                    if known is None:
+                        broken.append(BrokenLink(source, line, raw, "file not found"))
+                    elif anchor and anchor not in known:
+                        broken.append(BrokenLink(source, line, raw, f"no heading for #{anchor}"))
+                elif not (self.root / target).exists():
+                    broken.append(BrokenLink(source, line, raw, "file not found"))
+        return broken
+
+    def forget_pending(self) -> None:
+        """Drop entries recorded for content that was never written (dry runs)."""
+        for rel_path in self._pending:
+            self.entries.pop(rel_path, None)
+            self._anchor_sets.pop(rel_path, None)
+        self._pending.clear()
+
+    def save(self) -> None:
+        """Stat files recorded this run, then write the index if it changed."""
+        for rel_path in self._pending:
+            try:
+                st = os.stat(self.root / rel_path)
+            except OSError:
+                self.entries.pop(rel_path, None)
+                continue
+            self.entries[rel_path]["stat"] = [st.st_mtime_ns, st.st_size]
+        self._pending.clear()
+        if not self.dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {"version": INDEX_VERSION, "root": str(self.root), "files": self.entries}
+        write_text_atomic(self.path, json.dumps(payload, separators=(",", ":")), durable=False)
+        self.dirty = False
+
+
+class LinkTracker:
+    """Fixer callback that indexes each file and remembers heading renames.
+
+    Pass an instance as ``UniversalMarkdownFixer.on_fixed``; after the pass,
+    ``rewrite_renamed`` updates links to renamed anchors and ``validate``
+    checks every link of the files seen.
+    """
+
+    def __init__(self, index: AnchorIndex):
+        self.index = index
+        self.sources: List[str] = []
+        self.renames: Dict[str, Dict[str, str]] = {}
+        self._content: Dict[str, str] = {}
+
+    def __call__(self, path: Path, original: str, fixed: str) -> None:
+        rel_path = self.index.relative(path)
+        self.index.record(rel_path, fixed)
+        self.sources.append(rel_path)
+        if fixed != original:
+            self._content[rel_path] = fixed
+            mapping = rename_map(original, fixed)
+            if mapping:
+                self.renames[rel_path] = mapping
+
+    def rewrite_renamed(self, stage: Callable[[Path, str], None]) -> List[Tuple[str, int]]:
+        """Rewrite links to renamed anchors, staging each updated file once more."""
+        rewritten = []
+        for target, mapping in self.renames.items():
+            for source in self.index.linked_from(target):
+                content = self._content.get(source)
+                if content is None:
+                    try:
+                        content = (self.index.root / source).read_text(encoding="utf-8")
+                    except (OSError, UnicodeDecodeError):
+                        continue
+                updated = rewrite_links(content, source, target, mapping)
+                if updated != content:
+                    self._content[source] = updated
+                    self.index.record(source, updated)
+                    stage(self.index.root / source, updated)
+                    rewritten.append((source, len(mapping)))
+        return rewritten
+
+    def validate(self) -> List[BrokenLink]:
+        return self.index.validate(dict.fromkeys(self.sources))
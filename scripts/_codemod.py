@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Shared codemod building blocks for the scripts/fix-*.py rule sets.
+
+Each fix script declares a module-level ``RULE_SET``: a named, ordered mapping
+of target files to the rules that apply to them. A rule is a pure
+``str -> str`` transform, so rule sets can be combined in memory by
+``scripts/codemod.py`` and still run standalone through each script's main().
+Either way a file is only written once ``fix_verified`` shows that a second
+pass of its rules changes nothing.
+"""
+
+import argparse
+import importlib.util
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from _discovery import REPO_ROOT, FileIndex, compile_globs, discover, fingerprint
+from _profiling import phase
+
+
+SCRIPTS_DIR = Path(__file__).parent
+
+
+@dataclass(frozen=True)
+class Rule:
+    """A single named text transform."""
+
+    name: str
+    apply: Callable[[str], str]
+
+
+@dataclass
+class RuleSet:
+    """Rules grouped by the repo-relative globs they target."""
+
+    name: str
+    order: int
+    targets: Dict[str, List[Rule]] = field(default_factory=dict)
+
+    def patterns(self) -> List[str]:
+        """Return the repo-relative globs this rule set targets."""
+        return list(self.targets)
+
+    def rules_for(self, rel_path: str) -> List[Rule]:
+        """Return the rules of every glob that matches a repo-relative path."""
+        rules = []
+        for pattern, pattern_rules in self.targets.items():
+            if _compile_glob(pattern).match(rel_path):
+                rules.extend(pattern_rules)
+        return rules
+
+
+@lru_cache(maxsize=None)
+def _compile_glob(pattern: str) -> "re.Pattern":
+    return compile_globs([pattern])
+
+
+def sub_rule(name: str, pattern: str, repl: str, count: int = 0,
+             unless: Optional[str] = None) -> Rule:
+    """Build a regex substitution rule.
+
+    If ``unless`` is given, the rule is skipped when that literal text is
+    already present in the content.
+    """
+    compiled = re.compile(pattern)
+
+    def apply(content: str) -> str:
+        if unless is not None and unless in content:
+            return content
+        return compiled.sub(repl, content, count=count)
+
+    return Rule(name, apply)
+
+
+def apply_rules(rules: List[Rule], content: str) -> Tuple[str, List[str]]:
+    """Apply rules in order, returning the new content and the rules that fired."""
+    fired = []
+    for rule in rules:
+        updated = rule.apply(content)
+        if updated != content:
+            fired.append(rule.name)
+            content = updated
+    return content, fired
+
+
+def fix_verified(rules: List[Rule], content: str) -> Tuple[str, List[str], List[str]]:
+    """Apply rules, then apply them again to their own output in memory.
+
+    Returns (new content, rules that fired, rules that fired again on the
+    second pass). The content may only be written when the last list is
+    empty: otherwise the rules are not a fixpoint for this file.
+    """
+    fixed, fired = apply_rules(rules, content)
+    _, unstable = apply_rules(rules, fixed)
+    return fixed, fired, unstable
+
+
+def report_unstable(path: str, unstable: Iterable[Tuple[str, str]]) -> None:
+    """Print the (rule set, rule) pairs that kept a file from being written."""
+    print(f"❌ Not a fixpoint, skipping write: {path}")
+    for name, rule in unstable:
+        print(f"     {name}: {rule}")
+
+
+def load_rule_set(script_path: Path) -> RuleSet:
+    """Import a fix script by path and return its ``RULE_SET``."""
+    module_name = script_path.stem.replace('-', '_')
+    spec = importlib.util.spec_from_file_location(module_name, script_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.RULE_SET
+
+
+def discover_targets(rule_sets: Iterable[RuleSet],
+                     globs: Optional[List[str]] = None) -> List[str]:
+    """Find the files targeted by the rule sets, optionally narrowed by globs."""
+    patterns = [pattern for rule_set in rule_sets for pattern in rule_set.patterns()]
+    with phase("discovery"):
+        files = discover(patterns)
+        if globs:
+            restrict = compile_globs(globs)
+            files = [rel_path for rel_path in files if restrict.match(rel_path)]
+    return files
+
+
+def rules_fingerprint(script_names: Iterable[str]) -> str:
+    """Digest the rule-set scripts (and this module) for index invalidation."""
+    paths = [SCRIPTS_DIR / name for name in sorted(script_names)]
+    return fingerprint(paths + [Path(__file__)])
+
+
+def add_target_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the shared GLOB / --no-cache arguments to a fix script's CLI."""
+    parser.add_argument("globs", nargs="*", metavar="GLOB",
+                        help="Restrict the run to files matching these repo-relative globs")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Process every target, ignoring the clean-file index")
+
+
+def open_index(rule_set: RuleSet, script: Path, enabled: bool = True) -> Optional[FileIndex]:
+    """Return the clean-file index for a standalone fix script, if enabled."""
+    if not enabled:
+        return None
+    return FileIndex(rule_set.name, rules_fingerprint([Path(script).name]))
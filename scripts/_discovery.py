@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+File discovery helpers shared by the scripts/ tools.
+
+Provides glob matching with ``**`` support, gitignore-style ignore rules
+(applied while walking so ignored subtrees are pruned), and a persisted
+``FileIndex`` that lets a tool skip files it already processed clean with
+a single stat per file.
+"""
+
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from _writeback import write_text_atomic
+
+
+REPO_ROOT = Path(__file__).parent.parent
+CACHE_DIR = REPO_ROOT / ".cache" / "scripts"
+
+# Never worth descending into, whatever the ignore files say
+ALWAYS_PRUNED = {".git", "node_modules"}
+
+
+def glob_to_regex(pattern: str) -> str:
+    """Translate a path glob into a regex source string.
+
+    ``**`` matches any number of path segments, ``*`` and ``?`` stay within
+    one segment, and ``[...]`` classes are passed through.
+    """
+    out = []
+    i = 0
+    while i < len(pattern):
+        c = pattern[i]
+        if pattern.startswith("**/", i):
+            out.append("(?:.*/)?")
+            i += 3
+            continue
+        if pattern.startswith("**", i):
+            out.append(".*")
+            i += 2
+            continue
+        if c == "*":
+            out.append("[^/]*")
+        elif c == "?":
+            out.append("[^/]")
+        elif c == "[":
+            end = pattern.find("]", i + 1)
+            if end == -1:
+                out.append(re.escape(c))
+            else:
+                body = pattern[i + 1:end]
+                if body.startswith("!"):
+                    body = "^" + body[1:]
+                out.append(f"[{body}]")
+                i = end
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return "".join(out)
+
+
+def compile_globs(patterns: Iterable[str]) -> "re.Pattern":
+    """Compile several repo-relative globs into one anchored regex."""
+    sources = [glob_to_regex(pattern.lstrip("/")) for pattern in patterns]
+    if not sources:
+        return re.compile(r"(?!)")
+    return re.compile("(?:" + "|".join(sources) + r")\Z")
+
+
+def glob_root(pattern: str) -> str:
+    """Return the literal leading directory of a glob (where a walk can start)."""
+    parts = []
+    for part in pattern.lstrip("/").split("/")[:-1]:
+        if any(ch in part for ch in "*?["):
+            break
+        parts.append(part)
+    return "/".join(parts)
+
+
+class IgnoreRules:
+    """Compiled gitignore-style rules read from one ignore file."""
+
+    def __init__(self, lines: Iterable[str], base: str = ""):
+        self.base = base.strip("/")
+        self.rules: List[Tuple["re.Pattern", bool, bool]] = []
+        for raw in lines:
+            line = raw.rstrip("\n")
+            if not line.strip() or line.startswith("#"):
+                continue
+            line = line.rstrip()
+            negate = line.startswith("!")
+            if negate:
+                line = line[1:]
+            if line.startswith("\\"):
+                line = line[1:]
+            dir_only = line.endswith("/")
+            line = line.rstrip("/")
+            anchored = "/" in line
+            source = glob_to_regex(line.lstrip("/"))
+            if not anchored:
+                source = "(?:.*/)?" + source
+            self.rules.append((re.compile(source + r"\Z"), negate, dir_only))
+
+    @classmethod
+    def from_file(cls, path: Path, base: str = "") -> Optional["IgnoreRules"]:
+        """Load rules from an ignore file, or return None if it does not exist."""
+        try:
+            text = path.read_text(encoding="utf-8")
+        except OSError:
+            return None
+        return cls(text.splitlines(), base)
+
+    def match(self, rel_path: str, is_dir: bool) -> Optional[bool]:
+        """Return True/False if a rule decides the path, None if none applies."""
+        if self.base:
+            if not rel_path.startswith(self.base + "/"):
+                return None
+            rel_path = rel_path[len(self.base) + 1:]
+        decision = None
+        for regex, negate, dir_only in self.rules:
+            if dir_only and not is_dir:
+                continue
+            if regex.match(rel_path):
+                decision = not negate
+        return decision
+
+
+def is_ignored(rel_path: str, is_dir: bool, rules: List[IgnoreRules]) -> bool:
+    """Apply ignore rules outermost first; the last deciding rule wins."""
+    ignored = False
+    for rule_set in rules:
+        decision = rule_set.match(rel_path, is_dir)
+        if decision is not None:
+            ignored = decision
+    return ignored
+
+
+def walk(root: Path = REPO_ROOT, start: str = "",
+         ignore_files: Iterable[str] = (".gitignore",),
+         extra_rules: Iterable[IgnoreRules] = ()) -> Iterable[str]:
+    """Yield repo-relative file paths under ``start``, pruning ignored subtrees.
+
+    Ignore files found along the way apply to their own directory and below,
+    exactly like nested .gitignore files.
+    """
+    ignore_files = list(ignore_files)
+    rules = list(extra_rules)
+    for name in ignore_files:
+        loaded = IgnoreRules.from_file(root / name)
+        if loaded:
+            rules.append(loaded)
+    # Directories between the root and the start can carry their own ignore files
+    parts = [p for p in start.strip("/").split("/") if p]
+    for depth in range(1, len(parts)):
+        base = "/".join(parts[:depth])
+        for name in ignore_files:
+            loaded = IgnoreRules.from_file(root / base / name, base)
+            if loaded:
+                rules.append(loaded)
+
+    start_dir = root / start if start else root
+    if not start_dir.is_dir():
+        return
+    scoped: Dict[str, List[IgnoreRules]] = {start.strip("/"): rules}
+    for dirpath, dirnames, filenames in os.walk(start_dir):
+        rel_dir = os.path.relpath(dirpath, root).replace(os.sep, "/")
+        rel_dir = "" if rel_dir == "." else rel_dir
+        active = scoped.pop(rel_dir, rules)
+        for name in ignore_files:
+            if name in filenames:
+                loaded = IgnoreRules.from_file(Path(dirpath) / name, rel_dir)
+                if loaded:
+                    active = active + [loaded]
+        prefix = rel_dir + "/" if rel_dir else ""
+        kept = []
+        for dirname in dirnames:
+            rel = prefix + dirname
+            if dirname in ALWAYS_PRUNED or is_ignored(rel, True, active):
+                continue
+            kept.append(dirname)
+            scoped[rel] = active
+        dirnames[:] = sorted(kept)
+        for filename in sorted(filenames):
+            rel = prefix + filename
+            if not is_ignored(rel, False, active):
+                yield rel
+
+
+def discover(patterns: Iterable[str], root: Path = REPO_ROOT) -> List[str]:
+    """Return the sorted repo-relative files matching any of the globs.
+
+    Each distinct literal prefix is walked once, honouring .gitignore.
+    """
+    patterns = list(patterns)
+    if not patterns:
+        return []
+    matcher = compile_globs(patterns)
+    roots = sorted({glob_root(pattern) for pattern in patterns})
+    # Drop roots nested inside another root so no directory is walked twice
+    starts = [r for r in roots
+              if not any(other != r and (other == "" or r.startswith(other + "/"))
+                         for other in roots)]
+    found = set()
+    for start in starts:
+        for rel_path in walk(root, start):
+            if matcher.match(rel_path):
+                found.add(rel_path)
+    return sorted(found)
+
+
+def content_hash(data: bytes) -> str:
+    """Return the short content digest stored in the index."""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def fingerprint(paths: Iterable[Path]) -> str:
+    """Digest the given source files so rule changes invalidate an index."""
+    digest = hashlib.blake2b(digest_size=16)
+    for path in paths:
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+class FileIndex:
+    """Persisted record of files last processed clean by a tool.
+
+    A file is skipped when its mtime and size are unchanged (one stat). When
+    only the mtime moved, the content hash decides. The whole index is dropped
+    if the tool's rule fingerprint changes.
+    """
+
+    def __init__(self, name: str, rules_fingerprint: str, root: Path = REPO_ROOT):
+        self.root = root
+        self.path = CACHE_DIR / f"{name}-index.json"
+        self.fingerprint = rules_fingerprint
+        self.entries: Dict[str, List] = {}
+        self.dirty = False
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            if data.get("fingerprint") == rules_fingerprint:
+                self.entries = data.get("files", {})
+        except (OSError, ValueError):
+            pass
+
+    def is_clean(self, rel_path: str) -> bool:
+        """Return True if the file is unchanged since it was marked clean."""
+        entry = self.entries.get(rel_path)
+        if entry is None:
+            return False
+        try:
+            st = os.stat(self.root / rel_path)
+        except OSError:
+            return False
+        mtime_ns, size, digest = entry
+        if st.st_mtime_ns == mtime_ns and st.st_size == size:
+            return True
+        if st.st_size != size:
+            return False
+        if content_hash((self.root / rel_path).read_bytes()) != digest:
+            return False
+        self.entries[rel_path] = [st.st_mtime_ns, size, digest]
+        self.dirty = True
+        return True
+
+    def mark_clean(self, rel_path: str, data: Optional[bytes] = None) -> None:
+        """Record the file's current state as processed clean."""
+        full_path = self.root / rel_path
+        try:
+            st = os.stat(full_path)
+            if data is None:
+                data = full_path.read_bytes()
+        except OSError:
+            return
+        self.entries[rel_path] = [st.st_mtime_ns, st.st_size, content_hash(data)]
+        self.dirty = True
+
+    def forget(self, rel_path: str) -> None:
+        """Drop a file from the index so it is processed next time."""
+        if self.entries.pop(rel_path, None) is not None:
+            self.dirty = True
+
+    def save(self) -> None:
+        """Write the index back if anything changed."""
+        if not self.dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {"fingerprint": self.fingerprint, "files": self.entries}
+        write_text_atomic(self.path, json.dumps(payload, separators=(",", ":")), durable=False)
+        self.dirty = False
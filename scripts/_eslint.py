@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+"""
+ESLint ``--format json`` report handling for the unused-variable fixers.
+
+Instead of sweeping whole files with hand-copied name lists, the fixers can
+read an ESLint report and add the ``_`` prefix (see varsIgnorePattern /
+argsIgnorePattern in eslint.config.mjs) exactly at the reported positions.
+Edits are grouped per file and applied back to front in a single pass.
+"""
+
+import json
+import re
+import sys
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from _discovery import REPO_ROOT, compile_globs
+from _writeback import WriteBatch
+
+
+UNUSED_VAR_RULES = {"no-unused-vars", "@typescript-eslint/no-unused-vars"}
+
+_REPORTED_NAME = re.compile(r"'([^']+)'")
+_IDENTIFIER = re.compile(r"[\w$]+")
+# An unclosed `import ... {` before the identifier means it names an export
+_OPEN_IMPORT_BRACE = re.compile(r"\bimport\b[^;{}]*\{[^{}]*\Z")
+_AS_BEFORE = re.compile(r"\bas\s+\Z")
+_IMPORT_LOOKBACK = 2000
+# What may precede a brace that opens an object literal or pattern rather than a block
+_NOT_BLOCK_BEFORE = re.compile(r"(?:[(,=\[:?|&!]|\b(?:return|yield|await|typeof|in|of|case))\s*\Z")
+_PATTERN_AFTER = re.compile(r"\s*(?:=(?![=>])|:)")
+# A parenthesised head (parameters, for/catch clauses) followed by its body
+_HEAD_BODY = re.compile(r"\s*(?::[^{;=]*)?(?:=>)?\s*\{")
+_CONTROL_BEFORE = re.compile(r"\b(?:if|for|while|switch|catch|with)\s*\Z")
+_RETURN_TYPE = re.compile(r"\)\s*:[^{};=()]*\Z")
+_VAR_BEFORE = re.compile(r"\bvar\s+(?:[{\[][^;]*)?\Z")
+
+
+def load_report(source: str) -> List[dict]:
+    """Load an ESLint JSON report from a file path, or stdin when ``-``."""
+    if source == "-":
+        return json.load(sys.stdin)
+    with open(source, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def unused_var_messages(report: List[dict], root: Path = REPO_ROOT,
+                        globs: Optional[List[str]] = None) -> Dict[str, List[dict]]:
+    """Group no-unused-vars messages by repo-relative path."""
+    restrict = compile_globs(globs) if globs else None
+    grouped: Dict[str, List[dict]] = {}
+    for result in report:
+        messages = [m for m in result.get("messages", [])
+                    if m.get("ruleId") in UNUSED_VAR_RULES and m.get("line")]
+        if not messages:
+            continue
+        try:
+            rel_path = Path(result["filePath"]).resolve().relative_to(root.resolve()).as_posix()
+        except ValueError:
+            continue
+        if restrict and not restrict.match(rel_path):
+            continue
+        grouped.setdefault(rel_path, []).extend(messages)
+    return grouped
+
+
+def line_starts(content: str) -> List[int]:
+    """Return the offset at which each line begins."""
+    starts = [0]
+    index = content.find("\n")
+    while index != -1:
+        starts.append(index + 1)
+        index = content.find("\n", index + 1)
+    return starts
+
+
+def bracket_pairs(content: str) -> List[Tuple[int, int, str]]:
+    """(open offset, close offset, bracket) of every (), [] and {} pair in JS/TS source.
+
+    String literals, comments and template text are skipped; ``${`` opens a
+    template expression. Regex literals are not recognised, so a bracket
+    inside one can unbalance the scan; unmatched brackets are dropped.
+    """
+    pairs = []
+    stack: List[Tuple[int, str]] = []
+    closers = {")": "(", "]": "[", "}": "{"}
+    i = 0
+    n = len(content)
+    in_template = False
+    while i < n:
+        c = content[i]
+        if in_template:
+            if c == "\\":
+                i += 2
+                continue
+            if c == "`":
+                in_template = False
+            elif content.startswith("${", i):
+                stack.append((i + 1, "${"))
+                in_template = False
+                i += 2
+                continue
+            i += 1
+            continue
+        if c in "\"'":
+            i += 1
+            while i < n and content[i] not in (c, "\n"):
+                i += 2 if content[i] == "\\" else 1
+        elif c == "`":
+            in_template = True
+        elif content.startswith("//", i):
+            i = content.find("\n", i)
+            if i == -1:
+                break
+        elif content.startswith("/*", i):
+            i = content.find("*/", i + 2)
+            if i == -1:
+                break
+            i += 1
+        elif c in "([{":
+            stack.append((i, c))
+        elif c in closers and stack:
+            offset, opener = stack.pop()
+            if opener == "${":
+                in_template = True  # Back in the template's text
+            elif opener == closers[c]:
+                pairs.append((offset, i, opener))
+        i += 1
+    return pairs
+
+
+def _previous_code(content: str, offset: int) -> str:
+    return content[max(0, offset - 40):offset]
+
+
+def _is_block(content: str, open_at: int, close_at: int) -> bool:
+    """True unless the braces are an object literal or destructuring pattern."""
+    return not (_NOT_BLOCK_BEFORE.search(_previous_code(content, open_at)) or
+                _PATTERN_AFTER.match(content, close_at + 1))
+
+
+def _scope_of(content: str, pairs: List[Tuple[int, int, str]], start: int,
+              function_scope: bool = False) -> Tuple[int, int]:
+    """The (start, end) span of the block scope enclosing a binding at ``start``.
+
+    Object literals and destructuring patterns are stepped over; a binding
+    in a parameter list or ``for (...)`` head belongs to the body after it.
+    With ``function_scope`` (``var``), plain blocks are stepped over too.
+    Falls back to the whole file (module scope).
+    """
+    enclosing = sorted((pair for pair in pairs if pair[0] < start < pair[1]), reverse=True)
+    for open_at, close_at, bracket in enclosing:
+        before = _previous_code(content, open_at)
+        if bracket == "(":
+            body = _HEAD_BODY.match(content, close_at + 1)
+            if not body:
+                continue
+            if function_scope and _CONTROL_BEFORE.search(before):
+                continue
+            block = next((pair for pair in pairs if pair[0] == body.end() - 1), None)
+            if block is not None:
+                return open_at, block[1]
+        elif bracket == "{":
+            if not _is_block(content, open_at, close_at):
+                continue
+            if function_scope and not _is_function_body(content, pairs, open_at):
+                continue
+            return open_at, close_at
+    return 0, len(content)
+
+
+def _is_function_body(content: str, pairs: List[Tuple[int, int, str]], open_at: int) -> bool:
+    """True if the block at ``open_at`` follows ``=>`` or a parameter list (not ``if (...)``)."""
+    head = content[:open_at].rstrip()
+    if head.endswith("=>"):
+        return True
+    # A return type annotation may sit between the parameters and the body
+    annotation = _RETURN_TYPE.search(head[-200:])
+    close_at = len(head) - len(annotation.group(0)) if annotation else len(head) - 1
+    paren = next((pair for pair in pairs if pair[1] == close_at and pair[2] == "("), None)
+    return paren is not None and not _CONTROL_BEFORE.search(_previous_code(content, paren[0]))
+
+
+def _redeclares(content: str, pairs: List[Tuple[int, int, str]], scope: Tuple[int, int],
+                name: str) -> bool:
+    """True if ``scope`` itself declares a ``name`` (let/const/var or a parameter)."""
+    text = list(content[scope[0]:scope[1] + 1])
+    for open_at, close_at, bracket in pairs:
+        # Blank out the blocks nested in this scope (but not its own body)
+        if (bracket == "{" and scope[0] < open_at and close_at < scope[1]
+                and _is_block(content, open_at, close_at)):
+            text[open_at - scope[0] + 1:close_at - scope[0]] = " " * (close_at - open_at - 1)
+    text = "".join(text)
+    declared = rf"\b(?:let|const|var)\s+(?:[{{\[][^=;]*)?(?<![\w$.]){re.escape(name)}(?![\w$])"
+    if re.search(declared, text):
+        return True
+    if text.startswith("("):
+        head = text[:_matching_paren(text) + 1]
+        return re.search(rf"(?<![\w$.:]){re.escape(name)}(?![\w$])", head) is not None
+    return False
+
+
+def _matching_paren(text: str) -> int:
+    depth = 0
+    for index, c in enumerate(text):
+        depth += c == "("
+        depth -= c == ")"
+        if depth == 0:
+            return index
+    return len(text)
+
+
+def _scoped_assignments(content: str, pairs: List[Tuple[int, int, str]], start: int,
+                        name: str) -> List[int]:
+    """Offsets of plain ``name = ...`` assignments to the binding declared at ``start``.
+
+    Only assignments inside the binding's own scope count, and not those in
+    nested scopes that declare a ``name`` of their own. ``pairs`` is
+    ``bracket_pairs(content)``, computed once per file by the caller.
+    """
+    scope = _scope_of(content, pairs, start, bool(_VAR_BEFORE.search(content[max(0, start - 200):start])))
+    assignment = re.compile(rf"(?<![\w$.]){re.escape(name)}(?=\s*=(?![=>]))")
+    offsets = []
+    for match in assignment.finditer(content, scope[0], scope[1]):
+        inner = scope
+        shadowed = False
+        while True:
+            nested = _scope_of(content, [pair for pair in pairs if inner[0] < pair[0] and pair[1] < inner[1]],
+                               match.start())
+            if nested == (0, len(content)) or nested == inner:
+                break
+            if _redeclares(content, pairs, nested, name):
+                shadowed = True
+                break
+            inner = nested
+        if not shadowed:
+            offsets.append(match.start())
+    return offsets
+
+
+def _is_shorthand_property(content: str, pairs: List[Tuple[int, int, str]],
+                           start: int, end: int) -> bool:
+    """True for ``a`` in a destructuring pattern like ``{ a, b } = obj`` or ``{ a = 1 }``."""
+    innermost = max((pair for pair in pairs if pair[0] < start < pair[1]), default=None)
+    if innermost is None or innermost[2] != "{":
+        return False
+    before = content[innermost[0]:start].rstrip()
+    after = content[end:innermost[1] + 1].lstrip()
+    return before.endswith(("{", ",")) and (after[:1] in (",", "}") or
+                                            (after.startswith("=") and not after.startswith(("==", "=>"))))
+
+
+def _in_import_braces(content: str, start: int) -> bool:
+    """Return True if ``start`` is a bare specifier inside ``import { ... }``."""
+    window = content[max(0, start - _IMPORT_LOOKBACK):start]
+    return bool(_OPEN_IMPORT_BRACE.search(window)) and not _AS_BEFORE.search(window)
+
+
+def prefix_edits(content: str, messages: Iterable[dict]) -> Tuple[List[Tuple[int, str]], List[str]]:
+    """Work out the insertions that underscore-prefix each reported unused binding.
+
+    Returns ``(offset, text)`` insertions and a list of skipped-message notes
+    (stale reports). Bare import specifiers are aliased (``foo as _foo``) and
+    shorthand destructured properties renamed (``{ a: _a }``) rather than
+    prefixed, so they keep naming the same export or property. For "assigned
+    a value" reports, plain assignments to the same binding within its scope
+    are prefixed too so the code keeps compiling.
+    """
+    starts = line_starts(content)
+    edits = {}
+    skipped = []
+    pairs = None
+    for message in messages:
+        line, column = message["line"], message.get("column", 1)
+        if line > len(starts):
+            skipped.append(f"{line}:{column} is past the end of the file")
+            continue
+        start = starts[line - 1] + column - 1
+        found = _IDENTIFIER.match(content, start)
+        reported = _REPORTED_NAME.search(message.get("message", ""))
+        name = reported.group(1) if reported else (found.group(0) if found else "")
+        if not found or found.group(0) != name:
+            if found and found.group(0) == "_" + name:
+                continue
+            skipped.append(f"{line}:{column} does not point at '{name}' (stale report?)")
+            continue
+        if name.startswith("_"):
+            continue
+        if _in_import_braces(content, start):
+            if not re.match(r"\s+as\b", content[found.end():found.end() + 8]):
+                edits[found.end()] = f" as _{name}"
+            continue
+        if pairs is None:
+            pairs = bracket_pairs(content)
+        if _is_shorthand_property(content, pairs, start, found.end()):
+            edits[found.end()] = f": _{name}"
+        elif re.match(rf"\s*:\s*_{re.escape(name)}(?![\w$])", content[found.end():]):
+            pass  # Renamed on an earlier run: `{ a: _a }`
+        else:
+            edits[start] = "_"
+        if "assigned a value" in message.get("message", ""):
+            edits.update((offset, "_") for offset in _scoped_assignments(content, pairs, start, name)
+                         if offset != start)
+    return sorted(edits.items()), skipped
+
+
+def apply_insertions(content: str, edits: List[Tuple[int, str]]) -> str:
+    """Apply ``(offset, text)`` insertions back to front in one pass."""
+    pieces = []
+    end = len(content)
+    for offset, text in sorted(edits, reverse=True):
+        pieces.append(content[offset:end])
+        pieces.append(text)
+        end = offset
+    pieces.append(content[:end])
+    return "".join(reversed(pieces))
+
+
+def fix_from_report(source: str, globs: Optional[List[str]] = None,
+                    root: Path = REPO_ROOT) -> Dict[str, int]:
+    """Apply the report's unused-variable fixes as one batch and print progress."""
+    summary = {"files": 0, "fixed": 0, "edits": 0, "skipped": 0}
+    grouped = unused_var_messages(load_report(source), root, globs)
+    with WriteBatch() as batch:
+        _fix_grouped(grouped, root, batch, summary)
+    return summary
+
+
+def _fix_grouped(grouped: Dict[str, List[dict]], root: Path, batch: WriteBatch,
+                 summary: Dict[str, int]) -> None:
+    for rel_path, messages in sorted(grouped.items()):
+        summary["files"] += 1
+        full_path = root / rel_path
+        try:
+            content = full_path.read_text(encoding="utf-8")
+        except OSError as e:
+            print(f"❌ Error reading {rel_path}: {e}")
+            summary["skipped"] += len(messages)
+            continue
+        edits, notes = prefix_edits(content, messages)
+        for note in notes:
+            print(f"⚠️  {rel_path}:{note}")
+        summary["skipped"] += len(notes)
+        if not edits:
+            print(f"⚠️  No changes needed: {rel_path}")
+            continue
+        batch.stage(full_path, apply_insertions(content, edits))
+        summary["fixed"] += 1
+        summary["edits"] += len(edits)
+        print(f"✅ Fixed: {rel_path} ({len(edits)} edits)")
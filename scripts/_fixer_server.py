@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Warm markdown fixer server (``fix-markdown-universal.py --serve``).
+
+Keeps the fixer loaded in one process listening on a Unix socket so hooks
+and editors skip interpreter startup and regex compilation per file.
+Connections are served by a fixed-size thread pool; the server exits on its
+own after ``idle_timeout`` seconds without requests.
+
+Protocol: one JSON request line per connection, answered by one JSON line.
+
+    {"op": "fix", "text": "...", "config": {"max_line_length": 120}}
+        -> {"ok": true, "text": "...", "report": {...}}
+    {"op": "fix_paths", "paths": ["/abs/a.md"], "write": true}
+        -> {"ok": true, "results": [{"path": ..., "changed": ..., "report": ...}]}
+    {"op": "stats"} / {"op": "shutdown"}
+
+All workers share the fixer's process-wide line memo, so the server stays
+warm line by line as well; ``stats`` includes its hit rate.
+
+``scripts/fix-markdown-client.py`` is the matching client.
+"""
+
+import json
+import os
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict
+from pathlib import Path
+from typing import Dict, Optional
+
+from _discovery import CACHE_DIR
+from _writeback import write_text_atomic
+from markdown_fixer import LINE_MEMO, FixerConfig, fix_text
+
+
+DEFAULT_SOCKET = CACHE_DIR / "markdown-fixer.sock"
+DEFAULT_IDLE_TIMEOUT = 600.0
+
+
+class FixerServer:
+    """Serve fix requests from a pool of worker threads."""
+
+    def __init__(self, socket_path: Path = DEFAULT_SOCKET, config: FixerConfig = FixerConfig(),
+                 workers: int = 4, idle_timeout: float = DEFAULT_IDLE_TIMEOUT):
+        self.socket_path = Path(socket_path)
+        self.config = config
+        self.workers = workers
+        self.idle_timeout = idle_timeout
+        self.stats: Dict[str, float] = {"requests": 0, "files": 0, "fixed": 0,
+                                        "errors": 0, "busy_s": 0.0}
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._last_activity = time.monotonic()
+        self._stopping = threading.Event()
+        self._started = time.monotonic()
+
+    def _bind(self) -> socket.socket:
+        self.socket_path.parent.mkdir(parents=True, exist_ok=True)
+        if self.socket_path.exists():
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(str(self.socket_path))
+            except OSError:
+                self.socket_path.unlink()  # Stale socket from a crashed server
+            else:
+                raise RuntimeError(f"a server is already listening on {self.socket_path}")
+            finally:
+                probe.close()
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        listener.bind(str(self.socket_path))
+        os.chmod(self.socket_path, 0o600)
+        listener.listen(64)
+        listener.settimeout(0.5)
+        return listener
+
+    def serve_forever(self) -> None:
+        """Accept connections until shut down or idle for ``idle_timeout``."""
+        listener = self._bind()
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                while not self._stopping.is_set():
+                    try:
+                        conn, _ = listener.accept()
+                    except socket.timeout:
+                        with self._lock:
+                            idle = self._in_flight == 0 and \
+                                time.monotonic() - self._last_activity > self.idle_timeout
+                        if idle:
+                            break
+                        continue
+                    with self._lock:
+                        self._in_flight += 1
+                        self._last_activity = time.monotonic()
+                    pool.submit(self._handle, conn)
+        finally:
+            listener.close()
+            try:
+                self.socket_path.unlink()
+            except FileNotFoundError:
+                pass
+
+    def _handle(self, conn: socket.socket) -> None:
+        start = time.perf_counter()
+        try:
+            with conn, conn.makefile("rb") as reader:
+                line = reader.readline()
+                try:
+                    response = self.dispatch(json.loads(line))
+                except Exception as e:
+                    response = {"ok": False, "error": str(e)}
+                    with self._lock:
+                        self.stats["errors"] += 1
+                conn.sendall(json.dumps(response).encode("utf-8") + b"\n")
+        except OSError:
+            pass  # Client went away
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+                self._last_activity = time.monotonic()
+                self.stats["requests"] += 1
+                self.stats["busy_s"] += time.perf_counter() - start
+
+    def _config_for(self, request: dict) -> FixerConfig:
+        overrides = request.get("config") or {}
+        return FixerConfig(**{**asdict(self.config), **overrides}) if overrides else self.config
+
+    def dispatch(self, request: dict) -> dict:
+        """Answer one decoded request."""
+        op = request.get("op")
+        if op == "fix":
+            fixed, report = fix_text(request["text"], self._config_for(request))
+            with self._lock:
+                self.stats["files"] += 1
+                self.stats["fixed"] += report.changed
+            return {"ok": True, "text": fixed, "report": report.to_dict()}
+        if op == "fix_paths":
+            config = self._config_for(request)
+            return {"ok": True, "results": [self._fix_path(Path(p), config, request.get("write", True))
+                                            for p in request["paths"]]}
+        if op == "stats":
+            with self._lock:
+                stats = dict(self.stats)
+            stats["uptime_s"] = time.monotonic() - self._started
+            stats["line_memo"] = LINE_MEMO.stats()
+            return {"ok": True, "stats": stats}
+        if op == "shutdown":
+            self._stopping.set()
+            return {"ok": True}
+        raise ValueError(f"unknown op: {op!r}")
+
+    def _fix_path(self, path: Path, config: FixerConfig, write: bool) -> dict:
+        try:
+            original = path.read_text(encoding="utf-8")
+            fixed, report = fix_text(original, config)
+            if report.changed and write:
+                write_text_atomic(path, fixed)
+        except (OSError, UnicodeDecodeError) as e:
+            with self._lock:
+                self.stats["errors"] += 1
+            return {"path": str(path), "error": str(e)}
+        with self._lock:
+            self.stats["files"] += 1
+            self.stats["fixed"] += report.changed
+        return {"path": str(path), "changed": report.changed, "report": report.to_dict()}
+
+
+def request(payload: dict, socket_path: Path = DEFAULT_SOCKET,
+            timeout: Optional[float] = 30.0) -> dict:
+    """Send one request to a running server and return its decoded response."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(str(socket_path))
+        sock.sendall(json.dumps(payload).encode("utf-8") + b"\n")
+        with sock.makefile("rb") as reader:
+            return json.loads(reader.readline())
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Small git plumbing helpers for the scripts/ tools.
+
+Everything goes through a handful of batched git invocations (one
+``diff --raw``, one ``cat-file --batch``) so that asking "which docs changed"
+costs the same whether one file or a hundred changed.
+"""
+
+import subprocess
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+
+class GitError(RuntimeError):
+    """Raised when a git command fails."""
+
+
+@dataclass
+class IndexEntry:
+    """A staged file as recorded in the index."""
+
+    path: str
+    mode: str
+    sha: str
+
+
+def _git(args: List[str], cwd: Path, input: Optional[bytes] = None) -> bytes:
+    proc = subprocess.run(["git", *args], cwd=cwd, input=input,
+                          stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    if proc.returncode != 0:
+        raise GitError(proc.stderr.decode("utf-8", "replace").strip()
+                       or f"git {' '.join(args)} failed")
+    return proc.stdout
+
+
+def toplevel(cwd: Path = Path(".")) -> Path:
+    """Return the root of the working tree containing ``cwd``."""
+    return Path(_git(["rev-parse", "--show-toplevel"], cwd).decode().strip())
+
+
+def changed_since(root: Path, ref: str, pathspecs: Iterable[str]) -> List[str]:
+    """Paths added/modified since ``ref`` (working tree included), plus untracked files."""
+    specs = list(pathspecs)
+    changed = _git(["diff", "--name-only", "-z", "--diff-filter=ACMR", ref, "--", *specs], root)
+    untracked = _git(["ls-files", "--others", "--exclude-standard", "-z", "--", *specs], root)
+    paths = {p.decode() for p in (changed + untracked).split(b"\0") if p}
+    return sorted(paths)
+
+
+def staged_entries(root: Path, pathspecs: Iterable[str]) -> List[IndexEntry]:
+    """Return the index entries of files added/modified in the index."""
+    raw = _git(["diff", "--cached", "--raw", "-z", "--no-abbrev",
+                "--diff-filter=ACMR", "--", *pathspecs], root)
+    fields = raw.split(b"\0")
+    entries = []
+    i = 0
+    while i + 1 < len(fields) and fields[i]:
+        meta = fields[i].decode().lstrip(":").split()
+        status = meta[4]
+        # Renames and copies carry both the old and the new path
+        path = fields[i + 2] if status[0] in "RC" else fields[i + 1]
+        entries.append(IndexEntry(path.decode(), meta[1], meta[3]))
+        i += 3 if status[0] in "RC" else 2
+    return entries
+
+
+def read_blobs(root: Path, shas: Iterable[str]) -> Dict[str, bytes]:
+    """Read several blobs with a single ``git cat-file --batch``."""
+    shas = list(dict.fromkeys(shas))
+    if not shas:
+        return {}
+    out = _git(["cat-file", "--batch"], root, input=("\n".join(shas) + "\n").encode())
+    blobs = {}
+    pos = 0
+    for sha in shas:
+        header_end = out.index(b"\n", pos)
+        header = out[pos:header_end].split()
+        size = int(header[2])
+        blobs[sha] = out[header_end + 1:header_end + 1 + size]
+        pos = header_end + 1 + size + 1
+    return blobs
+
+
+def write_blob(root: Path, data: bytes, path: str) -> str:
+    """Store ``data`` as a blob (filters for ``path`` applied) and return its sha."""
+    return _git(["hash-object", "-w", "--stdin", "--path", path], root, input=data).decode().strip()
+
+
+def update_index(root: Path, entries: Iterable[IndexEntry]) -> None:
+    """Point index entries at new blobs in one ``update-index`` call."""
+    lines = "".join(f"{e.mode} {e.sha}\t{e.path}\0" for e in entries)
+    if lines:
+        _git(["update-index", "-z", "--index-info"], root, input=lines.encode())
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Lint output for scripts/fix-markdown-universal.py.
+
+With ``--lint`` the fixer records a ``Violation`` for everything it fixes,
+in the same pass (see ``FixerConfig.lint``). ``LintReport`` collects them
+per file and renders them the way markdownlint-cli does (its default text
+output and ``--json``), or as SARIF 2.1.0 for code-scanning uploads.
+"""
+
+import json
+from pathlib import Path
+from typing import Dict, List
+
+from markdown_fixer import RULE_SPECS, Violation
+
+
+FORMATS = ("markdownlint", "json", "sarif")
+RULE_URL = "https://github.com/DavidAnson/markdownlint/blob/main/doc/{}.md"
+SARIF_SCHEMA = "https://json.schemastore.org/sarif-2.1.0.json"
+
+
+class LintReport:
+    """Violations per file, in the order the files were fixed."""
+
+    def __init__(self):
+        self.files: Dict[str, List[Violation]] = {}
+
+    def __call__(self, path: Path, violations: List[Violation]) -> None:
+        """Record one file's violations (usable as ``fixer.on_violations``)."""
+        if violations:
+            self.files[Path(path).as_posix()] = list(violations)
+
+    def __len__(self) -> int:
+        return sum(len(violations) for violations in self.files.values())
+
+    def _items(self):
+        for path in sorted(self.files):
+            for violation in self.files[path]:
+                yield path, violation
+
+    def to_markdownlint(self) -> str:
+        """``docs/a.md:12:101 MD013/line-length Line length [Expected: 100; Actual: 120]``"""
+        lines = []
+        for path, v in self._items():
+            column = f":{v.column}" if v.column is not None else ""
+            detail = f" [{v.detail}]" if v.detail else ""
+            lines.append(f"{path}:{v.line}{column} {v.rule}/{v.alias} {v.description}{detail}")
+        return "\n".join(lines) + ("\n" if lines else "")
+
+    def to_json(self) -> str:
+        """The result array markdownlint-cli prints with ``--json``."""
+        results = [{
+            "fileName": path,
+            "lineNumber": v.line,
+            "ruleNames": [v.rule, v.alias],
+            "ruleDescription": v.description,
+            "ruleInformation": RULE_URL.format(v.rule.lower()),
+            "errorDetail": v.detail,
+            "errorContext": None,
+            "errorRange": [v.column, 1] if v.column is not None else None,
+            "fixInfo": None,
+        } for path, v in self._items()]
+        return json.dumps(results, indent=2) + "\n"
+
+    def to_sarif(self) -> str:
+        """A SARIF 2.1.0 log with one run and every fixer rule in its driver."""
+        rule_index = {spec.id: number for number, spec in enumerate(RULE_SPECS)}
+        rules = [{
+            "id": spec.id,
+            "name": spec.alias,
+            "shortDescription": {"text": spec.description},
+            "helpUri": RULE_URL.format(spec.id.lower()),
+        } for spec in RULE_SPECS]
+        results = []
+        for path, v in self._items():
+            region = {"startLine": v.line}
+            if v.column is not None:
+                region["startColumn"] = v.column
+            detail = f" [{v.detail}]" if v.detail else ""
+            results.append({
+                "ruleId": v.rule,
+                "ruleIndex": rule_index[v.rule],
+                "level": "warning",
+                "message": {"text": f"{v.rule}/{v.alias} {v.description}{detail}"},
+                "locations": [{"physicalLocation": {
+                    "artifactLocation": {"uri": Path(path).as_uri() if Path(path).is_absolute() else path},
+                    "region": region,
+                }}],
+            })
+        log = {
+            "$schema": SARIF_SCHEMA,
+            "version": "2.1.0",
+            "runs": [{
+                "tool": {"driver": {"name": "fix-markdown-universal", "rules": rules}},
+                "results": results,
+            }],
+        }
+        return json.dumps(log, indent=2) + "\n"
+
+    def render(self, output_format: str) -> str:
+        if output_format not in FORMATS:
+            raise ValueError(f"unknown lint format {output_format!r} (known: {', '.join(FORMATS)})")
+        return getattr(self, "to_" + output_format)()
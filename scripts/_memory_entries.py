@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Duplicate detection for entries added to memory.md sections.
+
+Hooks and repeated runs keep appending the same session summaries and
+bullets to memory.md. An entry is one top-level list item (with its
+indented continuation lines), one paragraph, or one fenced code block;
+entries are compared after ``normalize_entry`` (case, whitespace, list
+markers and emphasis do not count).
+
+``EntryIndex`` keeps, per section, the set of normalized entry hashes
+under .cache/scripts/memory, next to the parse snapshot. Each set is keyed
+by a hash of the section's text, so a section whose text is unchanged is
+checked with set lookups instead of re-splitting it; writes elsewhere in
+the file (the "Last Updated" stamp, other sections) do not invalidate it.
+"""
+
+import hashlib
+import marshal
+import re
+from itertools import dropwhile
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+from _memory_snapshot import SNAPSHOT_VERSION, snapshot_path
+from _writeback import WriteBatch
+
+
+FENCE_PATTERN = re.compile(r'^\s{0,3}(`{3,}|~{3,})')
+LIST_ITEM_PATTERN = re.compile(r'^(\s*)(?:[-*+]|\d+[.)])\s')
+MARKER_PATTERN = re.compile(r'^\s*(?:[-*+]|\d+[.)])\s+', re.MULTILINE)
+EMPHASIS_PATTERN = re.compile(r'[*_`]')
+WORD_PATTERN = re.compile(r'\w')
+
+
+def normalize_entry(text: str) -> str:
+    """``- **Steam**:  Fixed overlay.`` and ``* Steam: fixed overlay`` normalize alike."""
+    text = EMPHASIS_PATTERN.sub('', MARKER_PATTERN.sub('', text))
+    return ' '.join(text.lower().split()).rstrip('.')
+
+
+def entry_hash(text: str) -> Optional[str]:
+    """Hash of the normalized entry, or None for entries without words (rules, blanks)."""
+    normalized = normalize_entry(text)
+    if not WORD_PATTERN.search(normalized):
+        return None
+    return hashlib.blake2b(normalized.encode('utf-8'), digest_size=8).hexdigest()
+
+
+def split_entries(lines: List[str]) -> List[List[str]]:
+    """Split lines into consecutive chunks, one entry each (plus trailing blanks).
+
+    Joining every chunk's lines gives ``lines`` back unchanged. Leading blank
+    lines form a chunk of their own.
+    """
+    chunks: List[List[str]] = []
+    current: List[str] = []
+    indent = 0
+    fence = None
+    for line in lines:
+        if fence is not None:
+            current.append(line)
+            if line.strip().startswith(fence):
+                fence = None
+            continue
+        if not line.strip():
+            current.append(line)
+            continue
+        opened = FENCE_PATTERN.match(line)
+        line_indent = len(line) - len(line.lstrip())
+        if any(text.strip() for text in current):
+            # Indented lines, and lines directly after the entry, continue it
+            starts = opened or (line_indent <= indent and (
+                LIST_ITEM_PATTERN.match(line) or not current[-1].strip()))
+        else:
+            starts = bool(current)
+        if starts:
+            chunks.append(current)
+            current = []
+        if not current:
+            indent = line_indent
+        if opened:
+            fence = opened.group(1)
+        current.append(line)
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def chunk_hash(chunk: List[str]) -> Optional[str]:
+    return entry_hash('\n'.join(chunk))
+
+
+def section_digest(text: str) -> str:
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def dedupe_section(text: str) -> Tuple[str, int]:
+    """Drop repeated entries of one section (heading line first); keep the first of each."""
+    heading, newline, body = text.partition('\n')
+    if not newline:
+        return text, 0
+    seen: Set[str] = set()
+    kept: List[str] = []
+    removed = 0
+    for chunk in split_entries(body.split('\n')):
+        key = chunk_hash(chunk)
+        if key is not None and key in seen:
+            removed += 1
+            # Its trailing blank lines may be all that separates the entries around it
+            blanks = len(chunk) - len(list(dropwhile(lambda line: not line.strip(), reversed(chunk))))
+            if blanks and kept and kept[-1].strip():
+                kept.extend(chunk[-blanks:])
+            continue
+        if key is not None:
+            seen.add(key)
+        kept.extend(chunk)
+    return heading + newline + '\n'.join(kept), removed
+
+
+class EntryIndex:
+    """Normalized entry hashes per section name, each keyed by the section's text."""
+
+    def __init__(self, path: Path, sections: Optional[Dict[str, Tuple[str, Set[str]]]] = None):
+        self.path = path
+        self.sections = sections if sections is not None else {}
+
+    @classmethod
+    def load(cls, memory_file: Path) -> "EntryIndex":
+        path = snapshot_path(memory_file).with_suffix('.entries')
+        try:
+            version, sections = marshal.loads(path.read_bytes())
+        except (OSError, EOFError, ValueError, TypeError):
+            return cls(path)
+        if version != SNAPSHOT_VERSION:
+            return cls(path)
+        return cls(path, sections)
+
+    def hashes(self, section: str, text: str) -> Set[str]:
+        """Entry hashes of the section whose full text (heading included) is ``text``."""
+        digest = section_digest(text)
+        cached = self.sections.get(section)
+        if cached is not None and cached[0] == digest:
+            return cached[1]
+        body = text.partition('\n')[2]
+        hashes = {key for key in map(chunk_hash, split_entries(body.split('\n'))) if key is not None}
+        self.sections[section] = (digest, hashes)
+        return hashes
+
+    def new_entries(self, section: str, text: str, content: str) -> List[List[str]]:
+        """Chunks of ``content`` not already in the section (nor repeated within ``content``)."""
+        seen = set(self.hashes(section, text))
+        fresh = []
+        for chunk in split_entries(content.split('\n')):
+            key = chunk_hash(chunk)
+            if key is None or key not in seen:
+                fresh.append(chunk)
+            if key is not None:
+                seen.add(key)
+        if not any(chunk_hash(chunk) for chunk in fresh):
+            return []
+        return fresh
+
+    def record(self, section: str, text: str, added: List[List[str]]) -> None:
+        """Note that the section's text is now ``text``, after appending ``added``."""
+        cached = self.sections.get(section)
+        hashes = set(cached[1]) if cached is not None else set()
+        hashes.update(key for key in map(chunk_hash, added) if key is not None)
+        self.sections[section] = (section_digest(text), hashes)
+
+    def save(self) -> None:
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with WriteBatch(durable=False) as batch:
+                batch.stage(self.path, marshal.dumps((SNAPSHOT_VERSION, self.sections)))
+        except OSError:
+            pass  # A cache that cannot be written only costs the next add a re-split
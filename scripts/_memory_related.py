@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+TF-IDF "related notes" index for scripts/memory-manager.py.
+
+Substring search only finds notes that use the query's exact words.
+``RelatedIndex`` ranks the paragraphs of memory.md by cosine similarity of
+TF-IDF vectors instead, so a query finds notes that share its vocabulary
+in any order and wording.
+
+Every paragraph (a run of non-blank, non-heading lines, plus the name of
+the heading it sits under) is one document. The weighted, L2-normalised
+document vectors are kept as a sparse term-by-paragraph matrix in
+compressed columns, so a query is one sparse matrix-vector product over
+the columns of its terms: ``numpy.bincount`` when NumPy is installed, a
+plain accumulation loop otherwise.
+
+The index is saved next to the parse snapshot (``.related``) and reused
+while the file's content hash is unchanged. The term counts of every
+heading-to-heading span are kept apart (``.tokens``), keyed by the hash of
+the span's bytes: when the file changes only edited sections are tokenised
+again, and the weights are rebuilt since every IDF depends on the whole
+file.
+"""
+
+import hashlib
+import heapq
+import marshal
+import math
+import re
+from array import array
+from collections import Counter
+from itertools import accumulate, chain, repeat
+from typing import Dict, List, Optional, Tuple
+
+from _memory_snapshot import SNAPSHOT_VERSION, MemorySnapshot, snapshot_path
+from _writeback import WriteBatch
+
+try:
+    import numpy as np
+except ImportError:  # Pure-Python scoring below
+    np = None
+
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:[/+#.-][a-z0-9]+)*")
+STOP_WORDS = frozenset("""
+    a an and are as at be been but by for from has have if in into is it its
+    no not of on or so such that the their then there these they this to was
+    were will with we you your our all any can do does done via use used using
+""".split())
+
+# (first line, line count, term counts) of one paragraph, lines relative to its span
+Paragraph = Tuple[int, int, Dict[str, int]]
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased words (keeping "ci/cd", "pnpm-lock.yaml"), minus stop words."""
+    return [token for token in TOKEN_PATTERN.findall(text.lower())
+            if len(token) > 1 and token not in STOP_WORDS]
+
+
+def split_paragraphs(text: str, heading: str) -> List[Paragraph]:
+    """Paragraphs of one heading-to-heading span (its first line is the heading, if any)."""
+    paragraphs = []
+    heading_terms = Counter(tokenize(heading))
+    lines = text.split("\n")
+    start = None
+    for number, line in enumerate(lines + [""]):
+        if line.strip() and not line.startswith("#"):
+            if start is None:
+                start = number
+            continue
+        if start is not None:
+            counts = Counter(tokenize("\n".join(lines[start:number])))
+            if counts:
+                counts.update(heading_terms)
+                paragraphs.append((start, number - start, dict(counts)))
+            start = None
+    return paragraphs
+
+
+class RelatedIndex:
+    """Sparse TF-IDF matrix over the paragraphs of one version of a memory file.
+
+    Column ``j`` of the matrix (the postings of the term numbered ``j`` in
+    ``terms``) is ``indices[indptr[j]:indptr[j + 1]]`` (paragraph numbers)
+    with the matching ``weights``. Paragraph ``i`` starts at 0-based line
+    ``lines[i]``, spans ``line_counts[i]`` lines and sits under heading
+    ``headings[i]`` (-1 for text before the first heading).
+    """
+
+    def __init__(self, digest: str, terms: Dict[str, int], idf: array, indptr: array,
+                 indices: array, weights: array, lines: array, line_counts: array,
+                 headings: array, spans: Optional[Dict[str, List[Paragraph]]] = None):
+        self.digest = digest
+        self.terms = terms
+        self.idf = idf
+        self.indptr = indptr
+        self.indices = indices
+        self.weights = weights
+        self.lines = lines
+        self.line_counts = line_counts
+        self.headings = headings
+        self.spans = spans
+        if np is not None:
+            self._indptr = np.frombuffer(indptr, dtype=np.int64)
+            self._indices = np.frombuffer(indices, dtype=np.int64)
+            self._weights = np.frombuffer(weights, dtype=np.float64)
+
+    def __len__(self) -> int:
+        return len(self.lines)
+
+    def unit(self, document: int) -> Tuple[int, int, int]:
+        """(first line, line count, heading index) of one paragraph."""
+        return self.lines[document], self.line_counts[document], self.headings[document]
+
+    @classmethod
+    def build(cls, snapshot: MemorySnapshot, data: bytes,
+              cached: Optional[Dict[str, List[Paragraph]]] = None) -> "RelatedIndex":
+        """Index ``data`` (the file's bytes), reusing ``cached`` spans' term counts."""
+        cached = cached or {}
+        bounds = [(-1, 0)] + [(i, heading[3]) for i, heading in enumerate(snapshot.headings)]
+        ends = [offset for _, offset in bounds[1:]] + [len(data)]
+        spans: Dict[str, List[Paragraph]] = {}
+        lines, line_counts, headings = array("q"), array("q"), array("q")
+        documents: List[Dict[str, int]] = []
+        for (index, start), end in zip(bounds, ends):
+            chunk = data[start:end]
+            key = hashlib.blake2b(chunk, digest_size=16).hexdigest()
+            paragraphs = spans.get(key) or cached.get(key)
+            if paragraphs is None:
+                name = snapshot.headings[index][1] if index >= 0 else ""
+                paragraphs = split_paragraphs(chunk.decode("utf-8"), name)
+            spans[key] = paragraphs
+            first_line = snapshot.headings[index][2] if index >= 0 else 0
+            for line, count, counts in paragraphs:
+                lines.append(first_line + line)
+                line_counts.append(count)
+                headings.append(index)
+                documents.append(counts)
+        return cls(snapshot.key[2], *_weigh(documents), lines, line_counts, headings, spans)
+
+    def query(self, text: str, top_k: int = 5) -> List[Tuple[float, int]]:
+        """(cosine similarity, paragraph number) of the best ``top_k`` matches."""
+        counts = Counter(term for term in tokenize(text) if term in self.terms)
+        if not counts or top_k <= 0:
+            return []
+        columns = [self.terms[term] for term in counts]
+        vector = [(1 + math.log(counts[term])) * self.idf[self.terms[term]] for term in counts]
+        norm = math.sqrt(sum(weight * weight for weight in vector))
+        vector = [weight / norm for weight in vector]
+        if np is not None:
+            return self._query_numpy(columns, vector, top_k)
+        scores: Dict[int, float] = {}
+        for column, query_weight in zip(columns, vector):
+            start, end = self.indptr[column], self.indptr[column + 1]
+            for document, weight in zip(self.indices[start:end], self.weights[start:end]):
+                scores[document] = scores.get(document, 0.0) + weight * query_weight
+        best = heapq.nlargest(top_k, scores.items(), key=lambda item: (item[1], -item[0]))
+        return [(score, document) for document, score in best]
+
+    def _query_numpy(self, columns: List[int], vector: List[float],
+                     top_k: int) -> List[Tuple[float, int]]:
+        # Gather the query terms' columns and sum them into one score per paragraph
+        starts = self._indptr[columns]
+        lengths = self._indptr[[column + 1 for column in columns]] - starts
+        positions = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+        scores = np.bincount(self._indices[positions],
+                             weights=self._weights[positions] * np.repeat(vector, lengths),
+                             minlength=len(self))
+        candidates = np.flatnonzero(scores > 0)
+        if len(candidates) > top_k:
+            # Keep every tie with the k-th score so the order below is the pure-Python one
+            kth = np.partition(scores[candidates], len(candidates) - top_k)[len(candidates) - top_k]
+            candidates = candidates[scores[candidates] >= kth]
+        ranked = sorted(candidates.tolist(), key=lambda document: (-scores[document], document))
+        return [(float(scores[document]), document) for document in ranked[:top_k]]
+
+    def to_bytes(self) -> bytes:
+        return marshal.dumps((SNAPSHOT_VERSION, self.digest, self.terms) + tuple(
+            values.tobytes() for values in (self.idf, self.indptr, self.indices, self.weights,
+                                            self.lines, self.line_counts, self.headings)))
+
+    @classmethod
+    def from_bytes(cls, blob: bytes) -> Optional["RelatedIndex"]:
+        try:
+            version, digest, terms, *packed = marshal.loads(blob)
+        except (EOFError, ValueError, TypeError):
+            return None
+        if version != SNAPSHOT_VERSION or len(packed) != 7:
+            return None
+        arrays = []
+        for typecode, raw in zip("dqqdqqq", packed):
+            unpacked = array(typecode)
+            unpacked.frombytes(raw)
+            arrays.append(unpacked)
+        return cls(digest, terms, *arrays)
+
+
+def _weigh(documents: List[Dict[str, int]]) -> Tuple[Dict[str, int], array, array, array, array]:
+    """Weight raw term counts as (1 + log tf) * idf, normalise each paragraph, and
+    lay the matrix out by columns: (terms, idf, indptr, indices, weights)."""
+    frequency = Counter(chain.from_iterable(documents))
+    terms = {term: column for column, term in enumerate(sorted(frequency))}
+    total = len(documents)
+    idf = array("d", [math.log((1 + total) / (1 + frequency[term])) + 1 for term in terms])
+    columns = [terms[term] for counts in documents for term in counts]
+    tf = [count for counts in documents for count in counts.values()]
+    lengths = [len(counts) for counts in documents]
+    if np is not None:
+        columns_np = np.array(columns, dtype=np.int64)
+        rows = np.repeat(np.arange(total, dtype=np.int64), lengths)
+        weights_np = (1 + np.log(np.array(tf, dtype=np.float64))) * np.frombuffer(idf)[columns_np]
+        weights_np /= np.sqrt(np.bincount(rows, weights=weights_np * weights_np, minlength=total))[rows]
+        order = np.argsort(columns_np, kind="stable")
+        indptr = array("q", [0])
+        indptr.frombytes(np.cumsum(np.bincount(columns_np, minlength=len(terms))).tobytes())
+        indices, weights = array("q"), array("d")
+        indices.frombytes(rows[order].tobytes())
+        weights.frombytes(weights_np[order].tobytes())
+        return terms, idf, indptr, indices, weights
+    log = math.log
+    weighted = [(1 + log(count)) * idf[column] for column, count in zip(columns, tf)]
+    rows = list(chain.from_iterable(repeat(row, length) for row, length in enumerate(lengths)))
+    start = 0
+    for length in lengths:
+        norm = math.sqrt(sum(weight * weight for weight in weighted[start:start + length]))
+        weighted[start:start + length] = [weight / norm for weight in weighted[start:start + length]]
+        start += length
+    # Stable, so each column's paragraphs stay in ascending order
+    order = sorted(range(len(columns)), key=columns.__getitem__)
+    per_column = Counter(columns)
+    indptr = array("q", accumulate((per_column[column] for column in range(len(terms))), initial=0))
+    indices = array("q", [rows[i] for i in order])
+    weights = array("d", [weighted[i] for i in order])
+    return terms, idf, indptr, indices, weights
+
+
+def related_path(snapshot: MemorySnapshot):
+    return snapshot_path(snapshot.path).with_suffix(".related")
+
+
+def _load_spans(target) -> Dict[str, List[Paragraph]]:
+    try:
+        version, spans = marshal.loads(target.with_suffix(".tokens").read_bytes())
+    except (OSError, EOFError, ValueError, TypeError):
+        return {}
+    return spans if version == SNAPSHOT_VERSION else {}
+
+
+def load_related(snapshot: MemorySnapshot) -> RelatedIndex:
+    """The index for the snapshot's version of the file, rebuilt incrementally if stale."""
+    target = related_path(snapshot)
+    try:
+        index = RelatedIndex.from_bytes(target.read_bytes())
+    except OSError:
+        index = None
+    if index is not None and index.digest == snapshot.key[2]:
+        return index
+    index = RelatedIndex.build(snapshot, snapshot.path.read_bytes(), _load_spans(target))
+    try:
+        target.parent.mkdir(parents=True, exist_ok=True)
+        with WriteBatch(durable=False) as batch:
+            batch.stage(target, index.to_bytes())
+            batch.stage(target.with_suffix(".tokens"), marshal.dumps((SNAPSHOT_VERSION, index.spans)))
+    except OSError:
+        pass  # A cache that cannot be written only costs the next call a rebuild
+    return index
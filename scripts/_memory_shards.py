@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Sharded layout for the memory file: one file per top-level category.
+
+``memory-manager.py shard`` splits memory.md at its ``## `` headings into
+memory/NN-<category>.md (text before the first category is the preamble
+shard) and lists the shards, in order, in memory/manifest.json.
+Concatenating the shards in manifest order gives memory.md back byte for
+byte; that combined view is what ``read`` prints and ``unshard`` writes.
+
+A write rewrites only the shards it changes, and each shard has its own
+parse snapshot, so editing one category leaves the other shards' caches
+valid. Every section regex MemoryManager uses stops at the next ``##``,
+which is where a shard ends, so applying an edit shard by shard gives the
+same text as applying it to the combined file.
+"""
+
+import json
+import re
+from bisect import bisect_right
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
+
+from _memory_snapshot import MemorySnapshot, heading_name, trim_section
+from _writeback import WriteBatch
+
+
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+CATEGORY_PATTERN = re.compile(r'^## ', re.MULTILINE)
+
+
+def shard_dir(memory_file: Path) -> Path:
+    """memory.md is sharded into memory/ beside it."""
+    memory_file = Path(memory_file)
+    return memory_file.parent / memory_file.stem
+
+
+def split_categories(text: str) -> List[str]:
+    """Split at every ``## `` line; the pieces concatenate back to ``text``."""
+    bounds = [0] + [match.start() for match in CATEGORY_PATTERN.finditer(text)] + [len(text)]
+    pieces = [text[start:end] for start, end in zip(bounds, bounds[1:]) if start < end]
+    return pieces or [""]
+
+
+def shard_name(index: int, text: str) -> str:
+    """``02-current-session-context.md`` for ``## 🎯 **Current Session Context**``."""
+    first = text.split("\n", 1)[0]
+    if not CATEGORY_PATTERN.match(first):
+        return f"{index:02d}-preamble.md"
+    slug = re.sub(r'[^a-z0-9]+', '-', heading_name(first[3:].strip()).lower()).strip('-')
+    return f"{index:02d}-{slug or 'category'}.md"
+
+
+@dataclass
+class ShardView:
+    """One shard's snapshot placed in the combined file.
+
+    ``first_line`` is the combined line number of the shard's first line,
+    ``line_count`` the lines it contributes (its trailing newline starts
+    the next shard's first line) and ``parents`` the (level, name) headings
+    still open where it starts.
+    """
+
+    snapshot: MemorySnapshot
+    first_line: int
+    line_count: int
+    parents: Tuple[Tuple[int, str], ...] = ()
+
+
+def place(snapshots: List[MemorySnapshot]) -> List[ShardView]:
+    """Line numbers and enclosing headings of consecutive shards."""
+    views = []
+    first_line = 0
+    parents: Tuple[Tuple[int, str], ...] = ()
+    for number, snapshot in enumerate(snapshots):
+        last = number == len(snapshots) - 1
+        line_count = snapshot.line_count if last else snapshot.line_count - 1
+        views.append(ShardView(snapshot, first_line, line_count, parents))
+        first_line += line_count
+        parents = snapshot.open_headings(parents)
+    return views
+
+
+def read_ranges(views: List[ShardView], ranges: Iterable[Tuple[int, int]]) -> List[List[str]]:
+    """Combined lines [start, end) for each range, read with one mmap per shard."""
+    firsts = [view.first_line for view in views]
+    wanted: List[List[Tuple[int, int, int]]] = [[] for _ in views]
+    count = 0
+    for count, (start, end) in enumerate(ranges, 1):
+        number = max(0, bisect_right(firsts, max(0, start)) - 1)
+        while number < len(views) and views[number].first_line < end:
+            view = views[number]
+            local_start = max(start, view.first_line) - view.first_line
+            local_end = min(end, view.first_line + view.line_count) - view.first_line
+            if local_start < local_end:
+                wanted[number].append((count - 1, local_start, local_end))
+            number += 1
+    results: List[List[str]] = [[] for _ in range(count)]
+    for view, pieces in zip(views, wanted):
+        if pieces:
+            read = view.snapshot.read_ranges((start, end) for _, start, end in pieces)
+            for (result, _, _), lines in zip(pieces, read):
+                results[result].extend(lines)
+    return results
+
+
+def read_section(views: List[ShardView], number: int, index: int) -> str:
+    """A section by heading, continuing into later shards if it is still open at its shard's end."""
+    snapshot = views[number].snapshot
+    start, end = snapshot.section_range(index)
+    text = snapshot.read_text(start, end)
+    level = snapshot.headings[index][0]
+    while end == snapshot.size and number + 1 < len(views):
+        number += 1
+        snapshot = views[number].snapshot
+        end = next((offset for other, _, _, offset in snapshot.headings if other <= level), snapshot.size)
+        text += snapshot.read_text(0, end)
+    return trim_section(text)
+
+
+class ShardedMemory:
+    """The shard files of a sharded memory file, in manifest order."""
+
+    def __init__(self, directory: Path, files: List[str]):
+        self.directory = Path(directory)
+        self.files = files
+
+    @property
+    def manifest_path(self) -> Path:
+        return self.directory / MANIFEST_NAME
+
+    @property
+    def paths(self) -> List[Path]:
+        return [self.directory / name for name in self.files]
+
+    @classmethod
+    def load(cls, directory: Path) -> Optional["ShardedMemory"]:
+        """The sharded store in ``directory``, or None if it has no manifest."""
+        manifest_path = Path(directory) / MANIFEST_NAME
+        try:
+            manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return None
+        if manifest.get("version") != MANIFEST_VERSION:
+            raise ValueError(f"Unsupported memory manifest version in {manifest_path}")
+        return cls(directory, [shard["file"] for shard in manifest["shards"]])
+
+    @classmethod
+    def create(cls, directory: Path, text: str) -> "ShardedMemory":
+        """Write ``text`` as shards plus a manifest, all in one batch."""
+        pieces = split_categories(text)
+        store = cls(directory, [shard_name(index, piece) for index, piece in enumerate(pieces)])
+        manifest = {"version": MANIFEST_VERSION,
+                    "shards": [{"file": name, "heading": heading_name(piece.split("\n", 1)[0][3:].strip())
+                                if CATEGORY_PATTERN.match(piece) else ""}
+                               for name, piece in zip(store.files, pieces)]}
+        store.directory.mkdir(parents=True, exist_ok=True)
+        with WriteBatch() as batch:
+            for path, piece in zip(store.paths, pieces):
+                batch.stage(path, piece)
+            batch.stage(store.manifest_path, json.dumps(manifest, indent=2, ensure_ascii=False) + "\n")
+        return store
+
+    def read(self) -> List[str]:
+        return [path.read_text(encoding="utf-8") for path in self.paths]
+
+    def write(self, old: List[str], new: List[str]) -> List[Path]:
+        """Rewrite only the shards whose text changed, together."""
+        with WriteBatch() as batch:
+            for path, before, after in zip(self.paths, old, new):
+                if after != before:
+                    batch.stage(path, after)
+        return batch.committed
+
+    def remove(self) -> None:
+        for path in self.paths + [self.manifest_path]:
+            path.unlink(missing_ok=True)
+        try:
+            self.directory.rmdir()
+        except OSError:
+            pass  # Something else lives there too; leave it
@@ -0,0 +1,407 @@
+#!/usr/bin/env python3
+"""
+Parse snapshot of memory.md for scripts/memory-manager.py.
+
+Parsing memory.md (decode, split, lowercase, regex the section headings) is
+what a cold ``memory-manager.py`` call spends its time on, and the file
+rarely changes between calls. ``load_snapshot`` keeps the parsed structure
+in marshal files under .cache/scripts/memory, keyed like ``FileIndex``:
+the snapshot is reused while the file's mtime and size are unchanged, and
+when only the mtime moved the content hash decides.
+
+The snapshot is two files. ``.snapshot`` is small: the headings with their
+levels, line numbers and byte offsets, so one section can be read with a
+seek and a read of just its bytes. ``.search`` holds the lowercased text
+(as UTF-8 bytes) and the byte offset of every line as packed arrays; it is
+only loaded by full-text search. Neither needs any decoding on load.
+
+The cache directory can be moved with ``$MEMORY_CACHE_DIR`` (the benchmark
+points it at its temp dir). Entries are keyed by the memory file's path, so
+every time a new one is written the directory is pruned: entries whose
+memory file is gone or whose format is out of date are removed, and beyond
+``SNAPSHOT_LIMIT`` files the least recently written go too.
+
+Headings that carry a date, e.g. ``### **W8 Phase 1 Complete (2025-01-15)**``,
+are also kept in a date index sorted by date, so a date range is found by
+binary search instead of a full-text scan.
+
+Like the rest of MemoryManager, headings are found by line shape alone;
+code fences are not parsed.
+"""
+
+import hashlib
+import marshal
+import mmap
+import os
+import re
+from array import array
+from bisect import bisect_left, bisect_right
+from itertools import accumulate, chain
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
+
+from _discovery import CACHE_DIR, content_hash
+from _writeback import WriteBatch
+
+
+SNAPSHOT_VERSION = 4
+SNAPSHOT_DIR = CACHE_DIR / "memory"
+CACHE_DIR_ENV = "MEMORY_CACHE_DIR"
+SNAPSHOT_LIMIT = 64
+# Every file kept per memory file; the other modules derive theirs from snapshot_path
+CACHE_SUFFIXES = (".snapshot", ".search", ".related", ".tokens", ".entries")
+
+# Same pattern MemoryManager.list_sections has always used
+SECTION_PATTERN = re.compile(r'### \*\*(.*?)\*\*')
+HEADING_PATTERN = re.compile(r'^(#{1,6})[ \t]+(.*?)[ \t]*$', re.MULTILINE)
+BOLD_PATTERN = re.compile(r'\*\*(.*?)\*\*')
+DATE_PATTERN = re.compile(r'\b(\d{4}-\d{2}-\d{2})\b')
+
+# (level, name, line, byte offset of the heading line)
+Heading = Tuple[int, str, int, int]
+
+
+def _line_starts(text, newline) -> array:
+    """Offsets where each line starts, plus a sentinel one past the end."""
+    # Each line is its length plus the newline; the last entry is len(text) + 1
+    return array("q", accumulate(map((1).__add__, map(len, text.split(newline))), initial=0))
+
+
+def trim_section(text: str) -> str:
+    """A section's text without its trailing blank lines and closing rule."""
+    lines = text.rstrip().split("\n")
+    while len(lines) > 1 and (not lines[-1].strip() or lines[-1].strip() == "---"):
+        lines.pop()
+    return "\n".join(lines) + "\n"
+
+
+def heading_name(text: str) -> str:
+    """``## 🧠 **Memory Categories**`` is named "Memory Categories"."""
+    bold = BOLD_PATTERN.search(text)
+    return bold.group(1) if bold else text
+
+
+class SearchIndex:
+    """Lowercased text and line offsets for full-text search."""
+
+    def __init__(self, line_offsets: array, lower: bytes, lower_offsets: array):
+        self.line_offsets = line_offsets
+        self.lower = lower
+        self.lower_offsets = lower_offsets
+
+    def to_bytes(self, digest: str) -> bytes:
+        lower_offsets = None if self.lower_offsets is self.line_offsets else self.lower_offsets.tobytes()
+        return marshal.dumps((SNAPSHOT_VERSION, digest, self.line_offsets.tobytes(), self.lower,
+                              lower_offsets))
+
+    @classmethod
+    def from_bytes(cls, blob: bytes, digest: str) -> Optional["SearchIndex"]:
+        try:
+            version, stored_digest, line_offsets, lower, lower_offsets = marshal.loads(blob)
+        except (EOFError, ValueError, TypeError):
+            return None
+        if version != SNAPSHOT_VERSION or stored_digest != digest:
+            return None
+        unpacked_lines = array("q")
+        unpacked_lines.frombytes(line_offsets)
+        unpacked_lower = unpacked_lines
+        if lower_offsets is not None:
+            unpacked_lower = array("q")
+            unpacked_lower.frombytes(lower_offsets)
+        return cls(unpacked_lines, lower, unpacked_lower)
+
+
+class MemorySnapshot:
+    """Section structure of one version of a memory file.
+
+    ``headings`` holds (level, name, line, offset) for every ATX heading;
+    ``sections`` holds (name, level, line) for every ``### **Name**`` match,
+    where level is 0 if the match is not a heading; ``dates`` holds sorted
+    (YYYY-MM-DD, heading index) pairs for every heading whose name has a
+    date; ``line_count`` counts the text after the last newline as a line.
+    Lines are 0-based and offsets are in bytes.
+    """
+
+    def __init__(self, path: Path, key: Tuple[int, int, str], headings: List[Heading],
+                 sections: List[Tuple[str, int, int]], dates: List[Tuple[str, int]],
+                 line_count: int, search: Optional[SearchIndex] = None):
+        self.path = path
+        self.key = key
+        self.headings = headings
+        self.sections = sections
+        self.dates = dates
+        self.line_count = line_count
+        self._search = search
+
+    @classmethod
+    def parse(cls, path: Path, data: bytes, mtime_ns: int) -> "MemorySnapshot":
+        text = data.decode("utf-8")
+        text_offsets = _line_starts(text, "\n")
+        line_offsets = _line_starts(data, b"\n")
+        sections = []
+        for match in SECTION_PATTERN.finditer(text):
+            line = bisect_right(text_offsets, match.start()) - 1
+            head = text[text_offsets[line]:match.start() + 3]
+            level = len(head) if head.strip("#") == "" else 0
+            sections.append((match.group(1), level, line))
+        headings = []
+        for match in HEADING_PATTERN.finditer(text):
+            line = bisect_right(text_offsets, match.start()) - 1
+            headings.append((len(match.group(1)), heading_name(match.group(2)), line, line_offsets[line]))
+        dates = sorted((date.group(1), i) for i, (_, name, _, _) in enumerate(headings)
+                       for date in [DATE_PATTERN.search(name)] if date)
+        lower = text.lower().encode("utf-8")
+        lower_offsets = _line_starts(lower, b"\n")
+        # Lowercasing rarely changes a character's encoded length; share the offsets then
+        if lower_offsets == line_offsets:
+            lower_offsets = line_offsets
+        return cls(path, (mtime_ns, len(data), content_hash(data)), headings, sections, dates,
+                   len(line_offsets) - 1, SearchIndex(line_offsets, lower, lower_offsets))
+
+    @property
+    def size(self) -> int:
+        return self.key[1]
+
+    @property
+    def search_index(self) -> SearchIndex:
+        """The search text, loaded on first use (re-parsed if it is missing or stale)."""
+        if self._search is None:
+            try:
+                self._search = SearchIndex.from_bytes(search_path(self.path).read_bytes(), self.key[2])
+            except OSError:
+                pass
+        if self._search is None:
+            st = os.stat(self.path)
+            fresh = MemorySnapshot.parse(self.path, self.path.read_bytes(), st.st_mtime_ns)
+            # The file may have changed since the headings were loaded; keep both in step
+            self.key, self.headings, self.sections = fresh.key, fresh.headings, fresh.sections
+            self.dates, self.line_count = fresh.dates, fresh.line_count
+            self._search = fresh._search
+            _save(self, snapshot_path(self.path))
+        return self._search
+
+    def section_names(self) -> List[str]:
+        return [name for name, _, _ in self.sections]
+
+    def heading_paths(self, parents: Tuple[Tuple[int, str], ...] = ()) -> List[Tuple[str, ...]]:
+        """The names of each heading and its enclosing headings, outermost first.
+
+        ``parents`` are (level, name) headings open before the file starts,
+        as for a shard of a larger memory file.
+        """
+        stack: List[Tuple[int, str]] = list(parents)
+        paths = []
+        for level, name, _, _ in self.headings:
+            while stack and stack[-1][0] >= level:
+                stack.pop()
+            stack.append((level, name))
+            paths.append(tuple(item for _, item in stack))
+        return paths
+
+    def heading_path(self, index: int, parents: Tuple[Tuple[int, str], ...] = ()) -> Tuple[str, ...]:
+        """``heading_paths(parents)[index]``, walking back only as far as the outermost parent."""
+        level, name, _, _ = self.headings[index]
+        path = [name]
+        enclosing = (self.headings[other][:2] for other in range(index - 1, -1, -1))
+        for other_level, other_name in chain(enclosing, reversed(parents)):
+            if other_level < level:
+                path.append(other_name)
+                level = other_level
+                if level == 1:
+                    break
+        return tuple(reversed(path))
+
+    def open_headings(self, parents: Tuple[Tuple[int, str], ...] = ()) -> Tuple[Tuple[int, str], ...]:
+        """(level, name) of the headings still open at the end of the file."""
+        stack = list(parents)
+        for level, name, _, _ in self.headings:
+            while stack and stack[-1][0] >= level:
+                stack.pop()
+            stack.append((level, name))
+        return tuple(stack)
+
+    def find_headings(self, name: Optional[str] = None, path: Optional[str] = None,
+                      parents: Tuple[Tuple[int, str], ...] = ()) -> List[int]:
+        """Indexes of headings named ``name``, or whose path ends with ``path``.
+
+        A path is heading names joined by "/", e.g. "Session Notes/Current
+        Session"; names may themselves contain "/" ("CI/CD Solutions").
+        """
+        if path is not None:
+            path = path.strip("/")
+            return [i for i, parts in enumerate(self.heading_paths(parents))
+                    if "/".join(parts) == path or "/".join(parts).endswith("/" + path)]
+        return [i for i, heading in enumerate(self.headings) if heading[1] == name]
+
+    def dated_headings(self, since: Optional[str] = None, until: Optional[str] = None,
+                       last: Optional[int] = None) -> List[Tuple[str, int]]:
+        """(date, heading index) for dated headings in [since, until], oldest first.
+
+        Dates are ISO strings, so they order as text; ``last`` keeps only the
+        most recent N of the range.
+        """
+        lo = bisect_left(self.dates, (since,)) if since else 0
+        hi = bisect_right(self.dates, (until, len(self.headings))) if until else len(self.dates)
+        if last is not None:
+            lo = max(lo, hi - last)
+        return self.dates[lo:hi]
+
+    def section_range(self, index: int) -> Tuple[int, int]:
+        """Byte range of a heading and its body, up to the next heading of the same or higher level."""
+        level, _, _, start = self.headings[index]
+        for other_level, _, _, offset in self.headings[index + 1:]:
+            if other_level <= level:
+                return start, offset
+        return start, self.size
+
+    def read_section(self, index: int) -> str:
+        """Read one section with a single seek, without trailing blank lines or rule."""
+        return trim_section(self.read_text(*self.section_range(index)))
+
+    def read_text(self, start: int, end: int) -> str:
+        """Bytes [start, end) of the file, decoded."""
+        with open(self.path, "rb") as f:
+            f.seek(start)
+            return f.read(end - start).decode("utf-8")
+
+    def search_lines(self, query: str) -> List[int]:
+        """0-based lines containing ``query`` (case-insensitive), each once."""
+        # UTF-8 is self-synchronising, so a byte match is a character match
+        needle = query.lower().encode("utf-8")
+        if b"\n" in needle:
+            return []
+        index = self.search_index
+        lower, offsets = index.lower, index.lower_offsets
+        hits = []
+        position = lower.find(needle)
+        while position != -1:
+            line = bisect_right(offsets, position) - 1
+            hits.append(line)
+            position = lower.find(needle, offsets[line + 1])
+        return hits
+
+    def read_ranges(self, ranges: Iterable[Tuple[int, int]]) -> List[List[str]]:
+        """Lines [start, end) of the file for each range, from one mmap."""
+        offsets = self.search_index.line_offsets
+        line_count = self.line_count
+        ranges = [(max(0, start), min(line_count, end)) for start, end in ranges]
+        with open(self.path, "rb") as f:
+            if self.size == 0:
+                return [[""] if start < end else [] for start, end in ranges]
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                return [mapped[offsets[start]:offsets[end] - 1].decode("utf-8").split("\n")
+                        if start < end else [] for start, end in ranges]
+
+    def read_lines(self, start: int, end: int) -> List[str]:
+        """Lines [start, end) of the file, sliced from an mmap by byte offset."""
+        return self.read_ranges([(start, end)])[0]
+
+    def to_bytes(self) -> bytes:
+        return marshal.dumps((SNAPSHOT_VERSION, str(self.path), self.key, self.headings, self.sections,
+                              self.dates, self.line_count))
+
+    @classmethod
+    def from_bytes(cls, blob: bytes) -> Optional["MemorySnapshot"]:
+        try:
+            version, path, key, headings, sections, dates, line_count = marshal.loads(blob)
+        except (EOFError, ValueError, TypeError):
+            return None
+        if version != SNAPSHOT_VERSION:
+            return None
+        return cls(Path(path), tuple(key), headings, sections, dates, line_count)
+
+
+def cache_dir() -> Path:
+    """$MEMORY_CACHE_DIR if set, else .cache/scripts/memory."""
+    override = os.environ.get(CACHE_DIR_ENV)
+    return Path(override) if override else SNAPSHOT_DIR
+
+
+def snapshot_path(memory_file: Path) -> Path:
+    """Where the snapshot of a given memory file is kept."""
+    resolved = str(Path(memory_file).resolve())
+    digest = hashlib.blake2b(resolved.encode("utf-8"), digest_size=8).hexdigest()
+    return cache_dir() / f"{Path(memory_file).stem}-{digest}.snapshot"
+
+
+def search_path(memory_file: Path) -> Path:
+    return snapshot_path(memory_file).with_suffix(".search")
+
+
+def remove_cache(target: Path) -> None:
+    """Delete every cache file sharing the stem of ``target``."""
+    for suffix in CACHE_SUFFIXES:
+        try:
+            target.with_suffix(suffix).unlink()
+        except OSError:
+            pass
+
+
+def prune_cache(directory: Path, keep: Optional[Path] = None) -> None:
+    """Drop entries whose memory file is gone or whose format is stale, then the oldest beyond the limit."""
+    try:
+        entries = sorted(os.scandir(directory), key=lambda e: e.stat().st_mtime_ns, reverse=True)
+    except OSError:
+        return
+    live = set()
+    for entry in entries:
+        target = Path(entry.path)
+        if target.suffix != ".snapshot" or target == keep:
+            continue
+        try:
+            snapshot = MemorySnapshot.from_bytes(target.read_bytes())
+        except OSError:
+            snapshot = None
+        if snapshot is None or not snapshot.path.exists() or len(live) >= SNAPSHOT_LIMIT - 1:
+            remove_cache(target)
+        else:
+            live.add(target.stem)
+    if keep is not None:
+        live.add(keep.stem)
+    for entry in entries:
+        # Side files left behind by a snapshot that is gone
+        target = Path(entry.path)
+        if target.suffix in CACHE_SUFFIXES and target.stem not in live:
+            remove_cache(target)
+
+
+def _save(snapshot: MemorySnapshot, target: Path) -> None:
+    """Write the snapshot (and its search index, if loaded) together."""
+    try:
+        new_entry = not target.exists()
+        target.parent.mkdir(parents=True, exist_ok=True)
+        with WriteBatch(durable=False) as batch:
+            batch.stage(target, snapshot.to_bytes())
+            if snapshot._search is not None:
+                batch.stage(target.with_suffix(".search"), snapshot._search.to_bytes(snapshot.key[2]))
+    except OSError:
+        return  # A cache that cannot be written only costs the next call a re-parse
+    if new_entry:
+        prune_cache(target.parent, keep=target)
+
+
+def load_snapshot(memory_file: Path) -> MemorySnapshot:
+    """Return a snapshot matching the file on disk, re-parsing only if stale."""
+    memory_file = Path(memory_file)
+    target = snapshot_path(memory_file)
+    st = os.stat(memory_file)
+    snapshot = None
+    try:
+        snapshot = MemorySnapshot.from_bytes(target.read_bytes())
+    except OSError:
+        pass
+    if snapshot is not None and snapshot.path == memory_file.resolve():
+        mtime_ns, size, digest = snapshot.key
+        if st.st_mtime_ns == mtime_ns and st.st_size == size:
+            return snapshot
+        if st.st_size == size:
+            data = memory_file.read_bytes()
+            if content_hash(data) == digest:
+                # Same content: only the key moves, the search index stays valid
+                snapshot.key = (st.st_mtime_ns, size, digest)
+                _save(snapshot, target)
+                return snapshot
+    data = memory_file.read_bytes()
+    snapshot = MemorySnapshot.parse(memory_file.resolve(), data, st.st_mtime_ns)
+    _save(snapshot, target)
+    return snapshot
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Bounded read -> transform -> write pipeline for the scripts/ tools.
+
+A reader thread prefetches files, the transform runs in the calling thread
+or on an executor (e.g. a process pool), and a writer thread hands changed
+content to a ``write`` callable (typically ``WriteBatch.stage``). Each hop
+is a bounded queue, so at most about three times ``depth`` documents are in
+memory and disk latency overlaps with CPU work.
+"""
+
+import queue
+import threading
+from collections import deque
+from concurrent.futures import Executor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, Optional, Tuple
+
+from _profiling import phase
+
+
+_DONE = object()
+
+
+@dataclass
+class PipelineResult:
+    """One file's trip through the pipeline, yielded in input order."""
+
+    path: Path
+    text: Optional[str] = None
+    output: Optional[Tuple[str, Any]] = None
+    error: Optional[BaseException] = None
+
+    @property
+    def changed(self) -> bool:
+        return self.output is not None and self.output[0] != self.text
+
+
+def _put(q: "queue.Queue", item, stop: threading.Event) -> bool:
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _reader(paths: Iterable[Path], out: "queue.Queue", stop: threading.Event) -> None:
+    for path in paths:
+        try:
+            with phase("read"):
+                item = PipelineResult(Path(path), text=Path(path).read_text(encoding="utf-8"))
+        except (OSError, UnicodeDecodeError) as e:
+            item = PipelineResult(Path(path), error=e)
+        if not _put(out, item, stop):
+            return
+    _put(out, _DONE, stop)
+
+
+def _writer(inbox: "queue.Queue", write: Callable[[Path, str], None],
+            failures: list) -> None:
+    while True:
+        item = inbox.get()
+        if item is _DONE:
+            return
+        if failures:
+            continue  # Keep draining so the producer never blocks
+        try:
+            write(*item)
+        except BaseException as e:
+            failures.append(e)
+
+
+def run_pipeline(paths: Iterable[Path], transform: Callable[[str], Tuple[str, Any]],
+                 write: Callable[[Path, str], None], depth: int = 32,
+                 executor: Optional[Executor] = None) -> Iterator[PipelineResult]:
+    """Read, transform and write files with bounded overlap between the stages.
+
+    ``transform(text)`` returns ``(new_text, extra)``; only files whose text
+    changed are passed to ``write``. With an ``executor``, up to ``depth``
+    transforms run concurrently (it must be able to pickle ``transform`` if it
+    is a process pool). Results are yielded in input order; a write failure is
+    re-raised once the pipeline has drained.
+    """
+    stop = threading.Event()
+    reads: "queue.Queue" = queue.Queue(maxsize=depth)
+    writes: "queue.Queue" = queue.Queue(maxsize=depth)
+    failures: list = []
+    reader = threading.Thread(target=_reader, args=(paths, reads, stop),
+                              name="pipeline-reader", daemon=True)
+    writer = threading.Thread(target=_writer, args=(writes, write, failures),
+                              name="pipeline-writer", daemon=True)
+    reader.start()
+    writer.start()
+
+    in_flight: deque = deque()
+
+    def finish(item: PipelineResult, future=None) -> PipelineResult:
+        if item.error is None:
+            try:
+                with phase("transform"):
+                    item.output = future.result() if future is not None else transform(item.text)
+            except Exception as e:
+                item.error = e
+        if item.changed:
+            writes.put((item.path, item.output[0]))
+        return item
+
+    try:
+        while True:
+            item = reads.get()
+            if item is _DONE:
+                break
+            if executor is None:
+                yield finish(item)
+                continue
+            future = executor.submit(transform, item.text) if item.error is None else None
+            in_flight.append((item, future))
+            if len(in_flight) >= depth:
+                yield finish(*in_flight.popleft())
+        while in_flight:
+            yield finish(*in_flight.popleft())
+    finally:
+        stop.set()
+        for _, future in in_flight:
+            if future is not None:
+                future.cancel()
+        writes.put(_DONE)
+        writer.join()
+    if failures:
+        raise failures[0]
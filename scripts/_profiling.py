@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Opt-in profiling for the scripts/ tools.
+
+Entry points run through ``run_main(main)``, which takes two flags out of
+sys.argv before the script parses its own arguments:
+
+  --profile[=PATH]  cProfile the run and write PATH (pstats, default
+                    .cache/scripts/profiles/<script>-<time>.pstats) plus
+                    PATH.collapsed: wall-clock stack samples of every thread
+                    in the "frame;frame;frame count" format flamegraph.pl,
+                    inferno and speedscope read
+  --trace-timings   print per-phase wall time (startup, discovery, read,
+                    transform, write) to stderr when the script exits
+
+Code marks its phases with ``with phase("read"): ...``, which costs one
+global lookup when neither flag is given. Only the ``--profile[=PATH]`` form
+is recognised (never ``--profile PATH``), so a following file argument is
+not taken for the output path. The pstats cover the main thread; worker
+processes (``--jobs``) are not profiled.
+"""
+
+import cProfile
+import os
+import signal
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+SAMPLE_INTERVAL = 0.002
+PHASES = ("startup", "discovery", "read", "transform", "write")
+
+
+class _NullPhase:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_PHASE = _NullPhase()
+_session: Optional["ProfileSession"] = None
+_open_phases = threading.local()
+
+
+class _Phase:
+    __slots__ = ("session", "name", "start")
+
+    def __init__(self, session: "ProfileSession", name: str):
+        self.session = session
+        self.name = name
+
+    def __enter__(self):
+        _open_phases.names.add(self.name)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.session.add_phase(self.name, time.perf_counter() - self.start)
+        _open_phases.names.discard(self.name)
+        return False
+
+
+def phase(name: str):
+    """Context manager timing one phase of the run (a no-op unless tracing).
+
+    A phase nested in one of the same name (on the same thread) is not
+    counted again.
+    """
+    session = _session
+    if session is None or not session.trace_timings:
+        return _NULL_PHASE
+    if not hasattr(_open_phases, "names"):
+        _open_phases.names = set()
+    elif name in _open_phases.names:
+        return _NULL_PHASE
+    return _Phase(session, name)
+
+
+def _process_age() -> Optional[float]:
+    """Seconds since this process started (Linux), i.e. interpreter startup and imports."""
+    try:
+        with open("/proc/self/stat") as f:
+            stat = f.read()
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+        started = int(stat.rsplit(")", 1)[1].split()[19]) / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError):
+        return None
+    return max(0.0, uptime - started)
+
+
+def _frame_label(code) -> str:
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class StackSampler:
+    """Count wall-clock stack samples of every thread on a SIGALRM interval timer."""
+
+    def __init__(self, interval: float = SAMPLE_INTERVAL):
+        self.interval = interval
+        self.counts: Counter = Counter()
+
+    @staticmethod
+    def available() -> bool:
+        return hasattr(signal, "setitimer") and threading.current_thread() is threading.main_thread()
+
+    def start(self) -> None:
+        signal.signal(signal.SIGALRM, self._sample)
+        signal.setitimer(signal.ITIMER_REAL, self.interval, self.interval)
+
+    def stop(self) -> None:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, signal.SIG_DFL)
+
+    def _sample(self, signum, frame) -> None:
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        me = threading.get_ident()
+        for ident, top in sys._current_frames().items():
+            # The main thread's current frame is this handler; use the interrupted one
+            top = frame if ident == me else top
+            stack = []
+            while top is not None:
+                stack.append(_frame_label(top.f_code))
+                top = top.f_back
+            stack.append(names.get(ident, f"thread-{ident}"))
+            self.counts[";".join(reversed(stack))] += 1
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in sorted(self.counts.items()))
+
+
+class ProfileSession:
+    """The profiler, stack sampler and phase timings of one script run."""
+
+    def __init__(self, script: str, profile_path: Optional[Path] = None,
+                 trace_timings: bool = False):
+        self.script = script
+        self.profile_path = profile_path
+        self.trace_timings = trace_timings
+        self.phases: Dict[str, float] = {}
+        self.calls: Counter = Counter()
+        self._lock = threading.Lock()
+        self._profiler: Optional[cProfile.Profile] = None
+        self._sampler: Optional[StackSampler] = None
+        self._startup = _process_age()
+        self._start = time.perf_counter()
+
+    def add_phase(self, name: str, seconds: float) -> None:
+        with self._lock:
+            self.phases[name] = self.phases.get(name, 0.0) + seconds
+            self.calls[name] += 1
+
+    def start(self) -> None:
+        if self.profile_path is not None:
+            if StackSampler.available():
+                self._sampler = StackSampler()
+                self._sampler.start()
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+
+    def stop(self) -> None:
+        if self._profiler is not None:
+            self._profiler.disable()
+        if self._sampler is not None:
+            self._sampler.stop()
+        elapsed = time.perf_counter() - self._start
+        if self._profiler is not None:
+            self._write_profile()
+        if self.trace_timings:
+            self._print_timings(elapsed)
+
+    def _write_profile(self) -> None:
+        path = self.profile_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._profiler.dump_stats(str(path))
+        print(f"📈 Profile written to {path} (python -m pstats {path})", file=sys.stderr)
+        if self._sampler is not None:
+            collapsed = path.with_name(path.name + ".collapsed")
+            collapsed.write_text(self._sampler.collapsed(), encoding="utf-8")
+            print(f"🔥 Collapsed stacks written to {collapsed} (flamegraph.pl {collapsed} > flame.svg)",
+                  file=sys.stderr)
+
+    def _print_timings(self, elapsed: float) -> None:
+        rows: List[Tuple[str, float, int]] = []
+        if self._startup is not None:
+            rows.append(("startup", self._startup, 1))
+        named = list(PHASES) + sorted(set(self.phases) - set(PHASES))
+        rows.extend((name, self.phases[name], self.calls[name]) for name in named if name in self.phases)
+        total = max(elapsed + (self._startup or 0.0), 1e-9)
+        print(f"\n⏱️  Phase timings ({self.script}, {total:.3f}s wall)", file=sys.stderr)
+        for name, seconds, calls in rows:
+            print(f"  {name:<12} {seconds:9.4f}s {calls:7}x  {seconds / total:6.1%}", file=sys.stderr)
+        accounted = (self._startup or 0.0) + sum(self.phases.values())
+        print(f"  {'other':<12} {max(0.0, total - accounted):9.4f}s"
+              f"{'   (threaded phases overlap)' if accounted > total else ''}", file=sys.stderr)
+
+
+def pop_profiling_args(argv: List[str]) -> Tuple[Optional[Path], bool]:
+    """Remove --profile[=PATH] / --trace-timings from ``argv`` (before any ``--``).
+
+    Returns the profile output path (None if not profiling) and whether to
+    trace phase timings.
+    """
+    profile: Optional[Path] = None
+    trace = False
+    script = Path(argv[0]).stem if argv else "python"
+    kept = argv[:1]
+    rest = argv[1:]
+    for i, arg in enumerate(rest):
+        if arg == "--":
+            kept.extend(rest[i:])
+            break
+        if arg == "--profile":
+            from _discovery import CACHE_DIR
+            stamp = time.strftime("%Y%m%d-%H%M%S")
+            profile = CACHE_DIR / "profiles" / f"{script}-{stamp}-{os.getpid()}.pstats"
+        elif arg.startswith("--profile="):
+            profile = Path(arg.split("=", 1)[1])
+        elif arg == "--trace-timings":
+            trace = True
+        else:
+            kept.append(arg)
+    argv[:] = kept
+    return profile, trace
+
+
+def add_profiling_arguments(parser) -> None:
+    """Document the flags ``run_main`` handles in an argparse --help."""
+    group = parser.add_argument_group("profiling")
+    group.add_argument("--profile", metavar="=PATH", nargs="?",
+                       help="Write cProfile stats to PATH and flamegraph-ready collapsed stacks "
+                            "to PATH.collapsed (default under .cache/scripts/profiles)")
+    group.add_argument("--trace-timings", action="store_true",
+                       help="Print per-phase timings (startup, discovery, read, transform, write) to stderr")
+
+
+def run_main(main: Callable[[], None]) -> None:
+    """Run a script's main(), profiled and/or timed if its flags ask for it."""
+    global _session
+    profile_path, trace = pop_profiling_args(sys.argv)
+    if profile_path is None and not trace:
+        main()
+        return
+    _session = ProfileSession(Path(sys.argv[0]).name, profile_path, trace)
+    _session.start()
+    try:
+        main()
+    finally:
+        session, _session = _session, None
+        session.stop()
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+File change watching for the scripts/ tools (``--watch`` modes).
+
+On Linux the kernel's inotify API is used directly through ctypes, so no
+third-party package is needed. Everywhere else (or if inotify is
+unavailable) a stdlib polling watcher stats the files it already knows and
+only lists directories whose mtime changed. Neither watcher rescans the tree
+after the initial walk.
+"""
+
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from _discovery import ALWAYS_PRUNED
+
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+_WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE_SELF
+_EVENT = struct.Struct("iIII")
+
+
+def _walk_dirs(root: Path) -> Iterator[Tuple[Path, List[str]]]:
+    """Yield (directory, file names), skipping hidden and always-pruned dirs."""
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames
+                             if d not in ALWAYS_PRUNED and not d.startswith("."))
+        yield Path(dirpath), filenames
+
+
+def _wanted(name: str, suffix: str) -> bool:
+    # Hidden names include the temp siblings WriteBatch swaps into place
+    return name.endswith(suffix) and not name.startswith(".")
+
+
+class InotifyWatcher:
+    """Watch directory trees with inotify (Linux only)."""
+
+    def __init__(self, roots: Iterable[Path], suffix: str = ".md"):
+        self.suffix = suffix
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or None, use_errno=True)
+        self._fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._dirs: Dict[int, Path] = {}
+        self.initial: Set[Path] = set()
+        for root in roots:
+            self.initial |= self._add_tree(Path(root))
+
+    def _add_tree(self, root: Path) -> Set[Path]:
+        """Watch every directory under ``root``; return the files already there."""
+        found = set()
+        for directory, filenames in _walk_dirs(root):
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), _WATCH_MASK)
+            if wd < 0:
+                err = ctypes.get_errno()
+                if err == errno.ENOSPC:
+                    raise OSError(err, "inotify watch limit reached "
+                                       "(fs.inotify.max_user_watches)")
+                continue  # Directory vanished while walking
+            self._dirs[wd] = directory
+            found.update(directory / name for name in filenames if _wanted(name, self.suffix))
+        return found
+
+    def wait(self, timeout: Optional[float] = None) -> Set[Path]:
+        """Block up to ``timeout`` seconds and return the files that changed."""
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return set()
+        changed: Set[Path] = set()
+        while True:
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = _EVENT.unpack_from(data, offset)
+                offset += _EVENT.size
+                name = data[offset:offset + length].rstrip(b"\0").decode(sys.getfilesystemencoding(), "surrogateescape")
+                offset += length
+                self._handle(wd, mask, name, changed)
+        return changed
+
+    def _handle(self, wd: int, mask: int, name: str, changed: Set[Path]) -> None:
+        if mask & IN_Q_OVERFLOW:
+            # Events were dropped; the watched directories are the only safe rescan
+            for directory in list(self._dirs.values()):
+                changed.update(p for p in directory.iterdir()
+                               if p.is_file() and _wanted(p.name, self.suffix))
+            return
+        if mask & (IN_IGNORED | IN_DELETE_SELF):
+            self._dirs.pop(wd, None)
+            return
+        directory = self._dirs.get(wd)
+        if directory is None:
+            return
+        if mask & IN_ISDIR:
+            if mask & (IN_CREATE | IN_MOVED_TO) and name not in ALWAYS_PRUNED \
+                    and not name.startswith("."):
+                changed |= self._add_tree(directory / name)
+        elif mask & (IN_CLOSE_WRITE | IN_MOVED_TO) and _wanted(name, self.suffix):
+            changed.add(directory / name)
+
+    def close(self) -> None:
+        os.close(self._fd)
+
+
+class PollingWatcher:
+    """Portable fallback: stat known files, list only directories that changed."""
+
+    def __init__(self, roots: Iterable[Path], suffix: str = ".md", interval: float = 0.5):
+        self.suffix = suffix
+        self.interval = interval
+        self._files: Dict[Path, Tuple[int, int]] = {}
+        self._dirs: Dict[Path, int] = {}
+        self.initial: Set[Path] = set()
+        for root in roots:
+            self.initial |= self._add_tree(Path(root))
+
+    def _add_tree(self, root: Path) -> Set[Path]:
+        found = set()
+        for directory, filenames in _walk_dirs(root):
+            try:
+                self._dirs[directory] = directory.stat().st_mtime_ns
+            except OSError:
+                continue
+            for name in filenames:
+                if _wanted(name, self.suffix):
+                    path = directory / name
+                    self._track(path)
+                    found.add(path)
+        return found
+
+    def _track(self, path: Path) -> Optional[Tuple[int, int]]:
+        try:
+            st = path.stat()
+        except OSError:
+            self._files.pop(path, None)
+            return None
+        self._files[path] = (st.st_mtime_ns, st.st_size)
+        return self._files[path]
+
+    def poll(self) -> Set[Path]:
+        """Check once for changes."""
+        changed = set()
+        for path, previous in list(self._files.items()):
+            current = self._track(path)
+            if current is not None and current != previous:
+                changed.add(path)
+        for directory, previous in list(self._dirs.items()):
+            try:
+                mtime = directory.stat().st_mtime_ns
+            except OSError:
+                del self._dirs[directory]
+                continue
+            if mtime == previous:
+                continue
+            self._dirs[directory] = mtime
+            # Only a directory whose entries changed is listed again
+            for entry in os.scandir(directory):
+                path = Path(entry.path)
+                if entry.is_dir():
+                    if path not in self._dirs and entry.name not in ALWAYS_PRUNED \
+                            and not entry.name.startswith("."):
+                        changed |= self._add_tree(path)
+                elif path not in self._files and _wanted(entry.name, self.suffix):
+                    self._track(path)
+                    changed.add(path)
+        return changed
+
+    def wait(self, timeout: Optional[float] = None) -> Set[Path]:
+        """Poll until something changes or ``timeout`` seconds have passed."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            time.sleep(self.interval if remaining is None else max(0.0, min(self.interval, remaining)))
+            changed = self.poll()
+            if changed or (deadline is not None and time.monotonic() >= deadline):
+                return changed
+
+    def close(self) -> None:
+        pass
+
+
+def open_watcher(roots: Iterable[Path], suffix: str = ".md", polling: bool = False):
+    """Return an inotify watcher where possible, otherwise a polling watcher."""
+    roots = list(roots)
+    if not polling and sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(roots, suffix)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(roots, suffix)
+
+
+def debounced(watcher, quiet: float = 0.2) -> Iterator[Set[Path]]:
+    """Yield bursts of changed files once no new change arrived for ``quiet`` seconds."""
+    while True:
+        changed = watcher.wait(None)
+        while changed:
+            more = watcher.wait(quiet)
+            if not more:
+                break
+            changed |= more
+        if changed:
+            yield changed
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Atomic, batched file write-back shared by the scripts/ tools.
+
+A ``WriteBatch`` stages every rewritten file as a temp sibling, fsyncs the
+staged files once when the batch commits, then swaps each one into place
+with ``os.replace`` and fsyncs each touched directory once. The original
+files are kept as hard-linked backups until the batch is finalized, so a
+failed or unwanted batch can be rolled back as a whole. An interrupted run
+never leaves a truncated file behind.
+"""
+
+import itertools
+import os
+import shutil
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+from _profiling import phase
+
+
+_counter = itertools.count()
+
+
+def _sibling(path: Path, suffix: str) -> Path:
+    return path.with_name(f".{path.name}.{os.getpid()}-{next(_counter)}.{suffix}")
+
+
+def _fsync_dir(directory: Path) -> None:
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return  # Directories cannot be opened on some platforms (Windows)
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class WriteBatch:
+    """Stage several file rewrites and swap them in together.
+
+    Used as a context manager the batch commits and finalizes on a clean
+    exit, and discards or rolls back everything if the block raises::
+
+        with WriteBatch() as batch:
+            batch.stage(path, new_text)
+    """
+
+    def __init__(self, durable: bool = True):
+        self.durable = durable
+        self._staged: Dict[Path, Path] = {}
+        self._backups: Dict[Path, Optional[Path]] = {}
+        self.committed: List[Path] = []
+
+    def __enter__(self) -> "WriteBatch":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        if exc_type is None:
+            self.commit()
+            self.finalize()
+        elif self.committed:
+            self.rollback()
+        else:
+            self.discard()
+        return False
+
+    def __len__(self) -> int:
+        return len(self._staged)
+
+    def stage(self, path: Union[str, Path], content: Union[str, bytes],
+              encoding: str = "utf-8") -> None:
+        """Write ``content`` to a temp sibling of ``path`` (not yet visible)."""
+        with phase("write"):
+            path = Path(path)
+            data = content.encode(encoding) if isinstance(content, str) else content
+            previous = self._staged.pop(path, None)
+            if previous is not None:
+                previous.unlink(missing_ok=True)
+            temp = _sibling(path, "tmp")
+            fd = os.open(temp, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(data)
+                try:
+                    os.chmod(temp, os.stat(path).st_mode & 0o7777)
+                except FileNotFoundError:
+                    pass
+            except BaseException:
+                temp.unlink(missing_ok=True)
+                raise
+            self._staged[path] = temp
+
+    def commit(self) -> List[Path]:
+        """Make every staged file durable, then swap them all into place.
+
+        If any swap fails, the files already swapped are restored and the
+        error is re-raised.
+        """
+        with phase("write"):
+            return self._commit()
+
+    def _commit(self) -> List[Path]:
+        if self.durable:
+            for temp in self._staged.values():
+                fd = os.open(temp, os.O_RDONLY)
+                try:
+                    os.fsync(fd)
+                finally:
+                    os.close(fd)
+
+        directories = set()
+        try:
+            for path, temp in list(self._staged.items()):
+                backup = None
+                if path.exists():
+                    backup = _sibling(path, "bak")
+                    try:
+                        os.link(path, backup)
+                    except OSError:
+                        shutil.copy2(path, backup)
+                self._backups[path] = backup
+                os.replace(temp, path)
+                del self._staged[path]
+                self.committed.append(path)
+                directories.add(path.parent)
+        except BaseException:
+            self.rollback()
+            raise
+
+        if self.durable:
+            for directory in directories:
+                _fsync_dir(directory)
+        return list(self.committed)
+
+    def rollback(self) -> None:
+        """Restore every file this batch replaced and drop anything still staged."""
+        for path in reversed(self.committed):
+            backup = self._backups.pop(path, None)
+            if backup is not None:
+                os.replace(backup, path)
+            else:
+                path.unlink(missing_ok=True)
+        for path, backup in self._backups.items():
+            if backup is not None:
+                backup.unlink(missing_ok=True)
+        self._backups.clear()
+        self.committed.clear()
+        self.discard()
+
+    def discard(self) -> None:
+        """Remove staged temp files without touching the originals."""
+        for temp in self._staged.values():
+            temp.unlink(missing_ok=True)
+        self._staged.clear()
+
+    def finalize(self) -> None:
+        """Delete the backups of a committed batch; it can no longer roll back."""
+        for backup in self._backups.values():
+            if backup is not None:
+                backup.unlink(missing_ok=True)
+        self._backups.clear()
+
+
+def write_text_atomic(path: Union[str, Path], content: str,
+                      encoding: str = "utf-8", durable: bool = True) -> None:
+    """Replace a single file atomically."""
+    with WriteBatch(durable=durable) as batch:
+        batch.stage(path, content, encoding)
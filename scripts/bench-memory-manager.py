@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Memory Manager Benchmark
+
+Purpose: Measure how every memory-manager.py command scales with the size of memory.md
+Usage: python scripts/bench-memory-manager.py [--sizes 1000,10000,...] [--rounds N] [--no-cli] [--json PATH]
+
+Synthetic memory files are generated in the real shape (`## emoji **Category**`
+headings, `### **Name**` sections, repeated dated session sections) at each
+size, then every operation is timed:
+
+- in-process: calling MemoryManager methods directly
+- cli: a fresh `memory-manager.py --file PATH <command>` process, as hooks run it
+
+Mutating commands (add, update, timestamp, dedupe) restore the file before each round.
+An operation is flagged as super-linear when its in-process cost between two
+sizes grows with an exponent above --max-exponent (1.0 is linear). CLI times
+are also reported above the interpreter startup baseline (a bare
+`memory-manager.py` call), which is too noisy to judge growth on.
+"""
+
+import argparse
+import contextlib
+import importlib.util
+import io
+import json
+import math
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from _memory_snapshot import CACHE_DIR_ENV
+
+
+SCRIPTS_DIR = Path(__file__).parent
+MEMORY_MANAGER = SCRIPTS_DIR / "memory-manager.py"
+
+CATEGORIES = ["🧠", "🎯", "📚", "🔧", "🚀", "📝", "🔍"]
+TOPICS = ["Steam", "CI/CD", "PNPM", "Playwright", "PixiJS", "Dexie", "Workbox", "SvelteKit",
+          "TypeScript", "Web Workers", "markdownlint", "determinism", "save migration"]
+TARGET_SECTION = "Benchmark Target"
+SEARCH_QUERY = "steam"
+RELATED_QUERY = "slow playwright workflow"
+
+
+def load_memory_manager():
+    """Import MemoryManager from memory-manager.py."""
+    spec = importlib.util.spec_from_file_location("memory_manager", MEMORY_MANAGER)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.MemoryManager
+
+
+def _section(rng: random.Random, name: str) -> List[str]:
+    lines = [f"### **{name}**", ""]
+    for _ in range(rng.randint(3, 10)):
+        topic = rng.choice(TOPICS)
+        lines.append(f"- **{topic}**: {rng.choice(['Fixed', 'Investigated', 'Documented'])} "
+                     f"{topic.lower()} {rng.choice(['issues', 'setup', 'performance', 'workflow'])}")
+        lines.append("")
+    return lines
+
+
+def generate_memory(lines: int, seed: int = 0) -> str:
+    """Generate a memory.md of about ``lines`` lines in the real section shape."""
+    rng = random.Random(seed)
+    out = ["# Draconia Chronicles - AI Memory System", "",
+           "**Purpose**: File-based memory system for AI assistant", "",
+           "**Last Updated**: 2025-01-15", "**Version**: 1.0.0", "", "---", ""]
+    day = 0
+    target_at = lines // 2
+    while len(out) < lines:
+        out.extend([f"## {rng.choice(CATEGORIES)} **Category {len(out)}**", ""])
+        for _ in range(rng.randint(2, 6)):
+            if target_at is not None and len(out) >= target_at:
+                out.extend(_section(rng, TARGET_SECTION))
+                target_at = None
+            day += 1
+            name = (f"Session {day} ({2025 + day // 365}-{day // 28 % 12 + 1:02d}-{day % 28 + 1:02d})"
+                    if rng.random() < 0.7 else f"Notes {day}")
+            out.extend(_section(rng, name))
+        out.extend(["---", ""])
+    return "\n".join(out[:lines]) + "\n"
+
+
+# name -> (in-process call, CLI arguments)
+OPERATIONS: Dict[str, Tuple[Callable, List[str]]] = {
+    "read": (lambda m: m.read(), ["read"]),
+    "search": (lambda m: m.search(SEARCH_QUERY), ["search", SEARCH_QUERY]),
+    "sections": (lambda m: m.list_sections(), ["sections"]),
+    "related": (lambda m: m.related(RELATED_QUERY), ["related", RELATED_QUERY]),
+    "sessions": (lambda m: m.sessions(last=5), ["sessions", "--last", "5"]),
+    "add": (lambda m: m.add(TARGET_SECTION, "- **Bench**: added line"),
+            ["add", TARGET_SECTION, "- **Bench**: added line"]),
+    "update": (lambda m: m.update(TARGET_SECTION, "- **Bench**: replaced"),
+               ["update", TARGET_SECTION, "- **Bench**: replaced"]),
+    "timestamp": (lambda m: m.update_timestamp(), ["timestamp"]),
+    "dedupe": (lambda m: m.dedupe(), ["dedupe"]),
+}
+MUTATING = {"add", "update", "timestamp", "dedupe"}
+
+
+def time_in_process(manager_class, path: Path, operation: str, original: str,
+                    rounds: int) -> List[float]:
+    call, _ = OPERATIONS[operation]
+    timings = []
+    for _ in range(rounds):
+        if operation in MUTATING:
+            path.write_text(original, encoding="utf-8")
+        manager = manager_class(path)
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            call(manager)
+            timings.append(time.perf_counter() - start)
+    return timings
+
+
+def time_cli(path: Path, operation: Optional[str], original: str, rounds: int) -> List[float]:
+    """Time a CLI call; ``operation`` None times the bare startup (usage text)."""
+    arguments = OPERATIONS[operation][1] if operation else []
+    command = [sys.executable, str(MEMORY_MANAGER), "--file", str(path)] + arguments
+    timings = []
+    for _ in range(rounds):
+        if operation in MUTATING:
+            path.write_text(original, encoding="utf-8")
+        start = time.perf_counter()
+        subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def growth_exponents(sizes: List[int], seconds: List[float]) -> List[float]:
+    """log(t2/t1) / log(n2/n1) between consecutive sizes (1.0 is linear)."""
+    exponents = []
+    for (n1, t1), (n2, t2) in zip(zip(sizes, seconds), zip(sizes[1:], seconds[1:])):
+        exponents.append(math.log(t2 / t1) / math.log(n2 / n1) if t1 > 0 and t2 > 0 else 0.0)
+    return exponents
+
+
+def run(sizes: List[int], rounds: int, cli_rounds: int, directory: Path,
+        operations: List[str], seed: int) -> Dict[str, Dict[str, dict]]:
+    """Time every operation at every size; results[mode][operation] holds the series."""
+    manager_class = load_memory_manager()
+    modes = {"in-process": rounds}
+    if cli_rounds > 0:
+        modes["cli"] = cli_rounds
+    results: Dict[str, Dict[str, dict]] = {mode: {op: {"sizes": [], "median_s": [], "min_s": []}
+                                                   for op in operations} for mode in modes}
+    startup = min(time_cli(directory / "missing.md", None, "", max(cli_rounds, 3))) if cli_rounds else 0.0
+    for size in sizes:
+        original = generate_memory(size, seed)
+        path = directory / f"memory-{size}.md"
+        path.write_text(original, encoding="utf-8")
+        print(f"  {size:>9,} lines ({len(original) / 1e6:.1f} MB)", flush=True)
+        for mode, mode_rounds in modes.items():
+            for operation in operations:
+                if mode == "cli":
+                    timings = time_cli(path, operation, original, mode_rounds)
+                else:
+                    timings = time_in_process(manager_class, path, operation, original, mode_rounds)
+                series = results[mode][operation]
+                series["sizes"].append(size)
+                series["median_s"].append(statistics.median(timings))
+                series["min_s"].append(min(timings))
+                if mode == "cli":
+                    series.setdefault("over_startup_s", []).append(max(0.0, min(timings) - startup))
+        path.unlink()
+    if cli_rounds:
+        results["cli"]["startup_s"] = startup
+    return results
+
+
+def flag_super_linear(results: Dict[str, Dict[str, dict]], max_exponent: float,
+                      floor: float) -> List[Tuple[str, float]]:
+    """Annotate the in-process series with growth exponents; return (op, exponent) flagged."""
+    flagged = []
+    for operation, series in results["in-process"].items():
+        exponents = growth_exponents(series["sizes"], series["min_s"])
+        series["exponents"] = exponents
+        # Steps still below the floor are dominated by constant overheads
+        worst = max((e for e, t in zip(exponents, series["min_s"][1:]) if t > floor), default=0.0)
+        series["super_linear"] = worst > max_exponent
+        if series["super_linear"]:
+            flagged.append((operation, worst))
+    return flagged
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Benchmark memory-manager.py across memory sizes")
+    parser.add_argument("--sizes", default="1000,10000,100000,1000000",
+                        help="Comma-separated line counts (default: 1000,10000,100000,1000000)")
+    parser.add_argument("--rounds", type=int, default=5, help="In-process rounds per operation (default: 5)")
+    parser.add_argument("--cli-rounds", type=int, default=3,
+                        help="CLI rounds per operation (default: 3)")
+    parser.add_argument("--no-cli", action="store_true", help="Skip the CLI timings")
+    parser.add_argument("--ops", help=f"Comma-separated operations (default: {','.join(OPERATIONS)})")
+    parser.add_argument("--max-exponent", type=float, default=1.3,
+                        help="Flag growth faster than size**N (default: 1.3)")
+    parser.add_argument("--seed", type=int, default=0, help="Generator seed (default: 0)")
+    parser.add_argument("--dir", help="Directory to benchmark in (default: a temp dir)")
+    parser.add_argument("--json", metavar="PATH", help="Also write results as JSON")
+    args = parser.parse_args()
+
+    sizes = sorted(int(size) for size in args.sizes.split(","))
+    operations = args.ops.split(",") if args.ops else list(OPERATIONS)
+    unknown = set(operations) - set(OPERATIONS)
+    if unknown:
+        parser.error(f"unknown operations: {', '.join(sorted(unknown))}")
+
+    print("⏱️  Memory Manager Benchmark")
+    print("=" * 60)
+    print(f"Sizes: {', '.join(f'{s:,}' for s in sizes)} lines  Rounds: {args.rounds}"
+          f"{'' if args.no_cli else f' (CLI {args.cli_rounds})'}")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory(dir=args.dir) as tmp:
+        # The synthetic files' snapshot caches go away with them (CLI runs inherit this)
+        os.environ[CACHE_DIR_ENV] = str(Path(tmp) / "cache")
+        results = run(sizes, args.rounds, 0 if args.no_cli else args.cli_rounds, Path(tmp),
+                      operations, args.seed)
+    flagged = flag_super_linear(results, args.max_exponent, floor=0.005)
+
+    print("\nin-process (min ms per size, growth exponent per step):")
+    for operation, series in results["in-process"].items():
+        marker = "❌" if series["super_linear"] else "✅"
+        times = " ".join(f"{t * 1000:10.2f}" for t in series["min_s"])
+        exponents = " ".join(f"{e:.2f}" for e in series["exponents"])
+        print(f"  {marker} {operation:<10} {times}   [{exponents}]")
+    if "cli" in results:
+        print(f"\ncli (min ms above {results['cli']['startup_s'] * 1000:.1f} ms startup, per size):")
+        for operation in operations:
+            times = " ".join(f"{t * 1000:10.2f}" for t in results["cli"][operation]["over_startup_s"])
+            print(f"     {operation:<10} {times}")
+
+    if args.json:
+        payload = {"sizes": sizes, "rounds": args.rounds,
+                   "cli_rounds": 0 if args.no_cli else args.cli_rounds,
+                   "max_exponent": args.max_exponent, "results": results,
+                   "super_linear": [{"operation": o, "exponent": e} for o, e in flagged]}
+        Path(args.json).write_text(json.dumps(payload, indent=2), encoding="utf-8")
+        print(f"\n📄 Results written to {args.json}")
+
+    if flagged:
+        print(f"\n❌ Super-linear: {', '.join(f'{o} (n^{e:.2f})' for o, e in flagged)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
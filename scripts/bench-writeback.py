@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Write-back Benchmark
+
+Purpose: Compare naive per-file writes with the batched atomic WriteBatch layer
+Usage: python scripts/bench-writeback.py [--files N] [--size BYTES] [--rounds N] [--json PATH]
+
+Strategies:
+- naive: open(..., 'w') per file, as the scripts used to do (not durable)
+- naive-fsync: open(..., 'w') plus fsync per file (durable, not atomic)
+- batch: WriteBatch with fsync at commit (durable and atomic, rollback-able)
+- batch-nosync: WriteBatch without fsync (atomic only)
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from _writeback import WriteBatch
+
+
+def naive(paths: List[Path], content: str) -> None:
+    for path in paths:
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+
+
+def naive_fsync(paths: List[Path], content: str) -> None:
+    for path in paths:
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+
+
+def batch(paths: List[Path], content: str) -> None:
+    with WriteBatch() as write_batch:
+        for path in paths:
+            write_batch.stage(path, content)
+
+
+def batch_nosync(paths: List[Path], content: str) -> None:
+    with WriteBatch(durable=False) as write_batch:
+        for path in paths:
+            write_batch.stage(path, content)
+
+
+STRATEGIES: Dict[str, Callable[[List[Path], str], None]] = {
+    "naive": naive,
+    "naive-fsync": naive_fsync,
+    "batch": batch,
+    "batch-nosync": batch_nosync,
+}
+
+
+def run(files: int, size: int, rounds: int, directory: Path) -> Dict[str, Dict[str, float]]:
+    """Time every strategy rewriting the same set of existing files."""
+    paths = [directory / f"doc-{i:04d}.md" for i in range(files)]
+    for path in paths:
+        path.write_text("x" * size, encoding='utf-8')
+
+    results = {}
+    for name, strategy in STRATEGIES.items():
+        timings = []
+        for round_number in range(rounds):
+            content = f"# round {round_number}\n" + "y" * size
+            start = time.perf_counter()
+            strategy(paths, content)
+            timings.append(time.perf_counter() - start)
+        results[name] = {
+            "median_s": statistics.median(timings),
+            "min_s": min(timings),
+            "per_file_ms": statistics.median(timings) / files * 1000,
+        }
+    leftovers = [p for p in directory.iterdir() if p.name.startswith('.')]
+    if leftovers:
+        print(f"⚠️  {len(leftovers)} temp/backup files left behind", file=sys.stderr)
+    return results
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Benchmark naive vs batched atomic writes")
+    parser.add_argument("--files", type=int, default=500, help="Number of files (default: 500)")
+    parser.add_argument("--size", type=int, default=4096, help="Bytes per file (default: 4096)")
+    parser.add_argument("--rounds", type=int, default=5, help="Rounds per strategy (default: 5)")
+    parser.add_argument("--dir", help="Directory to benchmark in (default: a temp dir)")
+    parser.add_argument("--json", metavar="PATH", help="Also write results as JSON")
+    args = parser.parse_args()
+
+    print("⏱️  Write-back Benchmark")
+    print("=" * 60)
+    print(f"Files: {args.files}  Size: {args.size} bytes  Rounds: {args.rounds}")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory(dir=args.dir) as tmp:
+        results = run(args.files, args.size, args.rounds, Path(tmp))
+
+    for name, stats in results.items():
+        print(f"  {name:<14} median {stats['median_s'] * 1000:9.1f} ms   "
+              f"{stats['per_file_ms']:.3f} ms/file")
+
+    if args.json:
+        payload = {"files": args.files, "size": args.size, "rounds": args.rounds,
+                   "results": results}
+        Path(args.json).write_text(json.dumps(payload, indent=2), encoding='utf-8')
+        print(f"\n📄 Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Unified Codemod Runner
+
+Purpose: Apply every scripts/fix-*.py rule set in a single parallel pass
+Usage: python scripts/codemod.py [GLOB ...] [--only NAME ...] [--jobs N] [--dry-run] [--verify]
+
+Each target file is read once, every rule set that targets it is applied in
+memory in rule-set order, and the file is written at most once. Files are
+processed in a process pool and the results are aggregated into one report.
+
+Before anything is written, the rule sets are applied a second time to their
+own output in memory. A file whose second pass still changes is not written,
+and the rules that are not fixpoints are reported.
+
+Targets are discovered from each rule set's globs (honouring .gitignore).
+Files that were processed clean are remembered in .cache/scripts/ by mtime,
+size and hash, so a re-run costs one stat per unchanged file.
+"""
+
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from _codemod import (
+    REPO_ROOT,
+    SCRIPTS_DIR,
+    RuleSet,
+    apply_rules,
+    discover_targets,
+    load_rule_set,
+    report_unstable,
+    rules_fingerprint,
+)
+from _discovery import FileIndex, compile_globs
+from _profiling import add_profiling_arguments, run_main
+from _writeback import WriteBatch
+
+
+RULE_SET_SCRIPTS = [
+    "fix-targeting-typescript-errors.py",
+    "fix-interface-params.py",
+    "fix-economy-unused-vars.py",
+    "fix-unused-vars.py",
+]
+
+_rule_sets: Optional[List[RuleSet]] = None
+
+
+@dataclass
+class FileResult:
+    """Outcome of running the rule sets over one file."""
+
+    rel_path: str
+    content: Optional[str] = None
+    fired: List[Tuple[str, str]] = field(default_factory=list)
+    unstable: List[Tuple[str, str]] = field(default_factory=list)
+    error: Optional[str] = None
+
+    @property
+    def changed(self) -> bool:
+        return self.content is not None
+
+
+def load_rule_sets() -> List[RuleSet]:
+    """Load every rule set once per process, sorted by rule-set order."""
+    global _rule_sets
+    if _rule_sets is None:
+        loaded = [load_rule_set(SCRIPTS_DIR / name) for name in RULE_SET_SCRIPTS]
+        _rule_sets = sorted(loaded, key=lambda rule_set: rule_set.order)
+    return _rule_sets
+
+
+def select_rule_sets(only: Optional[List[str]]) -> List[RuleSet]:
+    """Return the rule sets to run, optionally restricted by name."""
+    rule_sets = load_rule_sets()
+    if not only:
+        return rule_sets
+    known = {rule_set.name for rule_set in rule_sets}
+    unknown = sorted(set(only) - known)
+    if unknown:
+        raise SystemExit(f"Unknown rule set(s): {', '.join(unknown)}. "
+                         f"Available: {', '.join(sorted(known))}")
+    return [rule_set for rule_set in rule_sets if rule_set.name in only]
+
+
+def process_file(rel_path: str, names: List[str]) -> FileResult:
+    """Read a file once and apply every selected rule set to it in memory.
+
+    The rule sets are then re-applied to their own output; any rule that
+    fires on the second pass is recorded as unstable.
+    """
+    result = FileResult(rel_path)
+    try:
+        original = (REPO_ROOT / rel_path).read_text(encoding='utf-8')
+        rule_sets = [rule_set for rule_set in load_rule_sets() if rule_set.name in names]
+
+        content = original
+        for rule_set in rule_sets:
+            content, fired = apply_rules(rule_set.rules_for(rel_path), content)
+            result.fired.extend((rule_set.name, rule) for rule in fired)
+
+        second = content
+        for rule_set in rule_sets:
+            second, fired = apply_rules(rule_set.rules_for(rel_path), second)
+            result.unstable.extend((rule_set.name, rule) for rule in fired)
+
+        if content != original:
+            result.content = content
+    except Exception as e:
+        result.error = str(e)
+    return result
+
+
+def collect_targets(rule_sets: List[RuleSet],
+                    globs: Optional[List[str]]) -> Dict[str, List[str]]:
+    """Map each discovered target file to the names of the rule sets touching it."""
+    targets: Dict[str, List[str]] = {}
+    for rel_path in discover_targets(rule_sets, globs):
+        for rule_set in rule_sets:
+            if rule_set.rules_for(rel_path):
+                targets.setdefault(rel_path, []).append(rule_set.name)
+    return targets
+
+
+def report_unmatched(rule_sets: List[RuleSet], files: List[str]) -> int:
+    """Warn about target globs that matched no file; return how many."""
+    unmatched = 0
+    for rule_set in rule_sets:
+        for pattern in rule_set.patterns():
+            matcher = compile_globs([pattern])
+            if not any(matcher.match(rel_path) for rel_path in files):
+                print(f"⚠️  No files match: {pattern} ({rule_set.name})")
+                unmatched += 1
+    return unmatched
+
+
+def run(rule_sets: List[RuleSet], jobs: int, dry_run: bool,
+        globs: Optional[List[str]] = None,
+        index: Optional[FileIndex] = None) -> Dict[str, int]:
+    """Process all targets in a pool and write changed, stable files once each."""
+    targets = collect_targets(rule_sets, globs)
+    summary = {"processed": 0, "fixed": 0, "skipped": 0, "missing": 0,
+               "errors": 0, "unstable": 0}
+    per_rule_set = {rule_set.name: 0 for rule_set in rule_sets}
+
+    if not globs:
+        summary["missing"] = report_unmatched(rule_sets, list(targets))
+
+    pending = []
+    for rel_path in targets:
+        if index is not None and index.is_clean(rel_path):
+            summary["skipped"] += 1
+        else:
+            pending.append(rel_path)
+
+    clean = []
+    with ProcessPoolExecutor(max_workers=jobs) as pool, WriteBatch() as batch:
+        results = pool.map(process_file, pending, [targets[p] for p in pending])
+        for result in results:
+            summary["processed"] += 1
+            if result.error:
+                print(f"❌ Error processing {result.rel_path}: {result.error}")
+                summary["errors"] += 1
+                continue
+            if result.unstable:
+                report_unstable(result.rel_path, result.unstable)
+                summary["unstable"] += 1
+                if index is not None:
+                    index.forget(result.rel_path)
+                continue
+            if not result.changed:
+                print(f"⚠️  No changes needed: {result.rel_path}")
+                clean.append(result.rel_path)
+                continue
+
+            if not dry_run:
+                batch.stage(REPO_ROOT / result.rel_path, result.content)
+                clean.append(result.rel_path)
+            summary["fixed"] += 1
+            for name in {rule_set for rule_set, _ in result.fired}:
+                per_rule_set[name] += 1
+            print(f"✅ Fixed: {result.rel_path} ({len(result.fired)} rules)")
+
+    # Marked only after the batch has committed so the recorded stats are final
+    if index is not None:
+        for rel_path in clean:
+            index.mark_clean(rel_path)
+
+    print("=" * 60)
+    for name, count in per_rule_set.items():
+        print(f"  {name}: {count} files changed")
+    return summary
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(
+        description="Run every fix-*.py rule set in one parallel pass",
+    )
+    parser.add_argument("globs", nargs="*", metavar="GLOB",
+                        help="Restrict the run to files matching these repo-relative globs")
+    parser.add_argument("--only", nargs="+", metavar="NAME",
+                        help="Run only the named rule sets")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1,
+                        help="Number of worker processes (default: CPU count)")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="Report what would change without writing files")
+    parser.add_argument("--verify", action="store_true",
+                        help="Only check that every rule is a fixpoint; never write")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Ignore and do not update the clean-file index")
+    parser.add_argument("--list", action="store_true",
+                        help="List the available rule sets and exit")
+    add_profiling_arguments(parser)
+    args = parser.parse_args()
+
+    if args.list:
+        for rule_set in load_rule_sets():
+            print(f"{rule_set.order:>4}  {rule_set.name} ({len(rule_set.patterns())} globs)")
+        return
+
+    rule_sets = select_rule_sets(args.only)
+
+    print("🔧 Unified Codemod Runner")
+    print("=" * 60)
+    print(f"Rule sets: {', '.join(rule_set.name for rule_set in rule_sets)}")
+    print(f"Workers: {args.jobs}")
+    print(f"Dry run: {args.dry_run}")
+    print(f"Verify only: {args.verify}")
+    print("=" * 60)
+
+    write = not (args.dry_run or args.verify)
+    index = None
+    if write and not args.no_cache:
+        # A clean file is only clean for the exact rule sets that checked it
+        index_name = "codemod"
+        if args.only:
+            index_name += "-" + "+".join(sorted(rule_set.name for rule_set in rule_sets))
+        index = FileIndex(index_name, rules_fingerprint(RULE_SET_SCRIPTS))
+
+    summary = run(rule_sets, args.jobs, not write, args.globs, index)
+    if index is not None:
+        index.save()
+
+    print("=" * 60)
+    print(f"📊 Summary: Fixed {summary['fixed']}/{summary['processed']} files "
+          f"({summary['skipped']} unchanged since last clean run, "
+          f"{summary['missing']} unmatched globs, {summary['errors']} errors, "
+          f"{summary['unstable']} not fixpoints)")
+
+    if summary["errors"] > 0 or summary["unstable"] > 0:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    run_main(main)
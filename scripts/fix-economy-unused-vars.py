@@ -4,8 +4,17 @@ Fix unused variables in economy stub files by prefixing them with underscore.
 This script targets the specific files in packages/sim/src/economy/ with ESLint errors.
 """
 
+import argparse
 import re
+from functools import partial
 from pathlib import Path
+from typing import Optional
+
+from _codemod import (Rule, RuleSet, add_target_arguments, discover_targets, fix_verified, open_index,
+                      report_unstable)
+from _eslint import fix_from_report
+from _profiling import add_profiling_arguments, phase, run_main
+from _writeback import WriteBatch
 
 
 def fix_unused_imports(content: str, imports_to_fix: list) -> str:
@@ -44,86 +53,135 @@ def fix_unused_vars(content: str, vars_to_fix: list) -> str:
     return content
 
 
-def fix_file(file_path: Path, config: dict) -> bool:
-    """Fix unused variables in a single file based on configuration."""
+# Configuration for each file with specific variables to fix, matched under
+# any economy/ directory so the script keeps working when packages move
+FIXES_CONFIG = {
+    "packages/**/economy/arcana-drop-manager.ts": {
+        "imports": ["BossType"]
+    },
+    "packages/**/economy/enchant-manager.ts": {
+        "params": ["type"],
+        "vars": ["soulForgingStats"]
+    },
+    "packages/**/economy/enchant-types.ts": {
+        "params": ["type", "category", "amount", "currency", "level", "location", 
+                  "fromLevel", "toLevel", "currentLevel", "baseCost"]
+    },
+    "packages/**/economy/soul-forging.ts": {
+        "params": ["amount", "availableArcana", "availableSoulPower", "baseCap", 
+                  "currentLevels"]
+    },
+    "packages/**/economy/soul-power-drop-manager.ts": {
+        "imports": ["BossType"]
+    },
+    "packages/**/economy/soul-power-scaling.ts": {
+        "vars": ["BOSS_CHANCE_MULTIPLIERS", "BOSS_AMOUNT_MULTIPLIERS"]
+    },
+    "packages/**/economy/types.ts": {
+        "params": ["amount", "source", "enemyType", "distance", "ward", "bossType",
+                  "dropChance", "scalingFactor", "arcanaAmount", "reason", "location",
+                  "currency"]
+    }
+}
+
+
+def rules_for_config(config: dict) -> list:
+    """Build the ordered rules for one file's configuration."""
+    rules = []
+    if 'imports' in config:
+        rules.append(Rule('unused-imports', partial(fix_unused_imports, imports_to_fix=config['imports'])))
+    if 'params' in config:
+        rules.append(Rule('unused-params', partial(fix_unused_params, params_to_fix=config['params'])))
+    if 'vars' in config:
+        rules.append(Rule('unused-vars', partial(fix_unused_vars, vars_to_fix=config['vars'])))
+    return rules
+
+
+RULE_SET = RuleSet(
+    name="economy-unused-vars",
+    order=30,
+    targets={path: rules_for_config(config) for path, config in FIXES_CONFIG.items()},
+)
+
+
+def fix_file(file_path: Path, rules: list, batch: WriteBatch) -> Optional[bool]:
+    """Fix unused variables in a single file (None if it could not be processed).
+
+    Changed content is staged in ``batch`` and written when the batch commits,
+    unless a second pass of the rules would change it again.
+    """
     try:
-        content = file_path.read_text(encoding='utf-8')
+        with phase("read"):
+            content = file_path.read_text(encoding='utf-8')
         original_content = content
         
-        # Apply fixes based on configuration
-        if 'imports' in config:
-            content = fix_unused_imports(content, config['imports'])
-        
-        if 'params' in config:
-            content = fix_unused_params(content, config['params'])
+        # Apply the fixes configured for this file
+        with phase("transform"):
+            content, _, unstable = fix_verified(rules, content)
+        if unstable:
+            report_unstable(str(file_path), ((RULE_SET.name, rule) for rule in unstable))
+            return None
         
-        if 'vars' in config:
-            content = fix_unused_vars(content, config['vars'])
-        
-        # Write back if changed
+        # Stage the rewrite if changed
         if content != original_content:
-            file_path.write_text(content, encoding='utf-8')
+            batch.stage(file_path, content)
             return True
         return False
         
     except Exception as e:
         print(f"❌ Error processing {file_path}: {e}")
-        return False
+        return None
 
 
 def main():
     """Main function to fix unused variables in economy files."""
-    repo_root = Path(__file__).parent.parent
+    parser = argparse.ArgumentParser(description="Prefix unused economy variables with an underscore")
+    add_target_arguments(parser)
+    parser.add_argument("--eslint-json", metavar="PATH",
+                        help="Fix only the no-unused-vars problems in an ESLint "
+                             "--format json report (use - for stdin)")
+    add_profiling_arguments(parser)
+    args = parser.parse_args()
     
-    # Configuration for each file with specific variables to fix
-    fixes_config = {
-        "packages/sim/src/economy/arcana-drop-manager.ts": {
-            "imports": ["BossType"]
-        },
-        "packages/sim/src/economy/enchant-manager.ts": {
-            "params": ["type"],
-            "vars": ["soulForgingStats"]
-        },
-        "packages/sim/src/economy/enchant-types.ts": {
-            "params": ["type", "category", "amount", "currency", "level", "location", 
-                      "fromLevel", "toLevel", "currentLevel", "baseCost"]
-        },
-        "packages/sim/src/economy/soul-forging.ts": {
-            "params": ["amount", "availableArcana", "availableSoulPower", "baseCap", 
-                      "currentLevels"]
-        },
-        "packages/sim/src/economy/soul-power-drop-manager.ts": {
-            "imports": ["BossType"]
-        },
-        "packages/sim/src/economy/soul-power-scaling.ts": {
-            "vars": ["BOSS_CHANCE_MULTIPLIERS", "BOSS_AMOUNT_MULTIPLIERS"]
-        },
-        "packages/sim/src/economy/types.ts": {
-            "params": ["amount", "source", "enemyType", "distance", "ward", "bossType",
-                      "dropChance", "scalingFactor", "arcanaAmount", "reason", "location",
-                      "currency"]
-        }
-    }
+    if args.eslint_json:
+        summary = fix_from_report(args.eslint_json, args.globs)
+        print(f"\nApplied {summary['edits']} edits in {summary['fixed']}/{summary['files']} files "
+              f"({summary['skipped']} problems skipped)")
+        return
+    
+    repo_root = Path(__file__).parent.parent
+    index = open_index(RULE_SET, __file__, enabled=not args.no_cache)
+    targets = discover_targets([RULE_SET], args.globs)
     
     fixed_count = 0
-    total_files = len(fixes_config)
+    skipped_count = 0
+    total_files = len(targets)
     
     print("🔧 Economy Unused Variables Fixer")
     print("=" * 60)
     
-    for file_path_str, config in fixes_config.items():
-        full_path = repo_root / file_path_str
-        if full_path.exists():
-            if fix_file(full_path, config):
+    processed = []
+    with WriteBatch() as batch:
+        for file_path_str in targets:
+            if index and index.is_clean(file_path_str):
+                skipped_count += 1
+                continue
+            fixed = fix_file(repo_root / file_path_str, RULE_SET.rules_for(file_path_str), batch)
+            if fixed is None:
+                continue
+            if fixed:
                 print(f"✅ Fixed: {file_path_str}")
                 fixed_count += 1
             else:
                 print(f"⚠️  No changes needed: {file_path_str}")
-        else:
-            print(f"❌ File not found: {file_path_str}")
+            processed.append(file_path_str)
     
+    if index:
+        for file_path_str in processed:
+            index.mark_clean(file_path_str)
+        index.save()
     print("=" * 60)
-    print(f"📊 Summary: Fixed {fixed_count}/{total_files} files")
+    print(f"📊 Summary: Fixed {fixed_count}/{total_files} files ({skipped_count} unchanged since last run)")
     
     if fixed_count > 0:
         print("🎉 Unused variable fixes applied successfully!")
@@ -132,5 +190,5 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    run_main(main)
 
@@ -4,9 +4,15 @@ Fix interface method signature parameters by prefixing with underscore.
 Only fixes parameters in method signatures within interfaces, not implementations.
 """
 
+import argparse
 import re
 from pathlib import Path
 
+from _codemod import (Rule, RuleSet, add_target_arguments, discover_targets, fix_verified, open_index,
+                      report_unstable)
+from _profiling import add_profiling_arguments, phase, run_main
+from _writeback import WriteBatch
+
 
 def fix_interface_params(content: str) -> str:
     """Fix parameters in interface method signatures."""
@@ -50,42 +56,67 @@ def fix_interface_params(content: str) -> str:
     return '\n'.join(result)
 
 
+FILES_TO_FIX = [
+    "packages/**/economy/enchant-types.ts",
+    "packages/**/economy/types.ts",
+]
+
+RULE_SET = RuleSet(
+    name="interface-params",
+    order=20,
+    targets={path: [Rule("interface-params", fix_interface_params)] for path in FILES_TO_FIX},
+)
+
+
 def main():
-    repo_root = Path(__file__).parent.parent
+    parser = argparse.ArgumentParser(description="Prefix interface method parameters with an underscore")
+    add_target_arguments(parser)
+    add_profiling_arguments(parser)
+    args = parser.parse_args()
     
-    files_to_fix = [
-        "packages/sim/src/economy/enchant-types.ts",
-        "packages/sim/src/economy/types.ts",
-    ]
+    repo_root = Path(__file__).parent.parent
+    index = open_index(RULE_SET, __file__, enabled=not args.no_cache)
     
     print("🔧 Interface Parameter Fixer")
     print("=" * 60)
     
-    for file_path_str in files_to_fix:
-        full_path = repo_root / file_path_str
-        if not full_path.exists():
-            print(f"❌ File not found: {file_path_str}")
-            continue
-        
-        try:
-            content = full_path.read_text(encoding='utf-8')
-            original = content
+    processed = []
+    with WriteBatch() as batch:
+        for file_path_str in discover_targets([RULE_SET], args.globs):
+            if index and index.is_clean(file_path_str):
+                print(f"⚠️  Unchanged since last run: {file_path_str}")
+                continue
             
-            content = fix_interface_params(content)
-            
-            if content != original:
-                full_path.write_text(content, encoding='utf-8')
-                print(f"✅ Fixed: {file_path_str}")
-            else:
-                print(f"⚠️  No changes: {file_path_str}")
+            full_path = repo_root / file_path_str
+            try:
+                with phase("read"):
+                    content = full_path.read_text(encoding='utf-8')
+                original = content
+                
+                with phase("transform"):
+                    content, _, unstable = fix_verified(RULE_SET.rules_for(file_path_str), content)
                 
-        except Exception as e:
-            print(f"❌ Error: {file_path_str}: {e}")
+                if unstable:
+                    report_unstable(file_path_str, ((RULE_SET.name, rule) for rule in unstable))
+                    continue
+                if content != original:
+                    batch.stage(full_path, content)
+                    print(f"✅ Fixed: {file_path_str}")
+                else:
+                    print(f"⚠️  No changes: {file_path_str}")
+                processed.append(file_path_str)
+                    
+            except Exception as e:
+                print(f"❌ Error: {file_path_str}: {e}")
     
+    if index:
+        for file_path_str in processed:
+            index.mark_clean(file_path_str)
+        index.save()
     print("=" * 60)
     print("🎉 Interface parameters fixed!")
 
 
 if __name__ == "__main__":
-    main()
+    run_main(main)
 
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Markdown Fixer Client
+
+Purpose: Send files or a stdin buffer to a warm `fix-markdown-universal.py --serve` process
+Usage: python scripts/fix-markdown-client.py [--start] [file1.md ...] | - | --stats | --shutdown
+
+With --start, a server is launched in the background if none is listening.
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from _fixer_server import DEFAULT_SOCKET, request
+from _profiling import add_profiling_arguments, run_main
+
+
+def start_server(socket_path: Path, wait: float = 5.0) -> None:
+    """Launch a detached server and wait until it accepts connections."""
+    script = Path(__file__).parent / "fix-markdown-universal.py"
+    subprocess.Popen([sys.executable, str(script), "--serve", "--socket", str(socket_path)],
+                     stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                     stderr=subprocess.DEVNULL, start_new_session=True)
+    deadline = time.monotonic() + wait
+    while time.monotonic() < deadline:
+        try:
+            request({"op": "stats"}, socket_path, timeout=1.0)
+            return
+        except OSError:
+            time.sleep(0.05)
+    raise OSError(f"server did not start on {socket_path}")
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Client for the warm markdown fixer server")
+    parser.add_argument("paths", nargs="*", help="Markdown files to fix in place, or - for stdin")
+    parser.add_argument("--socket", default=str(DEFAULT_SOCKET), help="Server socket path")
+    parser.add_argument("--start", action="store_true", help="Start a server if none is running")
+    parser.add_argument("--stats", action="store_true", help="Print server statistics")
+    parser.add_argument("--shutdown", action="store_true", help="Stop the server")
+    add_profiling_arguments(parser)
+    args = parser.parse_args()
+    socket_path = Path(args.socket)
+
+    if args.stats:
+        payload = {"op": "stats"}
+    elif args.shutdown:
+        payload = {"op": "shutdown"}
+    elif args.paths == ["-"]:
+        payload = {"op": "fix", "text": sys.stdin.buffer.read().decode("utf-8")}
+    elif args.paths:
+        payload = {"op": "fix_paths", "paths": [str(Path(p).resolve()) for p in args.paths]}
+    else:
+        parser.error("nothing to do: give paths, -, --stats or --shutdown")
+
+    try:
+        try:
+            response = request(payload, socket_path)
+        except (FileNotFoundError, ConnectionRefusedError):
+            if not args.start or args.shutdown:
+                raise
+            start_server(socket_path)
+            response = request(payload, socket_path)
+    except OSError as e:
+        print(f"❌ Cannot reach fixer server at {socket_path}: {e}", file=sys.stderr)
+        sys.exit(2)
+
+    if not response.get("ok"):
+        print(f"❌ Server error: {response.get('error')}", file=sys.stderr)
+        sys.exit(1)
+
+    if payload["op"] == "fix":
+        sys.stdout.buffer.write(response["text"].encode("utf-8"))
+    elif payload["op"] == "fix_paths":
+        errors = 0
+        for result in response["results"]:
+            if "error" in result:
+                errors += 1
+                print(f"❌ Error processing {result['path']}: {result['error']}")
+            elif result["changed"]:
+                print(f"✅ Fixed: {result['path']}")
+        sys.exit(1 if errors else 0)
+    elif payload["op"] == "stats":
+        print(json.dumps(response["stats"], indent=2))
+
+
+if __name__ == "__main__":
+    run_main(main)
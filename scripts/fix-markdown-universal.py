@@ -4,15 +4,46 @@ Universal Markdown Fixer Script
 
 Purpose: Comprehensive markdown linting fixer that handles all common markdownlint violations
 Usage: python scripts/fix-markdown-universal.py [file1] [file2] ... [directory] [--max-length N]
+       python scripts/fix-markdown-universal.py --config PATH --ignore-path PATH [paths...]
+       python scripts/fix-markdown-universal.py --lint [markdownlint|json|sarif] [--lint-output PATH] [paths...]
+       python scripts/fix-markdown-universal.py --staged | --changed-since REF [paths...]
+       python scripts/fix-markdown-universal.py - < in.md > out.md
+       python scripts/fix-markdown-universal.py --null-separated < buffers > fixed
+       python scripts/fix-markdown-universal.py --serve [--socket PATH] [--idle-timeout S]
+       python scripts/fix-markdown-universal.py --watch docs/ [--debounce S] [--poll]
 
 Features:
 - File-agnostic: Works with any markdown file or directory
 - Comprehensive: Fixes all common markdownlint violations
 - Intelligent: Smart line breaking with context awareness
 - Safe: Preserves content while fixing formatting issues
+- Git-aware: --staged / --changed-since only touch the markdown files git reports
+- Filter: `-` fixes stdin to stdout; --null-separated fixes many NUL-terminated
+  buffers in one process (one NUL-terminated result per buffer, in order)
+- Library: `from markdown_fixer import fix_text` for in-process use
+- Server: --serve keeps a warm fixer on a Unix socket (see fix-markdown-client.py)
+- Watch: --watch re-fixes only the files that change (inotify, or mtime polling)
+- Link-aware: keeps a corpus-wide heading anchor index (.cache/scripts), rewrites
+  links to headings MD024 renames and reports broken relative links/anchors
+- Fast: a single combined pre-scan returns already-clean files untouched
+- Pipelined: --pipeline overlaps reading, fixing (optionally --jobs processes) and
+  writing through bounded queues for large or slow (networked) doc trees
+- Selectable: --rules / --disable take rule IDs or markdownlint aliases; the rules
+  that run are scheduled to a fixpoint, so one invocation converges
+- Configured: reads .markdownlint.json (rules switched off there never run, MD013
+  line_length is the default --max-length) and skips paths in .markdownlintignore,
+  pruning ignored directories instead of walking them
+- Lint output: --lint reports what it fixes as markdownlint-style file:line:column
+  lines, markdownlint --json results or SARIF (--lint-format), from the same pass that fixes
+  (with --dry-run it is a check: exit 1 when anything would change)
+- Memoized: line-local rule results are shared across files through a bounded LRU
+  (--line-memo-size, 0 disables); --persist-line-memo keeps it between runs, and
+  the summary reports its hit rate
+- Profiling: --profile[=PATH] writes pstats and flamegraph-ready collapsed stacks,
+  --trace-timings prints per-phase timings (see _profiling.py)
 
 Fixes:
-- MD013: Line length (configurable, default 100 chars)
+- MD013: Line length (configurable, default 100 chars; honours MD013 tables and code_block_line_length)
 - MD022: Blank lines around headings
 - MD024: Duplicate headings (adds unique identifiers)
 - MD031: Blank lines around fenced code blocks
@@ -28,400 +59,309 @@ Fixes:
 """
 
 import argparse
+import json
 import os
-import re
 import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import replace
+from functools import partial
 from pathlib import Path
-from typing import List, Dict, Tuple, Optional
+from typing import BinaryIO, Dict, List, Optional, Tuple
 
+from _pipeline import run_pipeline
+from _git import GitError, IndexEntry, changed_since, read_blobs, staged_entries, toplevel, update_index, write_blob
+from _anchors import AnchorIndex, LinkTracker
+from _lint_report import FORMATS as LINT_FORMATS, LintReport
+from _discovery import CACHE_DIR, REPO_ROOT, IgnoreRules, content_hash, is_ignored, walk
+from _profiling import add_profiling_arguments, phase, run_main
+from _fixer_server import DEFAULT_IDLE_TIMEOUT, DEFAULT_SOCKET, FixerServer
+from _watch import debounced, open_watcher
+from _writeback import WriteBatch
+from markdown_fixer import (LINE_MEMO, RULE_SPECS, FixerConfig, UniversalMarkdownFixer,
+                            config_from_markdownlint, fix_text, resolve_rules)
 
-class UniversalMarkdownFixer:
-    """Universal markdown linter and fixer with comprehensive rule support."""
+
+DEFAULT_CONFIG = REPO_ROOT / ".markdownlint.json"
+DEFAULT_IGNORE = REPO_ROOT / ".markdownlintignore"
+LINE_MEMO_PATH = CACHE_DIR / "markdown-line-memo.marshal"
+
+
+def load_markdownlint_config(path: Path) -> FixerConfig:
+    """The fixer settings from a .markdownlint.json; defaults if it does not exist."""
+    try:
+        options = json.loads(path.read_text(encoding='utf-8'))
+    except FileNotFoundError:
+        return FixerConfig()
+    if not isinstance(options, dict):
+        raise ValueError(f"{path}: expected a JSON object")
+    return config_from_markdownlint(options)
+
+
+class LintIgnore:
+    """.markdownlintignore rules, matched relative to the directory holding the file."""
     
-    def __init__(self, max_line_length: int = 100):
-        self.max_line_length = max_line_length
-        self.fixes_applied = 0
-        self.files_processed = 0
-        
-    def fix_file(self, file_path: Path) -> bool:
-        """Fix all markdownlint violations in a file."""
+    def __init__(self, path: Path):
+        self.root = path.resolve().parent
+        rules = IgnoreRules.from_file(path)
+        self.rules = [rules] if rules else []
+    
+    def _relative(self, path: Path):
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            original_content = content
-            content = self._fix_all_violations(content)
-            
-            if content != original_content:
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    f.write(content)
-                return True
-            return False
-            
-        except Exception as e:
-            print(f"❌ Error processing {file_path}: {e}")
-            return False
+            return path.resolve().relative_to(self.root).as_posix()
+        except ValueError:
+            return None  # Outside the ignore file's tree, so never ignored
     
-    def _fix_all_violations(self, content: str) -> str:
-        """Apply all fixes to markdown content."""
-        # Remove trailing spaces first
-        content = self._fix_trailing_spaces(content)
-        
-        # Fix multiple consecutive blank lines
-        content = self._fix_multiple_blank_lines(content)
-        
-        # Fix line length issues
-        content = self._fix_line_length(content)
-        
-        # Fix structural issues
-        content = self._fix_blank_lines_around_headings(content)
-        content = self._fix_blank_lines_around_lists(content)
-        content = self._fix_blank_lines_around_fences(content)
-        content = self._fix_fenced_code_language(content)
-        content = self._fix_duplicate_headings(content)
-        content = self._fix_list_indentation(content)
-        content = self._fix_ordered_list_prefixes(content)
-        content = self._fix_bare_urls(content)
-        content = self._fix_emphasis_style(content)
-        content = self._fix_file_ending(content)
-        
-        return content
+    def ignores(self, path: Path) -> bool:
+        """True if ``path`` or any directory above it is ignored."""
+        rel = self._relative(path)
+        if rel in (None, '.') or not self.rules:
+            return False
+        parts = rel.split('/')
+        for depth in range(1, len(parts)):
+            if is_ignored('/'.join(parts[:depth]), True, self.rules):
+                return True
+        return is_ignored(rel, path.is_dir(), self.rules)
     
-    def _fix_trailing_spaces(self, content: str) -> str:
-        """Fix MD009: Trailing spaces."""
-        lines = content.split('\n')
-        fixed_lines = []
-        
-        for line in lines:
-            # Remove trailing spaces
-            fixed_lines.append(line.rstrip())
-        
-        return '\n'.join(fixed_lines)
+    def markdown_files(self, directory: Path) -> List[Path]:
+        """The .md files under ``directory``, never descending into ignored directories."""
+        if self.ignores(directory):
+            return []
+        rel = self._relative(directory)
+        if rel is None:
+            start = ""
+            found = walk(directory, start, ignore_files=())
+        else:
+            start = "" if rel == '.' else rel
+            found = walk(self.root, start, ignore_files=(), extra_rules=self.rules)
+        # Keep the caller's spelling of the directory in the paths printed
+        skip = len(start) + 1 if start else 0
+        return [directory / rel_path[skip:] for rel_path in found
+                if rel_path.endswith('.md') and (directory / rel_path[skip:]).is_file()]
+
+
+def git_pathspecs(root: Path, paths: List[str]) -> List[str]:
+    """Translate CLI paths into git pathspecs selecting markdown files."""
+    if not paths:
+        return ['*.md']
+    specs = []
+    for path_str in paths:
+        path = Path(path_str).resolve()
+        rel = os.path.relpath(path, root).replace(os.sep, '/')
+        if path.is_dir():
+            specs.append(f':(glob){rel}/**/*.md' if rel != '.' else '*.md')
+        else:
+            specs.append(rel)
+    return specs
+
+
+def process_staged(fixer: UniversalMarkdownFixer, root: Path, pathspecs: List[str],
+                   dry_run: bool, ignore: Optional[LintIgnore] = None) -> Dict[str, int]:
+    """Fix the staged (index) contents of changed markdown files.
+
+    The fixed content is written back to the index as a new blob, so partially
+    staged files are fixed exactly as they will be committed. The working tree
+    copy is only rewritten when it still matches what was staged.
+    """
+    results = {"processed": 0, "fixed": 0, "errors": 0}
+    with phase("discovery"):
+        entries = staged_entries(root, pathspecs)
+        if ignore is not None:
+            entries = [entry for entry in entries if not ignore.ignores(root / entry.path)]
+    with phase("read"):
+        blobs = read_blobs(root, [entry.sha for entry in entries])
+    updated = []
     
-    def _fix_multiple_blank_lines(self, content: str) -> str:
-        """Fix MD012: Multiple consecutive blank lines."""
-        # Replace multiple consecutive blank lines with single blank line
-        content = re.sub(r'\n\s*\n\s*\n+', '\n\n', content)
-        return content
+    for entry in entries:
+        results["processed"] += 1
+        fixer.files_processed += 1
+        staged = blobs[entry.sha]
+        try:
+            original = staged.decode('utf-8')
+        except UnicodeDecodeError as e:
+            print(f"❌ Error processing {entry.path}: {e}", file=fixer.progress)
+            results["errors"] += 1
+            continue
+        
+        fixed = fixer.fix_content(original)
+        if fixer.lint and fixer.on_violations is not None:
+            fixer.on_violations(Path(entry.path), fixer.last_violations)
+        if fixed == original:
+            print(f"✅ No changes needed: {entry.path}", file=fixer.progress)
+            continue
+        
+        results["fixed"] += 1
+        if dry_run:
+            print(f"✅ Would fix (staged): {entry.path}", file=fixer.progress)
+            continue
+        
+        data = fixed.encode('utf-8')
+        updated.append(IndexEntry(entry.path, entry.mode, write_blob(root, data, entry.path)))
+        worktree_path = root / entry.path
+        try:
+            in_sync = worktree_path.read_bytes() == staged
+        except OSError:
+            in_sync = False
+        if in_sync:
+            fixer.batch.stage(worktree_path, data)
+            print(f"✅ Fixed (index and working tree): {entry.path}", file=fixer.progress)
+        else:
+            print(f"✅ Fixed (index only, partially staged): {entry.path}", file=fixer.progress)
     
-    def _fix_line_length(self, content: str) -> str:
-        """Fix MD013: Line length by breaking at appropriate points."""
-        lines = content.split('\n')
-        fixed_lines = []
-        
-        for line in lines:
-            if len(line) <= self.max_line_length:
-                fixed_lines.append(line)
-            else:
-                # Don't break URLs, code blocks, or special lines
-                if (line.startswith('http') or 
-                    line.startswith('```') or 
-                    line.startswith('#') or
-                    line.strip().startswith('-') or
-                    line.strip().startswith('*') or
-                    line.strip().startswith('1.') or
-                    line.strip().startswith('2.') or
-                    line.strip().startswith('3.') or
-                    line.strip().startswith('4.') or
-                    line.strip().startswith('5.') or
-                    line.strip().startswith('6.') or
-                    line.strip().startswith('7.') or
-                    line.strip().startswith('8.') or
-                    line.strip().startswith('9.')):
-                    fixed_lines.append(line)
-                    continue
-                
-                # Break at sentence boundaries first
-                if '. ' in line:
-                    parts = line.split('. ')
-                    result = parts[0] + '.'
-                    for part in parts[1:]:
-                        if len(result + '. ' + part) <= self.max_line_length:
-                            result += '. ' + part
-                        else:
-                            result += '.\n' + part
-                    fixed_lines.append(result)
-                    self.fixes_applied += 1
-                    continue
-                
-                # Break at word boundaries
-                words = line.split()
-                result = words[0]
-                for word in words[1:]:
-                    if len(result + ' ' + word) <= self.max_line_length:
-                        result += ' ' + word
-                    else:
-                        result += '\n' + word
-                fixed_lines.append(result)
-                self.fixes_applied += 1
-        
-        return '\n'.join(fixed_lines)
+    update_index(root, updated)
+    return results
+
+
+def _filter_buffer(data: bytes, config: FixerConfig, report: bool) -> Tuple[bytes, bool]:
+    """Fix one raw buffer; undecodable input is passed through unchanged."""
+    try:
+        text = data.decode('utf-8')
+    except UnicodeDecodeError as e:
+        print(f"❌ Error decoding input: {e}", file=sys.stderr)
+        return data, False
+    fixed, fix_report = fix_text(text, config)
+    if report:
+        print(json.dumps(fix_report.to_dict()), file=sys.stderr)
+    return fixed.encode('utf-8'), True
+
+
+def filter_stream(config: FixerConfig, stdin: BinaryIO, stdout: BinaryIO,
+                  report: bool = False) -> int:
+    """Fix a single markdown document read from stdin; return an exit code."""
+    with phase("read"):
+        data = stdin.read()
+    fixed, ok = _filter_buffer(data, config, report)
+    with phase("write"):
+        stdout.write(fixed)
+        stdout.flush()
+    return 0 if ok else 1
+
+
+def filter_null_separated(config: FixerConfig, stdin: BinaryIO, stdout: BinaryIO,
+                          report: bool = False) -> int:
+    """Fix NUL-terminated buffers as they arrive, answering each one in order.
+
+    Every complete buffer is answered (and flushed) as soon as its NUL is read,
+    so a client can keep one process open and send documents one at a time.
+    """
+    errors = 0
+    parts: List[bytes] = []
     
-    def _fix_blank_lines_around_headings(self, content: str) -> str:
-        """Fix MD022: Blank lines around headings."""
-        lines = content.split('\n')
-        fixed_lines = []
-        
-        for i, line in enumerate(lines):
-            # Check if this is a heading
-            if re.match(r'^#{1,6}\s+', line):
-                # Add blank line before heading (if not first line and previous line not blank)
-                if i > 0 and fixed_lines and fixed_lines[-1].strip():
-                    fixed_lines.append('')
-                fixed_lines.append(line)
-                
-                # Add blank line after heading (if not last line and next line not blank)
-                if i < len(lines) - 1 and lines[i + 1].strip():
-                    fixed_lines.append('')
-            else:
-                fixed_lines.append(line)
-        
-        return '\n'.join(fixed_lines)
+    def emit(data: bytes) -> None:
+        nonlocal errors
+        fixed, ok = _filter_buffer(data, config, report)
+        errors += not ok
+        with phase("write"):
+            stdout.write(fixed + b'\0')
+            stdout.flush()
     
-    def _fix_blank_lines_around_lists(self, content: str) -> str:
-        """Fix MD032: Blank lines around lists."""
-        lines = content.split('\n')
-        fixed_lines = []
-        
-        for i, line in enumerate(lines):
-            # Check if this is a list item
-            if re.match(r'^\s*[-*+]\s+', line) or re.match(r'^\s*\d+\.\s+', line):
-                # Add blank line before list (if not first line and previous line not blank)
-                if i > 0 and fixed_lines and fixed_lines[-1].strip():
-                    fixed_lines.append('')
-                fixed_lines.append(line)
-                
-                # Add blank line after list (if not last line and next line not blank and not list item)
-                if (i < len(lines) - 1 and 
-                    lines[i + 1].strip() and 
-                    not re.match(r'^\s*[-*+]\s+', lines[i + 1]) and
-                    not re.match(r'^\s*\d+\.\s+', lines[i + 1])):
-                    fixed_lines.append('')
-            else:
-                fixed_lines.append(line)
-        
-        return '\n'.join(fixed_lines)
+    read = getattr(stdin, 'read1', stdin.read)
+    while True:
+        chunk = read(65536)
+        if not chunk:
+            break
+        pieces = chunk.split(b'\0')
+        for piece in pieces[:-1]:
+            parts.append(piece)
+            emit(b''.join(parts))
+            parts = []
+        parts.append(pieces[-1])
     
-    def _fix_blank_lines_around_fences(self, content: str) -> str:
-        """Fix MD031: Blank lines around fenced code blocks."""
-        lines = content.split('\n')
-        fixed_lines = []
-        
-        for i, line in enumerate(lines):
-            # Check if this is a fenced code block
-            if line.strip().startswith('```'):
-                # Add blank line before fence (if not first line and previous line not blank)
-                if i > 0 and fixed_lines and fixed_lines[-1].strip():
-                    fixed_lines.append('')
-                fixed_lines.append(line)
-                
-                # Add blank line after fence (if not last line and next line not blank)
-                if i < len(lines) - 1 and lines[i + 1].strip():
-                    fixed_lines.append('')
+    # A final buffer without its terminating NUL is still answered
+    tail = b''.join(parts)
+    if tail:
+        emit(tail)
+    return 1 if errors else 0
+
+
+def process_pipelined(fixer: UniversalMarkdownFixer, files: List[Path], config: FixerConfig,
+                      jobs: int = 1, depth: int = 32) -> Dict[str, int]:
+    """Fix files through the bounded read/fix/write pipeline."""
+    results = {"processed": 0, "fixed": 0, "errors": 0}
+    executor = ProcessPoolExecutor(max_workers=jobs) if jobs > 1 else None
+    try:
+        transform = partial(fix_text, config=config)
+        for item in run_pipeline(files, transform, fixer.batch.stage, depth, executor):
+            results["processed"] += 1
+            fixer.files_processed += 1
+            if item.error is not None:
+                print(f"❌ Error processing {item.path}: {item.error}", file=fixer.progress)
+                results["errors"] += 1
+                continue
+            fixed, report = item.output
+            fixer.fixes_applied += report.fixes_applied
+            fixer.rule_runs += report.rule_runs
+            if report.rule_runs == 0:
+                fixer.prescan_skipped += 1
+            if fixer.on_fixed is not None:
+                fixer.on_fixed(item.path, item.text, fixed)
+            if report.violations is not None and fixer.on_violations is not None:
+                fixer.on_violations(item.path, report.violations)
+            if item.changed:
+                results["fixed"] += 1
+                print(f"✅ Fixed: {item.path}", file=fixer.progress)
             else:
-                fixed_lines.append(line)
-        
-        return '\n'.join(fixed_lines)
-    
-    def _fix_fenced_code_language(self, content: str) -> str:
-        """Fix MD040: Fenced code blocks should have language specified."""
-        lines = content.split('\n')
-        fixed_lines = []
-        
-        for i, line in enumerate(lines):
-            # Check if this is a fenced code block without language
-            if line.strip() == '```':
-                # Try to infer language from context or use 'text'
-                language = 'text'
-                
-                # Look at the next few lines for hints
-                for j in range(i + 1, min(i + 5, len(lines))):
-                    next_line = lines[j].strip()
-                    if next_line == '```':
-                        break
-                    if any(keyword in next_line.lower() for keyword in ['bash', 'sh', 'shell']):
-                        language = 'bash'
-                        break
-                    elif any(keyword in next_line.lower() for keyword in ['javascript', 'js', 'typescript', 'ts']):
-                        language = 'javascript'
-                        break
-                    elif any(keyword in next_line.lower() for keyword in ['python', 'py']):
-                        language = 'python'
-                        break
-                    elif any(keyword in next_line.lower() for keyword in ['json']):
-                        language = 'json'
-                        break
-                    elif any(keyword in next_line.lower() for keyword in ['yaml', 'yml']):
-                        language = 'yaml'
-                        break
-                    elif any(keyword in next_line.lower() for keyword in ['html', 'xml']):
-                        language = 'html'
-                        break
-                    elif any(keyword in next_line.lower() for keyword in ['css']):
-                        language = 'css'
-                        break
-                    elif any(keyword in next_line.lower() for keyword in ['sql']):
-                        language = 'sql'
-                        break
-                
-                fixed_lines.append(f'```{language}')
-                self.fixes_applied += 1
+                print(f"✅ No changes needed: {item.path}", file=fixer.progress)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    return results
+
+
+def _fix_paths_batch(fixer: UniversalMarkdownFixer, paths: List[Path],
+                     written: Dict[Path, str]) -> int:
+    """Fix files in one write batch, skipping any still exactly as we wrote them."""
+    fixed = 0
+    with WriteBatch() as batch:
+        for path in paths:
+            try:
+                data = path.read_bytes()
+                if written.get(path) == content_hash(data):
+                    continue  # The event came from our own write
+                content = data.decode('utf-8')
+            except (OSError, UnicodeDecodeError) as e:
+                print(f"❌ Error processing {path}: {e}", file=fixer.progress)
+                continue
+            fixer.files_processed += 1
+            new_content = fixer.fix_content(content)
+            if new_content != content:
+                encoded = new_content.encode('utf-8')
+                batch.stage(path, encoded)
+                written[path] = content_hash(encoded)
+                fixed += 1
+                print(f"✅ Fixed: {path}", file=fixer.progress)
             else:
-                fixed_lines.append(line)
-        
-        return '\n'.join(fixed_lines)
-    
-    def _fix_duplicate_headings(self, content: str) -> str:
-        """Fix MD024: Duplicate headings by adding unique identifiers."""
-        lines = content.split('\n')
-        fixed_lines = []
-        heading_counts = {}
-        
-        for line in lines:
-            # Check if this is a heading
-            heading_match = re.match(r'^(#{1,6})\s+(.+)$', line)
-            if heading_match:
-                level, text = heading_match.groups()
-                heading_text = text.strip()
-                
-                # Count occurrences
-                if heading_text in heading_counts:
-                    heading_counts[heading_text] += 1
-                    # Make heading unique
-                    line = f"{level} {heading_text} ({heading_counts[heading_text]})"
-                    self.fixes_applied += 1
-                else:
-                    heading_counts[heading_text] = 1
-            
-            fixed_lines.append(line)
-        
-        return '\n'.join(fixed_lines)
-    
-    def _fix_list_indentation(self, content: str) -> str:
-        """Fix MD007/MD005: List indentation consistency."""
-        lines = content.split('\n')
-        fixed_lines = []
-        
-        for line in lines:
-            # Fix unordered list indentation
-            if re.match(r'^\s*[-*+]\s+', line):
-                # Ensure consistent 2-space indentation
-                indent_match = re.match(r'^(\s*)[-*+]\s+', line)
-                if indent_match:
-                    indent = indent_match.group(1)
-                    if len(indent) % 2 != 0:
-                        # Fix odd indentation
-                        new_indent = ' ' * (len(indent) + 1)
-                        line = re.sub(r'^(\s*)([-*+]\s+)', f'{new_indent}\\g<2>', line)
-                        self.fixes_applied += 1
-            
-            # Fix ordered list indentation
-            elif re.match(r'^\s*\d+\.\s+', line):
-                # Ensure consistent 2-space indentation
-                indent_match = re.match(r'^(\s*)\d+\.\s+', line)
-                if indent_match:
-                    indent = indent_match.group(1)
-                    if len(indent) % 2 != 0:
-                        # Fix odd indentation
-                        new_indent = ' ' * (len(indent) + 1)
-                        line = re.sub(r'^(\s*)(\d+\.\s+)', f'{new_indent}\\g<2>', line)
-                        self.fixes_applied += 1
-            
-            fixed_lines.append(line)
-        
-        return '\n'.join(fixed_lines)
-    
-    def _fix_ordered_list_prefixes(self, content: str) -> str:
-        """Fix MD029: Ordered list item prefix consistency."""
-        lines = content.split('\n')
-        fixed_lines = []
-        
-        for line in lines:
-            # Fix ordered list prefixes to use 1. style
-            if re.match(r'^\s*\d+\.\s+', line):
-                # Ensure consistent 1. style
-                line = re.sub(r'^(\s*)\d+\.\s+', r'\g<1>1. ', line)
-                self.fixes_applied += 1
-            
-            fixed_lines.append(line)
-        
-        return '\n'.join(fixed_lines)
-    
-    def _fix_bare_urls(self, content: str) -> str:
-        """Fix MD034: Bare URLs should be wrapped in angle brackets or markdown links."""
-        lines = content.split('\n')
-        fixed_lines = []
-        
-        for line in lines:
-            # Find bare URLs (not already in markdown links or angle brackets)
-            url_pattern = r'(?<!\]\()(?<!<)(https?://[^\s<>\[\]()]+)(?!>)(?!\))'
-            urls = re.findall(url_pattern, line)
-            
-            for url in urls:
-                # Wrap in angle brackets
-                line = line.replace(url, f'<{url}>')
-                self.fixes_applied += 1
-            
-            fixed_lines.append(line)
-        
-        return '\n'.join(fixed_lines)
-    
-    def _fix_emphasis_style(self, content: str) -> str:
-        """Fix MD049: Emphasis style consistency (underscore to asterisk)."""
-        lines = content.split('\n')
-        fixed_lines = []
-        
-        for line in lines:
-            # Convert underscore emphasis to asterisk emphasis
-            # Strong emphasis: __text__ -> **text**
-            line = re.sub(r'__([^_]+)__', r'**\1**', line)
-            # Emphasis: _text_ -> *text*
-            line = re.sub(r'_([^_]+)_', r'*\1*', line)
-            fixed_lines.append(line)
-        
-        return '\n'.join(fixed_lines)
-    
-    def _fix_file_ending(self, content: str) -> str:
-        """Fix MD047: Files should end with a single newline."""
-        # Remove trailing whitespace and ensure single newline at end
-        content = content.rstrip() + '\n'
-        return content
+                written[path] = content_hash(data)
+    return fixed
+
+
+def watch_directories(fixer: UniversalMarkdownFixer, directories: List[Path],
+                      quiet: float = 0.2, polling: bool = False,
+                      ignore: Optional[LintIgnore] = None) -> None:
+    """Fix everything once, then re-fix only files that change until interrupted."""
+    watcher = open_watcher(directories, polling=polling)
+    written: Dict[Path, str] = {}
+    kind = type(watcher).__name__.replace('Watcher', '').lower()
     
-    def process_directory(self, directory: Path, pattern: str = "*.md") -> Dict[str, int]:
-        """Process all markdown files in a directory."""
-        results = {"processed": 0, "fixed": 0, "errors": 0}
-        
-        for file_path in directory.rglob(pattern):
-            if file_path.is_file():
-                results["processed"] += 1
-                self.files_processed += 1
-                
-                if self.fix_file(file_path):
-                    results["fixed"] += 1
-                    print(f"✅ Fixed: {file_path}")
-                else:
-                    print(f"✅ No changes needed: {file_path}")
-        
-        return results
+    def wanted(path: Path) -> bool:
+        return path.is_file() and (ignore is None or not ignore.ignores(path))
     
-    def process_files(self, file_paths: List[Path]) -> Dict[str, int]:
-        """Process specific markdown files."""
-        results = {"processed": 0, "fixed": 0, "errors": 0}
-        
-        for file_path in file_paths:
-            if file_path.is_file() and file_path.suffix == '.md':
-                results["processed"] += 1
-                self.files_processed += 1
-                
-                if self.fix_file(file_path):
-                    results["fixed"] += 1
-                    print(f"✅ Fixed: {file_path}")
-                else:
-                    print(f"✅ No changes needed: {file_path}")
-            else:
-                print(f"⚠️  Skipping non-markdown file: {file_path}")
-        
-        return results
+    initial = sorted(p for p in watcher.initial if ignore is None or not ignore.ignores(p))
+    print(f"👀 Watching {len(directories)} director{'y' if len(directories) == 1 else 'ies'} "
+          f"({kind}), {len(initial)} markdown files", file=fixer.progress)
+    start = time.perf_counter()
+    fixed = _fix_paths_batch(fixer, initial, written)
+    print(f"Initial pass: {fixed} fixed in {time.perf_counter() - start:.2f}s", file=fixer.progress)
+    try:
+        for changed in debounced(watcher, quiet):
+            start = time.perf_counter()
+            fixed = _fix_paths_batch(fixer, sorted(filter(wanted, changed)), written)
+            if fixed:
+                print(f"   {fixed} fixed in {(time.perf_counter() - start) * 1000:.0f}ms", file=fixer.progress)
+    except KeyboardInterrupt:
+        print("\n👋 Stopped watching", file=fixer.progress)
+    finally:
+        watcher.close()
 
 
 def main():
@@ -435,66 +375,274 @@ Examples:
   python scripts/fix-markdown-universal.py docs/ file1.md file2.md
   python scripts/fix-markdown-universal.py --max-length 120 docs/
   python scripts/fix-markdown-universal.py docs/ --max-length 100
+  python scripts/fix-markdown-universal.py --disable MD013,emphasis-style docs/
+  python scripts/fix-markdown-universal.py --rules no-trailing-spaces,MD047 docs/
+  python scripts/fix-markdown-universal.py --changed-since origin/main
+  python scripts/fix-markdown-universal.py --staged docs/
+  python scripts/fix-markdown-universal.py - < README.md
+  printf '# A\\0# B\\0' | python scripts/fix-markdown-universal.py --null-separated
+  python scripts/fix-markdown-universal.py --serve --idle-timeout 300 &
+  python scripts/fix-markdown-client.py docs/README.md
+  python scripts/fix-markdown-universal.py --watch docs/
+  python scripts/fix-markdown-universal.py --pipeline --jobs 4 docs/ draconiaChroniclesDocs/
+  python scripts/fix-markdown-universal.py --lint --dry-run docs/
+  python scripts/fix-markdown-universal.py --lint --lint-format sarif --lint-output lint.sarif docs/
+  python scripts/fix-markdown-universal.py --trace-timings --profile=/tmp/fixer.pstats docs/
         """
     )
-    parser.add_argument("paths", nargs="+", help="Files or directories to process")
-    parser.add_argument("--max-length", type=int, default=100, 
-                       help="Maximum line length (default: 100)")
+    parser.add_argument("paths", nargs="*", help="Files or directories to process")
+    parser.add_argument("--max-length", type=int,
+                       help="Maximum line length (default: MD013 line_length from the config, else 100)")
+    parser.add_argument("--config", default=str(DEFAULT_CONFIG),
+                       help="markdownlint config whose disabled rules never run (default: .markdownlint.json)")
+    parser.add_argument("--ignore-path", default=str(DEFAULT_IGNORE),
+                       help="gitignore-style file of paths to skip (default: .markdownlintignore)")
     parser.add_argument("--dry-run", action="store_true", 
                        help="Show what would be fixed without making changes")
+    parser.add_argument("--rules", metavar="RULES",
+                       help="Comma-separated rules to run (IDs like MD013 or aliases like line-length)")
+    parser.add_argument("--disable", metavar="RULES",
+                       help="Comma-separated rules to skip")
+    parser.add_argument("--lint", action="store_true",
+                       help="Report what is fixed as violations")
+    parser.add_argument("--lint-format", default="markdownlint", choices=LINT_FORMATS,
+                       help="Format of the --lint report (default: markdownlint)")
+    parser.add_argument("--lint-output", default="-", metavar="PATH",
+                       help="Where --lint writes its report (default: stdout, progress moves to stderr)")
+    parser.add_argument("--line-memo-size", type=int, default=LINE_MEMO.maxsize, metavar="N",
+                       help=f"Per-line results kept for reuse across files (default: {LINE_MEMO.maxsize}, 0 disables)")
+    parser.add_argument("--persist-line-memo", action="store_true",
+                       help="Load the line memo from .cache/scripts before fixing and save it afterwards")
+    parser.add_argument("--no-links", action="store_true",
+                       help="Skip the anchor index, link rewriting and link validation")
+    parser.add_argument("--null-separated", action="store_true",
+                       help="Read NUL-terminated buffers from stdin, write fixed buffers to stdout")
+    parser.add_argument("--report", action="store_true",
+                       help="In filter modes, write a JSON fix report per buffer to stderr")
+    parser.add_argument("--pipeline", action="store_true",
+                       help="Overlap reading, fixing and writing with bounded queues")
+    parser.add_argument("--jobs", type=int, default=1,
+                       help="Fixer processes for --pipeline (default: 1, in-process)")
+    parser.add_argument("--queue-depth", type=int, default=32,
+                       help="Files buffered per --pipeline stage (default: 32)")
+    parser.add_argument("--watch", action="store_true",
+                       help="Fix the given directories, then keep re-fixing files as they change")
+    parser.add_argument("--debounce", type=float, default=0.2,
+                       help="Seconds of quiet before a burst of changes is fixed (default: 0.2)")
+    parser.add_argument("--poll", action="store_true",
+                       help="Use mtime polling instead of inotify for --watch")
+    parser.add_argument("--serve", action="store_true",
+                       help="Run a warm fixer server on a Unix socket")
+    parser.add_argument("--socket", default=str(DEFAULT_SOCKET),
+                       help=f"Server socket path (default: {DEFAULT_SOCKET})")
+    parser.add_argument("--workers", type=int, default=4,
+                       help="Server worker threads (default: 4)")
+    parser.add_argument("--idle-timeout", type=float, default=DEFAULT_IDLE_TIMEOUT,
+                       help=f"Stop the server after this many idle seconds (default: {DEFAULT_IDLE_TIMEOUT:g})")
+    git_mode = parser.add_mutually_exclusive_group()
+    git_mode.add_argument("--changed-since", metavar="REF",
+                          help="Only process markdown files changed since REF (plus untracked ones)")
+    git_mode.add_argument("--staged", action="store_true",
+                          help="Fix the staged contents of changed markdown files in the index")
+    add_profiling_arguments(parser)
     
     args = parser.parse_args()
+    try:
+        lint_config = load_markdownlint_config(Path(args.config))
+        disabled = set(lint_config.disabled)
+        if args.rules:
+            disabled |= {spec.id for spec in RULE_SPECS} - resolve_rules(args.rules.split(','))
+        if args.disable:
+            disabled |= resolve_rules(args.disable.split(','))
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    max_length = args.max_length if args.max_length is not None else lint_config.max_line_length
+    config = replace(lint_config, max_line_length=max_length, disabled=frozenset(disabled),
+                     lint=args.lint)
+    ignore = LintIgnore(Path(args.ignore_path))
+    LINE_MEMO.resize(args.line_memo_size)
+    if args.persist_line_memo:
+        LINE_MEMO.load(LINE_MEMO_PATH)
+    
+    if args.lint and (args.serve or args.watch):
+        parser.error("--lint does not combine with --serve or --watch")
+    
+    if args.serve:
+        server = FixerServer(Path(args.socket), config, args.workers, args.idle_timeout)
+        print(f"🔧 Markdown fixer serving on {args.socket} ({args.workers} workers)", file=sys.stderr)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        except RuntimeError as e:
+            print(f"❌ {e}", file=sys.stderr)
+            sys.exit(1)
+        return
+    
+    if args.watch:
+        directories = [Path(p) for p in args.paths]
+        if not directories or not all(d.is_dir() for d in directories) \
+                or args.dry_run or args.staged or args.changed_since:
+            parser.error("--watch takes one or more directories and no --dry-run/--staged/--changed-since")
+        watch_directories(UniversalMarkdownFixer.from_config(config), directories,
+                          args.debounce, args.poll, ignore)
+        return
+    
+    # Filter modes stream through stdin/stdout and print nothing else there
+    if args.null_separated or args.paths == ['-']:
+        if args.paths not in ([], ['-']) or args.staged or args.changed_since:
+            parser.error("stdin filter modes do not take paths, --staged or --changed-since")
+        if args.null_separated:
+            sys.exit(filter_null_separated(config, sys.stdin.buffer, sys.stdout.buffer, args.report))
+        sys.exit(filter_stream(config, sys.stdin.buffer, sys.stdout.buffer, args.report))
+    
+    if not args.paths and not (args.staged or args.changed_since):
+        parser.error("at least one path is required unless --staged or --changed-since is used")
     
-    fixer = UniversalMarkdownFixer(max_line_length=args.max_length)
+    batch = WriteBatch()
+    fixer = UniversalMarkdownFixer.from_config(config, batch=batch)
+    lint_report = None
+    if args.lint:
+        lint_report = LintReport()
+        fixer.on_violations = lint_report
+    # With the lint report on stdout, everything else goes to stderr
+    progress = sys.stderr if args.lint and args.lint_output == '-' else sys.stdout
+    fixer.progress = progress
+    tracker = None
+    if not args.no_links and not args.staged:
+        tracker = LinkTracker(AnchorIndex())
+        fixer.on_fixed = tracker
     
-    print("🔧 Universal Markdown Fixer")
-    print("=" * 50)
-    print(f"Max line length: {args.max_length}")
-    print(f"Dry run: {args.dry_run}")
-    print("=" * 50)
+    print("🔧 Universal Markdown Fixer", file=progress)
+    print("=" * 50, file=progress)
+    print(f"Max line length: {config.max_line_length}", file=progress)
+    if config.disabled:
+        print(f"Disabled rules: {', '.join(sorted(config.disabled))}", file=progress)
+    print(f"Dry run: {args.dry_run}", file=progress)
+    print("=" * 50, file=progress)
     
     total_results = {"processed": 0, "fixed": 0, "errors": 0}
     
-    for path_str in args.paths:
-        path = Path(path_str)
-        
-        if path.is_file():
-            # Process single file
-            if path.suffix == '.md':
-                total_results["processed"] += 1
-                fixer.files_processed += 1
+    with batch:
+        if args.staged or args.changed_since:
+            try:
+                root = toplevel(Path.cwd())
+                pathspecs = git_pathspecs(root, args.paths)
+                if args.staged:
+                    results = process_staged(fixer, root, pathspecs, args.dry_run, ignore)
+                else:
+                    with phase("discovery"):
+                        changed = [root / rel for rel in changed_since(root, args.changed_since, pathspecs)]
+                        changed = [path for path in changed if not ignore.ignores(path)]
+                    print(f"Changed markdown files since {args.changed_since}: {len(changed)}", file=progress)
+                    results = fixer.process_files(changed)
+            except GitError as e:
+                print(f"❌ git: {e}", file=progress)
+                results = {"processed": 0, "fixed": 0, "errors": 1}
+            for key in total_results:
+                total_results[key] += results[key]
+        
+        if args.pipeline and not (args.staged or args.changed_since):
+            files = []
+            for path_str in args.paths:
+                path = Path(path_str)
+                if path.is_dir():
+                    with phase("discovery"):
+                        files.extend(ignore.markdown_files(path))
+                elif ignore.ignores(path):
+                    print(f"⏭️  Ignored: {path}", file=progress)
+                elif path.is_file() and path.suffix == '.md':
+                    files.append(path)
+                elif path.is_file():
+                    print(f"⚠️  Skipping non-markdown file: {path}", file=progress)
+                else:
+                    print(f"❌ Path not found: {path}", file=progress)
+                    total_results["errors"] += 1
+            results = process_pipelined(fixer, files, config, args.jobs, args.queue_depth)
+            for key in total_results:
+                total_results[key] += results[key]
+        
+        for path_str in [] if (args.staged or args.changed_since or args.pipeline) else args.paths:
+            path = Path(path_str)
+        
+            if path.exists() and ignore.ignores(path):
+                print(f"⏭️  Ignored: {path}", file=progress)
+        
+            elif path.is_file():
+                # Process single file
+                if path.suffix == '.md':
+                    total_results["processed"] += 1
+                    fixer.files_processed += 1
                 
-                if fixer.fix_file(path):
-                    total_results["fixed"] += 1
-                    print(f"✅ Fixed: {path}")
+                    if fixer.fix_file(path):
+                        total_results["fixed"] += 1
+                        print(f"✅ Fixed: {path}", file=progress)
+                    else:
+                        print(f"✅ No changes needed: {path}", file=progress)
                 else:
-                    print(f"✅ No changes needed: {path}")
-            else:
-                print(f"⚠️  Skipping non-markdown file: {path}")
+                    print(f"⚠️  Skipping non-markdown file: {path}", file=progress)
         
-        elif path.is_dir():
-            # Process directory
-            results = fixer.process_directory(path)
-            total_results["processed"] += results["processed"]
-            total_results["fixed"] += results["fixed"]
-            total_results["errors"] += results["errors"]
+            elif path.is_dir():
+                # Process directory, pruning ignored subtrees
+                with phase("discovery"):
+                    files = ignore.markdown_files(path)
+                results = fixer.process_files(files)
+                total_results["processed"] += results["processed"]
+                total_results["fixed"] += results["fixed"]
+                total_results["errors"] += results["errors"]
         
-        else:
-            print(f"❌ Path not found: {path}")
-            total_results["errors"] += 1
+            else:
+                print(f"❌ Path not found: {path}", file=progress)
+                total_results["errors"] += 1
+        
+        broken = []
+        if tracker is not None:
+            for source, count in tracker.rewrite_renamed(batch.stage):
+                print(f"🔗 Updated links to renamed headings: {source}", file=progress)
+            broken = tracker.validate()
+            for link in broken:
+                print(f"⚠️  {link.source}:{link.line}: broken link ({link.raw}): {link.reason}", file=progress)
+        
+        # Nothing staged is written in a dry run
+        if args.dry_run:
+            batch.discard()
+    
+    if tracker is not None:
+        if args.dry_run:
+            tracker.index.forget_pending()
+        tracker.index.save()
+    if args.persist_line_memo and LINE_MEMO.maxsize > 0:
+        LINE_MEMO.save(LINE_MEMO_PATH)
     
-    print("\n" + "=" * 50)
-    print("📊 Summary:")
-    print(f"  Files processed: {total_results['processed']}")
-    print(f"  Files fixed: {total_results['fixed']}")
-    print(f"  Errors: {total_results['errors']}")
-    print(f"  Total fixes applied: {fixer.fixes_applied}")
+    print("\n" + "=" * 50, file=progress)
+    print("📊 Summary:", file=progress)
+    print(f"  Files processed: {total_results['processed']}", file=progress)
+    print(f"  Files fixed: {total_results['fixed']}", file=progress)
+    print(f"  Errors: {total_results['errors']}", file=progress)
+    print(f"  Total fixes applied: {fixer.fixes_applied}", file=progress)
+    print(f"  Clean by pre-scan: {fixer.prescan_skipped}", file=progress)
+    if tracker is not None:
+        print(f"  Broken links: {len(broken)}", file=progress)
+    memo = LINE_MEMO.stats()
+    if memo["hits"] + memo["misses"]:
+        # Lookups made in --jobs worker processes are not counted here
+        print(f"  Line memo: {memo['hit_rate']:.1%} hit rate ({memo['hits']} hits, "
+              f"{memo['misses']} misses, {memo['evictions']} evicted)", file=progress)
+    if lint_report is not None:
+        print(f"  Violations: {len(lint_report)}", file=progress)
+        rendered = lint_report.render(args.lint_format)
+        if args.lint_output == '-':
+            sys.stdout.write(rendered)
+        else:
+            Path(args.lint_output).write_text(rendered, encoding='utf-8')
     
     if total_results["errors"] > 0:
         sys.exit(1)
+    elif lint_report is not None and len(lint_report) and args.dry_run:
+        sys.exit(1)  # A check run: something would change
     else:
-        print("🎉 All files processed successfully!")
+        print("🎉 All files processed successfully!", file=progress)
 
 
 if __name__ == "__main__":
-    main()
+    run_main(main)
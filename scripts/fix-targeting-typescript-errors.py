@@ -4,49 +4,48 @@ Fix TypeScript errors in targeting system files.
 This script addresses the specific errors found in the CI pipeline.
 """
 
-import re
-import sys
+import argparse
 from pathlib import Path
+from typing import Optional
 
-def fix_typescript_errors():
-    """Fix TypeScript errors in targeting system files."""
-    repo_root = Path(__file__).parent.parent
-    
-    # Fix custom-strategy-framework.ts
-    file_path = repo_root / "packages/sim/src/combat/custom-strategy-framework.ts"
-    if file_path.exists():
-        content = file_path.read_text(encoding='utf-8')
-        
-        # Remove duplicate isUnlocked property and method
-        content = re.sub(r'  private isUnlocked: boolean;\n', '', content)
-        content = re.sub(r'  isUnlocked\(\): boolean \{\n    return this\._isUnlocked;\n  \}\n', '', content)
-        
-        # Fix calculate method to be synchronous
-        content = re.sub(r'  async calculate\(enemies: Enemy\[\], dragon: Dragon\): Promise<Enemy \| null> \{', 
-                        '  calculate(enemies: Enemy[], dragon: Dragon): Enemy | null {', content)
-        
-        # Fix health property access
-        content = re.sub(r'enemy\.health / enemy\.maxHealth', 'enemy.health.current / enemy.health.max', content)
-        
-        # Fix utility functions to return non-undefined
-        content = re.sub(r'return enemies\[Math\.floor\(Math\.random\(\) \* enemies\.length\)\];', 
-                        'return enemies[Math.floor(Math.random() * enemies.length)] || null;', content)
-        content = re.sub(r'return closestEnemy;', 'return closestEnemy || null;', content)
-        content = re.sub(r'return highestThreatEnemy;', 'return highestThreatEnemy || null;', content)
-        
-        file_path.write_text(content, encoding='utf-8')
-        print(f"Fixed {file_path}")
-    
-    # Fix performance-monitor.ts
-    file_path = repo_root / "packages/sim/src/combat/performance-monitor.ts"
-    if file_path.exists():
-        content = file_path.read_text(encoding='utf-8')
-        
-        # Remove TargetingMetrics import and define locally
-        content = re.sub(r'import type \{\s*TargetingMetrics,\s*\} from \'\./types\.js\';', '', content)
-        
-        # Add local TargetingMetrics interface
-        content = re.sub(r'import type \{', '''export interface TargetingMetrics {
+from _codemod import (RuleSet, add_target_arguments, discover_targets, fix_verified, open_index,
+                      report_unstable, sub_rule)
+from _profiling import add_profiling_arguments, phase, run_main
+from _writeback import WriteBatch
+
+# Ordered fixes per file, applied top to bottom. Insertions are guarded with
+# lookarounds so that re-running the script leaves fixed files untouched.
+TARGET_FIXES = {
+    "packages/sim/src/combat/custom-strategy-framework.ts": [
+        sub_rule('Remove duplicate isUnlocked property and method #1',
+                 r'  private isUnlocked: boolean;\n',
+                 ''),
+        sub_rule('Remove duplicate isUnlocked property and method #2',
+                 r'  isUnlocked\(\): boolean \{\n    return this\._isUnlocked;\n  \}\n',
+                 ''),
+        sub_rule('Fix calculate method to be synchronous',
+                 r'  async calculate\(enemies: Enemy\[\], dragon: Dragon\): Promise<Enemy \| null> \{',
+                 '  calculate(enemies: Enemy[], dragon: Dragon): Enemy | null {'),
+        sub_rule('Fix health property access',
+                 r'enemy\.health / enemy\.maxHealth',
+                 'enemy.health.current / enemy.health.max'),
+        sub_rule('Fix utility functions to return non-undefined #1',
+                 r'return enemies\[Math\.floor\(Math\.random\(\) \* enemies\.length\)\];',
+                 'return enemies[Math.floor(Math.random() * enemies.length)] || null;'),
+        sub_rule('Fix utility functions to return non-undefined #2',
+                 r'return closestEnemy;',
+                 'return closestEnemy || null;'),
+        sub_rule('Fix utility functions to return non-undefined #3',
+                 r'return highestThreatEnemy;',
+                 'return highestThreatEnemy || null;'),
+    ],
+    "packages/sim/src/combat/performance-monitor.ts": [
+        sub_rule('Remove TargetingMetrics import and define locally',
+                 r'import type \{\s*TargetingMetrics,\s*\} from \'\./types\.js\';',
+                 ''),
+        sub_rule('Add local TargetingMetrics interface',
+                 r'import type \{',
+                 '''export interface TargetingMetrics {
   targetSelectionTime: number;
   rangeDetectionTime: number;
   threatCalculationTime: number;
@@ -57,113 +56,120 @@ def fix_typescript_errors():
   performanceScore: number;
 }
 
-import type {''', content)
-        
-        # Fix undefined array access
-        content = re.sub(r'return sortedValues\[Math\.max\(0, index\)\];', 
-                        'return sortedValues[Math.max(0, index)] || 0;', content)
-        
-        file_path.write_text(content, encoding='utf-8')
-        print(f"Fixed {file_path}")
-    
-    # Fix persistence-modes.ts
-    file_path = repo_root / "packages/sim/src/combat/persistence-modes.ts"
-    if file_path.exists():
-        content = file_path.read_text(encoding='utf-8')
-        
-        # Add mode property to BasePersistenceHandler
-        content = re.sub(r'abstract class BasePersistenceHandler implements TargetPersistenceHandler \{', 
-                        '''abstract class BasePersistenceHandler implements TargetPersistenceHandler {
-  public mode: TargetPersistenceMode;''', content)
-        
-        # Fix constructor to set mode
-        content = re.sub(r'  constructor\(mode: TargetPersistenceMode, isUnlocked: boolean = true\) \{', 
-                        '''  constructor(mode: TargetPersistenceMode, isUnlocked: boolean = true) {
-    this.mode = mode;''', content)
-        
-        # Fix isUnlocked to be property instead of method
-        content = re.sub(r'  isUnlocked\(\): boolean \{', '  public isUnlocked: boolean;', content)
-        content = re.sub(r'    return this\._isUnlocked;\n  \}', '', content)
-        
-        # Fix concrete handler constructors
-        content = re.sub(r'  constructor\(\) \{', '  constructor() {\n    super(\'keep_target\', true);', content)
-        content = re.sub(r'  constructor\(\) \{', '  constructor() {\n    super(\'switch_freely\', true);', content)
-        content = re.sub(r'  constructor\(\) \{', '  constructor() {\n    super(\'switch_aggressive\', true);', content)
-        content = re.sub(r'  constructor\(\) \{', '  constructor() {\n    super(\'manual_only\', true);', content)
-        
-        file_path.write_text(content, encoding='utf-8')
-        print(f"Fixed {file_path}")
-    
-    # Fix targeting-strategies.ts
-    file_path = repo_root / "packages/sim/src/combat/targeting-strategies.ts"
-    if file_path.exists():
-        content = file_path.read_text(encoding='utf-8')
-        
-        # Add strategy property to BaseStrategyHandler
-        content = re.sub(r'abstract class BaseStrategyHandler implements TargetingStrategyHandler \{', 
-                        '''abstract class BaseStrategyHandler implements TargetingStrategyHandler {
-  public strategy: TargetingStrategy;''', content)
-        
-        # Fix constructor to set strategy
-        content = re.sub(r'  constructor\(strategy: TargetingStrategy, isUnlocked: boolean = true\) \{', 
-                        '''  constructor(strategy: TargetingStrategy, isUnlocked: boolean = true) {
-    this.strategy = strategy;''', content)
-        
-        # Fix isUnlocked to be property instead of method
-        content = re.sub(r'  isUnlocked\(\): boolean \{', '  public isUnlocked: boolean;', content)
-        content = re.sub(r'    return this\._isUnlocked;\n  \}', '', content)
-        
-        # Fix concrete handler constructors
-        content = re.sub(r'  constructor\(\) \{', '  constructor() {\n    super(\'closest\', true);', content)
-        content = re.sub(r'  constructor\(\) \{', '  constructor() {\n    super(\'highest_threat\', true);', content)
-        content = re.sub(r'  constructor\(\) \{', '  constructor() {\n    super(\'lowest_threat\', true);', content)
-        content = re.sub(r'  constructor\(\) \{', '  constructor() {\n    super(\'highest_hp\', true);', content)
-        content = re.sub(r'  constructor\(\) \{', '  constructor() {\n    super(\'lowest_hp\', true);', content)
-        content = re.sub(r'  constructor\(\) \{', '  constructor() {\n    super(\'highest_damage\', true);', content)
-        content = re.sub(r'  constructor\(\) \{', '  constructor() {\n    super(\'lowest_damage\', true);', content)
-        content = re.sub(r'  constructor\(\) \{', '  constructor() {\n    super(\'fastest\', true);', content)
-        content = re.sub(r'  constructor\(\) \{', '  constructor() {\n    super(\'slowest\', true);', content)
-        content = re.sub(r'  constructor\(\) \{', '  constructor() {\n    super(\'highest_armor\', true);', content)
-        content = re.sub(r'  constructor\(\) \{', '  constructor() {\n    super(\'lowest_armor\', true);', content)
-        content = re.sub(r'  constructor\(\) \{', '  constructor() {\n    super(\'shielded\', true);', content)
-        content = re.sub(r'  constructor\(\) \{', '  constructor() {\n    super(\'unshielded\', true);', content)
-        content = re.sub(r'  constructor\(\) \{', '  constructor() {\n    super(\'elemental_weak\', true);', content)
-        content = re.sub(r'  constructor\(\) \{', '  constructor() {\n    super(\'elemental_strong\', true);', content)
-        content = re.sub(r'  constructor\(\) \{', '  constructor() {\n    super(\'custom\', true);', content)
-        
-        file_path.write_text(content, encoding='utf-8')
-        print(f"Fixed {file_path}")
-    
-    # Fix targeting.ts
-    file_path = repo_root / "packages/sim/src/combat/targeting.ts"
-    if file_path.exists():
-        content = file_path.read_text(encoding='utf-8')
-        
-        # Add state property to DefaultTargetingSystem
-        content = re.sub(r'export class DefaultTargetingSystem implements TargetingSystem \{', 
-                        '''export class DefaultTargetingSystem implements TargetingSystem {
-  public state: TargetingState;''', content)
-        
-        # Fix constructor to set state
-        content = re.sub(r'  constructor\(config: TargetingConfig, _state: TargetingState\) \{', 
-                        '''  constructor(config: TargetingConfig, state: TargetingState) {
-    this.state = state;''', content)
-        
-        # Fix rangeDetection to be mutable
-        content = re.sub(r'  private readonly rangeDetection: RangeDetection;', 
-                        '  private rangeDetection: RangeDetection;', content)
-        
-        file_path.write_text(content, encoding='utf-8')
-        print(f"Fixed {file_path}")
-    
-    # Fix types.ts - add missing exports
-    file_path = repo_root / "packages/sim/src/combat/types.ts"
-    if file_path.exists():
-        content = file_path.read_text(encoding='utf-8')
-        
-        # Add TargetingMetrics interface
-        if 'export interface TargetingMetrics' not in content:
-            content = re.sub(r'export interface PlayerTargetingPreferences \{', '''export interface TargetingMetrics {
+import type {''', unless='export interface TargetingMetrics'),
+        sub_rule('Fix undefined array access',
+                 r'return sortedValues\[Math\.max\(0, index\)\];',
+                 'return sortedValues[Math.max(0, index)] || 0;'),
+    ],
+    "packages/sim/src/combat/persistence-modes.ts": [
+        sub_rule('Add mode property to BasePersistenceHandler',
+                 r'abstract class BasePersistenceHandler implements TargetPersistenceHandler \{(?!\n  public mode:)',
+                 '''abstract class BasePersistenceHandler implements TargetPersistenceHandler {
+  public mode: TargetPersistenceMode;'''),
+        sub_rule('Fix constructor to set mode',
+                 r'  constructor\(mode: TargetPersistenceMode, isUnlocked: boolean = true\) \{(?!\n    this\.mode = mode;)',
+                 '''  constructor(mode: TargetPersistenceMode, isUnlocked: boolean = true) {
+    this.mode = mode;'''),
+        sub_rule('Fix isUnlocked to be property instead of method #1',
+                 r'  isUnlocked\(\): boolean \{',
+                 '  public isUnlocked: boolean;'),
+        sub_rule('Fix isUnlocked to be property instead of method #2',
+                 r'    return this\._isUnlocked;\n  \}',
+                 ''),
+        sub_rule("Fix concrete handler constructors ('keep_target')",
+                 r'  constructor\(\) \{(?!\n    super\()',
+                 '  constructor() {\n    super(\'keep_target\', true);', count=1),
+        sub_rule("Fix concrete handler constructors ('switch_freely')",
+                 r'  constructor\(\) \{(?!\n    super\()',
+                 '  constructor() {\n    super(\'switch_freely\', true);', count=1),
+        sub_rule("Fix concrete handler constructors ('switch_aggressive')",
+                 r'  constructor\(\) \{(?!\n    super\()',
+                 '  constructor() {\n    super(\'switch_aggressive\', true);', count=1),
+        sub_rule("Fix concrete handler constructors ('manual_only')",
+                 r'  constructor\(\) \{(?!\n    super\()',
+                 '  constructor() {\n    super(\'manual_only\', true);', count=1),
+    ],
+    "packages/sim/src/combat/targeting-strategies.ts": [
+        sub_rule('Add strategy property to BaseStrategyHandler',
+                 r'abstract class BaseStrategyHandler implements TargetingStrategyHandler \{(?!\n  public strategy:)',
+                 '''abstract class BaseStrategyHandler implements TargetingStrategyHandler {
+  public strategy: TargetingStrategy;'''),
+        sub_rule('Fix constructor to set strategy',
+                 r'  constructor\(strategy: TargetingStrategy, isUnlocked: boolean = true\) \{(?!\n    this\.strategy = strategy;)',
+                 '''  constructor(strategy: TargetingStrategy, isUnlocked: boolean = true) {
+    this.strategy = strategy;'''),
+        sub_rule('Fix isUnlocked to be property instead of method #1',
+                 r'  isUnlocked\(\): boolean \{',
+                 '  public isUnlocked: boolean;'),
+        sub_rule('Fix isUnlocked to be property instead of method #2',
+                 r'    return this\._isUnlocked;\n  \}',
+                 ''),
+        sub_rule("Fix concrete handler constructors ('closest')",
+                 r'  constructor\(\) \{(?!\n    super\()',
+                 '  constructor() {\n    super(\'closest\', true);', count=1),
+        sub_rule("Fix concrete handler constructors ('highest_threat')",
+                 r'  constructor\(\) \{(?!\n    super\()',
+                 '  constructor() {\n    super(\'highest_threat\', true);', count=1),
+        sub_rule("Fix concrete handler constructors ('lowest_threat')",
+                 r'  constructor\(\) \{(?!\n    super\()',
+                 '  constructor() {\n    super(\'lowest_threat\', true);', count=1),
+        sub_rule("Fix concrete handler constructors ('highest_hp')",
+                 r'  constructor\(\) \{(?!\n    super\()',
+                 '  constructor() {\n    super(\'highest_hp\', true);', count=1),
+        sub_rule("Fix concrete handler constructors ('lowest_hp')",
+                 r'  constructor\(\) \{(?!\n    super\()',
+                 '  constructor() {\n    super(\'lowest_hp\', true);', count=1),
+        sub_rule("Fix concrete handler constructors ('highest_damage')",
+                 r'  constructor\(\) \{(?!\n    super\()',
+                 '  constructor() {\n    super(\'highest_damage\', true);', count=1),
+        sub_rule("Fix concrete handler constructors ('lowest_damage')",
+                 r'  constructor\(\) \{(?!\n    super\()',
+                 '  constructor() {\n    super(\'lowest_damage\', true);', count=1),
+        sub_rule("Fix concrete handler constructors ('fastest')",
+                 r'  constructor\(\) \{(?!\n    super\()',
+                 '  constructor() {\n    super(\'fastest\', true);', count=1),
+        sub_rule("Fix concrete handler constructors ('slowest')",
+                 r'  constructor\(\) \{(?!\n    super\()',
+                 '  constructor() {\n    super(\'slowest\', true);', count=1),
+        sub_rule("Fix concrete handler constructors ('highest_armor')",
+                 r'  constructor\(\) \{(?!\n    super\()',
+                 '  constructor() {\n    super(\'highest_armor\', true);', count=1),
+        sub_rule("Fix concrete handler constructors ('lowest_armor')",
+                 r'  constructor\(\) \{(?!\n    super\()',
+                 '  constructor() {\n    super(\'lowest_armor\', true);', count=1),
+        sub_rule("Fix concrete handler constructors ('shielded')",
+                 r'  constructor\(\) \{(?!\n    super\()',
+                 '  constructor() {\n    super(\'shielded\', true);', count=1),
+        sub_rule("Fix concrete handler constructors ('unshielded')",
+                 r'  constructor\(\) \{(?!\n    super\()',
+                 '  constructor() {\n    super(\'unshielded\', true);', count=1),
+        sub_rule("Fix concrete handler constructors ('elemental_weak')",
+                 r'  constructor\(\) \{(?!\n    super\()',
+                 '  constructor() {\n    super(\'elemental_weak\', true);', count=1),
+        sub_rule("Fix concrete handler constructors ('elemental_strong')",
+                 r'  constructor\(\) \{(?!\n    super\()',
+                 '  constructor() {\n    super(\'elemental_strong\', true);', count=1),
+        sub_rule("Fix concrete handler constructors ('custom')",
+                 r'  constructor\(\) \{(?!\n    super\()',
+                 '  constructor() {\n    super(\'custom\', true);', count=1),
+    ],
+    "packages/sim/src/combat/targeting.ts": [
+        sub_rule('Add state property to DefaultTargetingSystem',
+                 r'export class DefaultTargetingSystem implements TargetingSystem \{(?!\n  public state:)',
+                 '''export class DefaultTargetingSystem implements TargetingSystem {
+  public state: TargetingState;'''),
+        sub_rule('Fix constructor to set state',
+                 r'  constructor\(config: TargetingConfig, _state: TargetingState\) \{',
+                 '''  constructor(config: TargetingConfig, state: TargetingState) {
+    this.state = state;'''),
+        sub_rule('Fix rangeDetection to be mutable',
+                 r'  private readonly rangeDetection: RangeDetection;',
+                 '  private rangeDetection: RangeDetection;'),
+    ],
+    "packages/sim/src/combat/types.ts": [
+        sub_rule('Add TargetingMetrics interface',
+                 r'export interface PlayerTargetingPreferences \{',
+                 '''export interface TargetingMetrics {
   targetSelectionTime: number;
   rangeDetectionTime: number;
   threatCalculationTime: number;
@@ -174,184 +180,213 @@ import type {''', content)
   performanceScore: number;
 }
 
-export interface PlayerTargetingPreferences {''', content)
-        
-        # Add missing properties to TargetingConfig
-        if 'threatWeights' not in content:
-            content = re.sub(r'  targetLockDuration: number;', '''  targetLockDuration: number;
+export interface PlayerTargetingPreferences {''', unless='export interface TargetingMetrics'),
+        sub_rule('Add missing properties to TargetingConfig',
+                 r'  targetLockDuration: number;',
+                 '''  targetLockDuration: number;
   threatWeights: {
     proximity: number;
     health: number;
     damage: number;
     speed: number;
   };
-  customSettings: Record<string, any>;''', content)
-        
-        # Fix Enemy interface to include type and maxHealth
-        if 'type: string;' not in content:
-            content = re.sub(r'  isAlive: boolean;', '''  isAlive: boolean;
+  customSettings: Record<string, any>;''', unless='threatWeights'),
+        sub_rule('Fix Enemy interface to include type and maxHealth',
+                 r'  isAlive: boolean;',
+                 '''  isAlive: boolean;
   type: string;
-  maxHealth: number;''', content)
-        
-        file_path.write_text(content, encoding='utf-8')
-        print(f"Fixed {file_path}")
-    
-    # Fix targeting-config.ts
-    file_path = repo_root / "packages/sim/src/combat/targeting-config.ts"
-    if file_path.exists():
-        content = file_path.read_text(encoding='utf-8')
-        
-        # Fix enabledStrategies type
-        content = re.sub(r'enabledStrategies: string\[\]', 'enabledStrategies: TargetingStrategy[]', content)
-        
-        # Add missing properties to baseConfig
-        content = re.sub(r'    targetLockDuration: 5000,', '''    targetLockDuration: 5000,
+  maxHealth: number;''', unless='type: string;'),
+    ],
+    "packages/sim/src/combat/targeting-config.ts": [
+        sub_rule('Fix enabledStrategies type',
+                 r'enabledStrategies: string\[\]',
+                 'enabledStrategies: TargetingStrategy[]'),
+        sub_rule('Add missing properties to baseConfig',
+                 r'    targetLockDuration: 5000,(?!\n    threatWeights:)',
+                 '''    targetLockDuration: 5000,
     threatWeights: {
       proximity: 0.4,
       health: 0.3,
       damage: 0.2,
       speed: 0.1,
     },
-    customSettings: {},''', content)
-        
-        file_path.write_text(content, encoding='utf-8')
-        print(f"Fixed {file_path}")
-    
-    # Fix targeting-presets.ts
-    file_path = repo_root / "packages/sim/src/combat/targeting-presets.ts"
-    if file_path.exists():
-        content = file_path.read_text(encoding='utf-8')
-        
-        # Remove PlayerTargetingPreferences import
-        content = re.sub(r'  PlayerTargetingPreferences,\s*', '', content)
-        
-        # Fix strategy names
-        content = re.sub(r'elemental_weakness', 'elemental_weak', content)
-        content = re.sub(r'highest_health', 'highest_hp', content)
-        content = re.sub(r'lowest_health', 'lowest_hp', content)
-        content = re.sub(r'highest_shield', 'shielded', content)
-        content = re.sub(r'lowest_shield', 'unshielded', content)
-        
-        # Fix strategy complexity mapping
-        content = re.sub(r'highest_health: 1,', 'highest_hp: 1,', content)
-        content = re.sub(r'lowest_health: 1,', 'lowest_hp: 1,', content)
-        content = re.sub(r'highest_shield: 2,', 'shielded: 2,', content)
-        content = re.sub(r'lowest_shield: 2,', 'unshielded: 2,', content)
-        content = re.sub(r'elemental_weakness: 3,', 'elemental_weak: 3,', content)
-        
-        file_path.write_text(content, encoding='utf-8')
-        print(f"Fixed {file_path}")
-    
-    # Fix targeting-ui.ts
-    file_path = repo_root / "packages/sim/src/combat/targeting-ui.ts"
-    if file_path.exists():
-        content = file_path.read_text(encoding='utf-8')
-        
-        # Remove PlayerTargetingPreferences import
-        content = re.sub(r'  PlayerTargetingPreferences,\s*', '', content)
-        
-        # Fix getConfig method call
-        content = re.sub(r'this\.configManager\.getConfig\(\)', 'this.configManager.config', content)
-        
-        # Fix strategy names
-        content = re.sub(r'highest_health', 'highest_hp', content)
-        content = re.sub(r'lowest_health', 'lowest_hp', content)
-        content = re.sub(r'elemental_weakness', 'elemental_weak', content)
-        
-        # Fix undefined preset handling
-        content = re.sub(r'this\.selectPreset\(preset\);', 'if (preset) this.selectPreset(preset);', content)
-        
-        file_path.write_text(content, encoding='utf-8')
-        print(f"Fixed {file_path}")
-    
-    # Fix targeting-analytics.ts
-    file_path = repo_root / "packages/sim/src/combat/targeting-analytics.ts"
-    if file_path.exists():
-        content = file_path.read_text(encoding='utf-8')
-        
-        # Remove TargetingMetrics import
-        content = re.sub(r'  TargetingMetrics,\s*', '', content)
-        
-        # Fix undefined array access
-        content = re.sub(r'window\.localStorage\.removeItem\(events\[i\]\.key\);', 
-                        'if (events[i]) window.localStorage.removeItem(events[i].key);', content)
-        content = re.sub(r'startTime: events\[0\]\.timestamp,', 'startTime: events[0]?.timestamp || 0,', content)
-        content = re.sub(r'endTime: events\[events\.length - 1\]\.timestamp,', 'endTime: events[events.length - 1]?.timestamp || 0,', content)
-        content = re.sub(r'duration: events\[events\.length - 1\]\.timestamp - events\[0\]\.timestamp,', 
-                        'duration: (events[events.length - 1]?.timestamp || 0) - (events[0]?.timestamp || 0),', content)
-        
-        # Fix sessionId arithmetic
-        content = re.sub(r'sessionDuration: Date\.now\(\) - this\.sessionId,', 
-                        'sessionDuration: Date.now() - Number(this.sessionId),', content)
-        
-        # Fix userAgent type
-        content = re.sub(r'userAgent: typeof window !== \'undefined\' \? window\.navigator\.userAgent \|\| \'unknown\' : \'unknown\',', 
-                        'userAgent: typeof window !== \'undefined\' ? (window.navigator.userAgent || \'unknown\') : \'unknown\',', content)
-        
-        # Fix Enemy property access
-        content = re.sub(r'target\?\.type', 'target?.type', content)
-        content = re.sub(r'target \? target\.health / target\.maxHealth : 0', 
-                        'target ? target.health.current / target.health.max : 0', content)
-        content = re.sub(r'fromTarget\?\.type', 'fromTarget?.type', content)
-        content = re.sub(r'toTarget\?\.type', 'toTarget?.type', content)
-        
-        file_path.write_text(content, encoding='utf-8')
-        print(f"Fixed {file_path}")
-    
-    # Fix targeting-unlock.ts
-    file_path = repo_root / "packages/sim/src/combat/targeting-unlock.ts"
-    if file_path.exists():
-        content = file_path.read_text(encoding='utf-8')
-        
-        # Fix nextRequirement type
-        content = re.sub(r'return \{ unlock, progress, nextRequirement \};', 
-                        'return { unlock, progress, nextRequirement: nextRequirement || undefined };', content)
-        
-        # Fix undefined array access
-        content = re.sub(r'return scoredUnlocks\[0\]\.unlock;', 'return scoredUnlocks[0]?.unlock;', content)
-        
-        file_path.write_text(content, encoding='utf-8')
-        print(f"Fixed {file_path}")
-    
-    # Fix targeting-persistence.ts
-    file_path = repo_root / "packages/sim/src/combat/targeting-persistence.ts"
-    if file_path.exists():
-        content = file_path.read_text(encoding='utf-8')
-        
-        # Remove PlayerTargetingPreferences import
-        content = re.sub(r'  PlayerTargetingPreferences,\s*', '', content)
-        
-        file_path.write_text(content, encoding='utf-8')
-        print(f"Fixed {file_path}")
-    
-    # Fix threat-assessment.ts
-    file_path = repo_root / "packages/sim/src/combat/threat-assessment.ts"
-    if file_path.exists():
+    customSettings: {},'''),
+    ],
+    "packages/sim/src/combat/targeting-presets.ts": [
+        sub_rule('Remove PlayerTargetingPreferences import',
+                 r'  PlayerTargetingPreferences,\s*',
+                 ''),
+        sub_rule('Fix strategy names #1',
+                 r'elemental_weakness',
+                 'elemental_weak'),
+        sub_rule('Fix strategy names #2',
+                 r'highest_health',
+                 'highest_hp'),
+        sub_rule('Fix strategy names #3',
+                 r'lowest_health',
+                 'lowest_hp'),
+        sub_rule('Fix strategy names #4',
+                 r'highest_shield',
+                 'shielded'),
+        sub_rule('Fix strategy names #5',
+                 r'lowest_shield',
+                 'unshielded'),
+        sub_rule('Fix strategy complexity mapping #1',
+                 r'highest_health: 1,',
+                 'highest_hp: 1,'),
+        sub_rule('Fix strategy complexity mapping #2',
+                 r'lowest_health: 1,',
+                 'lowest_hp: 1,'),
+        sub_rule('Fix strategy complexity mapping #3',
+                 r'highest_shield: 2,',
+                 'shielded: 2,'),
+        sub_rule('Fix strategy complexity mapping #4',
+                 r'lowest_shield: 2,',
+                 'unshielded: 2,'),
+        sub_rule('Fix strategy complexity mapping #5',
+                 r'elemental_weakness: 3,',
+                 'elemental_weak: 3,'),
+    ],
+    "packages/sim/src/combat/targeting-ui.ts": [
+        sub_rule('Remove PlayerTargetingPreferences import',
+                 r'  PlayerTargetingPreferences,\s*',
+                 ''),
+        sub_rule('Fix getConfig method call',
+                 r'this\.configManager\.getConfig\(\)',
+                 'this.configManager.config'),
+        sub_rule('Fix strategy names #1',
+                 r'highest_health',
+                 'highest_hp'),
+        sub_rule('Fix strategy names #2',
+                 r'lowest_health',
+                 'lowest_hp'),
+        sub_rule('Fix strategy names #3',
+                 r'elemental_weakness',
+                 'elemental_weak'),
+        sub_rule('Fix undefined preset handling',
+                 r'(?<!if \(preset\) )this\.selectPreset\(preset\);',
+                 'if (preset) this.selectPreset(preset);'),
+    ],
+    "packages/sim/src/combat/targeting-analytics.ts": [
+        sub_rule('Remove TargetingMetrics import',
+                 r'  TargetingMetrics,\s*',
+                 ''),
+        sub_rule('Fix undefined array access #1',
+                 r'(?<!if \(events\[i\]\) )window\.localStorage\.removeItem\(events\[i\]\.key\);',
+                 'if (events[i]) window.localStorage.removeItem(events[i].key);'),
+        sub_rule('Fix undefined array access #2',
+                 r'startTime: events\[0\]\.timestamp,',
+                 'startTime: events[0]?.timestamp || 0,'),
+        sub_rule('Fix undefined array access #3',
+                 r'endTime: events\[events\.length - 1\]\.timestamp,',
+                 'endTime: events[events.length - 1]?.timestamp || 0,'),
+        sub_rule('Fix undefined array access #4',
+                 r'duration: events\[events\.length - 1\]\.timestamp - events\[0\]\.timestamp,',
+                 'duration: (events[events.length - 1]?.timestamp || 0) - (events[0]?.timestamp || 0),'),
+        sub_rule('Fix sessionId arithmetic',
+                 r'sessionDuration: Date\.now\(\) - this\.sessionId,',
+                 'sessionDuration: Date.now() - Number(this.sessionId),'),
+        sub_rule('Fix userAgent type',
+                 r'userAgent: typeof window !== \'undefined\' \? window\.navigator\.userAgent \|\| \'unknown\' : \'unknown\',',
+                 'userAgent: typeof window !== \'undefined\' ? (window.navigator.userAgent || \'unknown\') : \'unknown\','),
+        sub_rule('Fix Enemy property access #1',
+                 r'target\?\.type',
+                 'target?.type'),
+        sub_rule('Fix Enemy property access #2',
+                 r'target \? target\.health / target\.maxHealth : 0',
+                 'target ? target.health.current / target.health.max : 0'),
+        sub_rule('Fix Enemy property access #3',
+                 r'fromTarget\?\.type',
+                 'fromTarget?.type'),
+        sub_rule('Fix Enemy property access #4',
+                 r'toTarget\?\.type',
+                 'toTarget?.type'),
+    ],
+    "packages/sim/src/combat/targeting-unlock.ts": [
+        sub_rule('Fix nextRequirement type',
+                 r'return \{ unlock, progress, nextRequirement \};',
+                 'return { unlock, progress, nextRequirement: nextRequirement || undefined };'),
+        sub_rule('Fix undefined array access',
+                 r'return scoredUnlocks\[0\]\.unlock;',
+                 'return scoredUnlocks[0]?.unlock;'),
+    ],
+    "packages/sim/src/combat/targeting-persistence.ts": [
+        sub_rule('Remove PlayerTargetingPreferences import',
+                 r'  PlayerTargetingPreferences,\s*',
+                 ''),
+    ],
+    "packages/sim/src/combat/threat-assessment.ts": [
+        sub_rule('Fix undefined array access',
+                 r'return sum \+ value \* weights\[index\];',
+                 'return sum + value * (weights[index] || 0);'),
+    ],
+    "packages/sim/src/index.ts": [
+        sub_rule('Remove duplicate Enemy export',
+                 r'export \* from \'\./combat/types\.js\';\n',
+                 ''),
+    ],
+}
+
+RULE_SET = RuleSet(
+    name="targeting-typescript-errors",
+    order=10,
+    targets=TARGET_FIXES,
+)
+
+
+def fix_typescript_errors(file_path: Path, rel_path: str, batch: WriteBatch) -> Optional[bool]:
+    """Fix TypeScript errors in one targeted file.
+
+    Returns True if the file was changed, False if it was already fixed,
+    and None if the fixes did not settle and the file was left alone.
+    """
+    with phase("read"):
         content = file_path.read_text(encoding='utf-8')
-        
-        # Fix undefined array access
-        content = re.sub(r'return sum \+ value \* weights\[index\];', 
-                        'return sum + value * (weights[index] || 0);', content)
-        
-        file_path.write_text(content, encoding='utf-8')
-        print(f"Fixed {file_path}")
+    with phase("transform"):
+        updated, _, unstable = fix_verified(RULE_SET.rules_for(rel_path), content)
     
-    # Fix index.ts - remove duplicate export
-    file_path = repo_root / "packages/sim/src/index.ts"
-    if file_path.exists():
-        content = file_path.read_text(encoding='utf-8')
-        
-        # Remove duplicate Enemy export
-        content = re.sub(r'export \* from \'\./combat/types\.js\';\n', '', content)
-        
-        file_path.write_text(content, encoding='utf-8')
-        print(f"Fixed {file_path}")
+    if unstable:
+        report_unstable(rel_path, ((RULE_SET.name, rule) for rule in unstable))
+        return None
+    if updated == content:
+        return False
+    batch.stage(file_path, updated)
+    return True
+
 
 def main():
     """Main function to fix TypeScript errors."""
+    parser = argparse.ArgumentParser(description="Fix TypeScript errors in targeting system files")
+    add_target_arguments(parser)
+    add_profiling_arguments(parser)
+    args = parser.parse_args()
+    
+    repo_root = Path(__file__).parent.parent
+    index = open_index(RULE_SET, __file__, enabled=not args.no_cache)
+    
     print("Fixing TypeScript errors in targeting system...")
-    fix_typescript_errors()
-    print("TypeScript error fixes completed!")
+    fixed_count = 0
+    skipped_count = 0
+    processed = []
+    with WriteBatch() as batch:
+        for rel_path in discover_targets([RULE_SET], args.globs):
+            if index and index.is_clean(rel_path):
+                skipped_count += 1
+                continue
+            fixed = fix_typescript_errors(repo_root / rel_path, rel_path, batch)
+            if fixed is None:
+                continue
+            if fixed:
+                print(f"Fixed {rel_path}")
+                fixed_count += 1
+            processed.append(rel_path)
+    
+    if index:
+        for rel_path in processed:
+            index.mark_clean(rel_path)
+        index.save()
+    print(f"TypeScript error fixes completed: {fixed_count} files fixed "
+          f"({skipped_count} unchanged since last run)")
 
 if __name__ == "__main__":
-    main()
+    run_main(main)
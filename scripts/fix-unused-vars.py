@@ -4,112 +4,169 @@ Fix unused variables in test files by prefixing them with underscore.
 This script processes the specific files mentioned in the ESLint errors.
 """
 
+import argparse
 import re
-import sys
 from pathlib import Path
+from typing import Optional
 
-def fix_unused_vars_in_file(file_path: Path) -> bool:
-    """Fix unused variables in a single file."""
+from _codemod import (Rule, RuleSet, add_target_arguments, discover_targets, fix_verified, open_index,
+                      report_unstable)
+from _eslint import fix_from_report
+from _profiling import add_profiling_arguments, phase, run_main
+from _writeback import WriteBatch
+
+# List of variables to fix based on ESLint errors
+FIXES = [
+    # packages/engine/tests/sim.determinism.spec.ts
+    ("FixedClock", "_FixedClock"),
+    ("createSnapshot", "_createSnapshot"), 
+    ("SNAPSHOT_INTERVAL_MS", "_SNAPSHOT_INTERVAL_MS"),
+    
+    # packages/sim/tests/integration/enemy-system.integration.spec.js
+    ("let enemyPool", "let _enemyPool"),
+    ("enemyPool =", "_enemyPool ="),
+    ("const spawnRate", "const _spawnRate"),
+    
+    # packages/sim/tests/integration/enemy-system.integration.spec.ts
+    ("let enemyPool", "let _enemyPool"),
+    ("enemyPool =", "_enemyPool ="),
+    ("const spawnRate", "const _spawnRate"),
+    
+    # packages/sim/tests/integration/spawn-system.integration.spec.js
+    ("const playerPosition", "const _playerPosition"),
+    ("const deltaTime", "const _deltaTime"),
+    
+    # packages/sim/tests/integration/spawn-system.integration.spec.ts
+    ("createSpawnConfig", "_createSpawnConfig"),
+    ("calculateSpawnRate", "_calculateSpawnRate"),
+    ("SpawnStats", "_SpawnStats"),
+    ("PoolStats", "_PoolStats"),
+    ("const playerPosition", "const _playerPosition"),
+    ("const deltaTime", "const _deltaTime"),
+    
+    # packages/sim/tests/unit/enemy-pool.spec.ts
+    ("import.*vi.*from", "import { describe, it, expect, beforeEach } from"),
+    
+    # packages/sim/tests/unit/pool-manager.spec.js
+    ("const enemy2", "const _enemy2"),
+    
+    # packages/sim/tests/unit/pool-manager.spec.ts
+    ("import.*vi.*from", "import { describe, it, expect, beforeEach } from"),
+    ("const enemy2", "const _enemy2"),
+    
+    # packages/sim/tests/unit/spawn-config.spec.ts
+    ("LandId", "_LandId"),
+    
+    # packages/sim/tests/unit/spawn-manager.spec.js
+    ("const poolStats", "const _poolStats"),
+    
+    # packages/sim/tests/unit/spawn-manager.spec.ts
+    ("SimpleRngImpl", "_SimpleRngImpl"),
+    ("const poolStats", "const _poolStats"),
+]
+
+# Files to fix based on ESLint errors, matched wherever they live in a package
+FILES_TO_FIX = [
+    "packages/**/tests/**/sim.determinism.spec.ts",
+    "packages/**/tests/**/enemy-system.integration.spec.[jt]s",
+    "packages/**/tests/**/spawn-system.integration.spec.[jt]s",
+    "packages/**/tests/**/enemy-pool.spec.ts",
+    "packages/**/tests/**/pool-manager.spec.[jt]s",
+    "packages/**/tests/**/spawn-config.spec.ts",
+    "packages/**/tests/**/spawn-manager.spec.[jt]s",
+]
+
+
+def _replace_rule(old: str, new: str) -> Rule:
+    # Anchor identifier edges so an already-prefixed name is not matched again
+    pattern = re.escape(old)
+    if re.match(r'[\w$]', old):
+        pattern = r'(?<![\w$])' + pattern
+    if re.search(r'[\w$]$', old):
+        pattern = pattern + r'(?![\w$])'
+    compiled = re.compile(pattern)
+    return Rule(f"replace {old!r}", lambda content: compiled.sub(lambda _: new, content))
+
+
+RULES = [_replace_rule(old, new) for old, new in FIXES]
+
+RULE_SET = RuleSet(
+    name="unused-vars",
+    order=40,
+    targets={path: RULES for path in FILES_TO_FIX},
+)
+
+
+def fix_unused_vars_in_file(file_path: Path, batch: WriteBatch) -> Optional[bool]:
+    """Fix unused variables in a single file (None if it could not be processed).
+
+    Changed content is staged in ``batch`` and written when the batch commits,
+    unless a second pass of the rules would change it again.
+    """
     try:
-        content = file_path.read_text()
+        with phase("read"):
+            content = file_path.read_text()
         original_content = content
         
-        # List of variables to fix based on ESLint errors
-        fixes = [
-            # packages/engine/tests/sim.determinism.spec.ts
-            ("FixedClock", "_FixedClock"),
-            ("createSnapshot", "_createSnapshot"), 
-            ("SNAPSHOT_INTERVAL_MS", "_SNAPSHOT_INTERVAL_MS"),
-            
-            # packages/sim/tests/integration/enemy-system.integration.spec.js
-            ("let enemyPool", "let _enemyPool"),
-            ("enemyPool =", "_enemyPool ="),
-            ("const spawnRate", "const _spawnRate"),
-            
-            # packages/sim/tests/integration/enemy-system.integration.spec.ts
-            ("let enemyPool", "let _enemyPool"),
-            ("enemyPool =", "_enemyPool ="),
-            ("const spawnRate", "const _spawnRate"),
-            
-            # packages/sim/tests/integration/spawn-system.integration.spec.js
-            ("const playerPosition", "const _playerPosition"),
-            ("const deltaTime", "const _deltaTime"),
-            
-            # packages/sim/tests/integration/spawn-system.integration.spec.ts
-            ("createSpawnConfig", "_createSpawnConfig"),
-            ("calculateSpawnRate", "_calculateSpawnRate"),
-            ("SpawnStats", "_SpawnStats"),
-            ("PoolStats", "_PoolStats"),
-            ("const playerPosition", "const _playerPosition"),
-            ("const deltaTime", "const _deltaTime"),
-            
-            # packages/sim/tests/unit/enemy-pool.spec.ts
-            ("import.*vi.*from", "import { describe, it, expect, beforeEach } from"),
-            
-            # packages/sim/tests/unit/pool-manager.spec.js
-            ("const enemy2", "const _enemy2"),
-            
-            # packages/sim/tests/unit/pool-manager.spec.ts
-            ("import.*vi.*from", "import { describe, it, expect, beforeEach } from"),
-            ("const enemy2", "const _enemy2"),
-            
-            # packages/sim/tests/unit/spawn-config.spec.ts
-            ("LandId", "_LandId"),
-            
-            # packages/sim/tests/unit/spawn-manager.spec.js
-            ("const poolStats", "const _poolStats"),
-            
-            # packages/sim/tests/unit/spawn-manager.spec.ts
-            ("SimpleRngImpl", "_SimpleRngImpl"),
-            ("const poolStats", "const _poolStats"),
-        ]
-        
         # Apply fixes
-        for old, new in fixes:
-            content = content.replace(old, new)
+        with phase("transform"):
+            content, _, unstable = fix_verified(RULES, content)
+        if unstable:
+            report_unstable(str(file_path), ((RULE_SET.name, rule) for rule in unstable))
+            return None
         
-        # Write back if changed
+        # Stage the rewrite if changed
         if content != original_content:
-            file_path.write_text(content)
+            batch.stage(file_path, content)
             return True
         return False
         
     except Exception as e:
         print(f"Error processing {file_path}: {e}")
-        return False
+        return None
 
 def main():
     """Main function to fix unused variables in all test files."""
-    repo_root = Path(__file__).parent.parent
+    parser = argparse.ArgumentParser(description="Prefix unused test variables with an underscore")
+    add_target_arguments(parser)
+    parser.add_argument("--eslint-json", metavar="PATH",
+                        help="Fix only the no-unused-vars problems in an ESLint "
+                             "--format json report (use - for stdin)")
+    add_profiling_arguments(parser)
+    args = parser.parse_args()
+    
+    if args.eslint_json:
+        summary = fix_from_report(args.eslint_json, args.globs)
+        print(f"\nApplied {summary['edits']} edits in {summary['fixed']}/{summary['files']} files "
+              f"({summary['skipped']} problems skipped)")
+        return
     
-    # Files to fix based on ESLint errors
-    files_to_fix = [
-        "packages/engine/tests/sim.determinism.spec.ts",
-        "packages/sim/tests/integration/enemy-system.integration.spec.js",
-        "packages/sim/tests/integration/enemy-system.integration.spec.ts",
-        "packages/sim/tests/integration/spawn-system.integration.spec.js",
-        "packages/sim/tests/integration/spawn-system.integration.spec.ts",
-        "packages/sim/tests/unit/enemy-pool.spec.ts",
-        "packages/sim/tests/unit/pool-manager.spec.js",
-        "packages/sim/tests/unit/pool-manager.spec.ts",
-        "packages/sim/tests/unit/spawn-config.spec.ts",
-        "packages/sim/tests/unit/spawn-manager.spec.js",
-        "packages/sim/tests/unit/spawn-manager.spec.ts",
-    ]
+    repo_root = Path(__file__).parent.parent
+    index = open_index(RULE_SET, __file__, enabled=not args.no_cache)
     
     fixed_count = 0
-    for file_path in files_to_fix:
-        full_path = repo_root / file_path
-        if full_path.exists():
-            if fix_unused_vars_in_file(full_path):
+    skipped_count = 0
+    processed = []
+    with WriteBatch() as batch:
+        for file_path in discover_targets([RULE_SET], args.globs):
+            if index and index.is_clean(file_path):
+                skipped_count += 1
+                continue
+            fixed = fix_unused_vars_in_file(repo_root / file_path, batch)
+            if fixed is None:
+                continue
+            if fixed:
                 print(f"Fixed unused variables in {file_path}")
                 fixed_count += 1
             else:
                 print(f"No changes needed in {file_path}")
-        else:
-            print(f"File not found: {file_path}")
+            processed.append(file_path)
     
-    print(f"\nFixed unused variables in {fixed_count} files")
+    if index:
+        for file_path in processed:
+            index.mark_clean(file_path)
+        index.save()
+    print(f"\nFixed unused variables in {fixed_count} files ({skipped_count} unchanged since last run)")
 
 if __name__ == "__main__":
-    main()
+    run_main(main)
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Markdown Fixer Fuzzer
+
+Purpose: Generate adversarial markdown and check that the fixer is idempotent and scales linearly
+Usage: python scripts/fuzz-markdown-fixer.py [--seed N] [--iterations N] [--json PATH] [--save DIR]
+
+Checks:
+- Idempotency: fix(fix(x)) == fix(x) for every generated document (failures are
+  shrunk line by line to a small reproducer)
+- Per-input runtime: inputs that are far slower per character than the median are flagged
+- Scaling: each growable construct is timed at doubling sizes; a doubling that
+  costs more than --max-ratio times as much is flagged as super-linear
+  (catastrophic regex backtracking)
+
+The run is deterministic for a given --seed. Exits 1 if anything is flagged.
+Reproducers it finds belong in scripts/test_markdown_fixer.py once fixed.
+"""
+
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from markdown_fixer import FixerConfig, fix_text
+
+
+WORDS = ["dragon", "state", "the", "config", "a", "of", "sim", "worker", "and", "test"]
+HOSTS = ["example.com", "github.com/org/repo", "docs.rs/x", "a.b"]
+
+
+def _words(rng: random.Random, n: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(n))
+
+
+def _url(rng: random.Random) -> str:
+    url = f"{rng.choice(['http', 'https'])}://{rng.choice(HOSTS)}"
+    return url + rng.choice(["", "/", "/path_with_under", "/a-b?q=1", "/x.md#frag"])
+
+
+def frag_heading(rng):
+    return "#" * rng.randint(1, 7) + rng.choice([" ", "  ", "", "\t"]) + _words(rng, rng.randint(0, 4))
+
+
+def frag_list(rng):
+    marker = rng.choice(["-", "*", "+", "1.", "2.", "10.", "01."])
+    return " " * rng.randint(0, 5) + marker + rng.choice([" ", "  ", "\t", ""]) + _words(rng, rng.randint(0, 6))
+
+
+def frag_fence(rng):
+    return " " * rng.randint(0, 3) + rng.choice(["```", "```js", "``` ", "~~~", "````"])
+
+
+def frag_url(rng):
+    url = _url(rng)
+    forms = [url, f"{url} and {url}", f"<{url}>", f"[{url}]({url})", f"[text]({url})",
+             f"({url})", f"{url}.", f"see {url}, then <{url}>", f"`{url}`"]
+    return rng.choice(forms)
+
+
+def frag_emphasis(rng):
+    return rng.choice(["_em_", "__strong__", "snake_case_name", "__init__", "`code_with_under`",
+                       "[file](./CODE_GUIDE.md)", "_a_b_", "x_y z_w", "_ spaced _", "**bold**",
+                       "a __b__ c _d_ e", "my_var = other_var", "_"])
+
+
+def frag_long(rng):
+    if rng.random() < 0.5:
+        return _words(rng, rng.randint(10, 40))
+    return ". ".join(_words(rng, rng.randint(3, 12)) for _ in range(rng.randint(2, 8)))
+
+
+def frag_whitespace(rng):
+    return rng.choice(["", "", " ", "  ", "\t", "\xa0", "\r", " text  ", "text\t", "   "])
+
+
+def frag_pathological(rng):
+    n = rng.randint(1, 60)
+    return rng.choice(["_" * n, "a_" * n, "[" * n, "http://" + "a" * n, ". " * n, " " * n,
+                       "# " * n, "- " * n, "*" * n, "`" * n, "](" * n])
+
+
+FRAGMENTS = [frag_heading, frag_list, frag_fence, frag_url, frag_emphasis, frag_long,
+             frag_whitespace, frag_pathological]
+
+
+def generate(rng: random.Random, max_lines: int) -> str:
+    """Generate one adversarial markdown document."""
+    lines = []
+    for _ in range(rng.randint(0, max_lines)):
+        line = rng.choice(FRAGMENTS)(rng)
+        if rng.random() < 0.2:
+            line += " " + rng.choice(FRAGMENTS)(rng)
+        lines.append(line)
+    return "\n".join(lines) + rng.choice(["", "\n", "\n\n", " "])
+
+
+# Growable constructs for the scaling check: size -> document
+SCALABLE: Dict[str, Callable[[int], str]] = {
+    "long-line": lambda n: " ".join(WORDS[i % len(WORDS)] for i in range(n)) + "\n",
+    "sentences": lambda n: ". ".join("word word" for _ in range(n)) + "\n",
+    "underscores": lambda n: "a_" * n + "\n",
+    "bare-underscores": lambda n: "_" * n + "\n",
+    "urls-one-line": lambda n: " ".join(f"http://example.com/{i % 3}" for i in range(n)) + "\n",
+    "long-url": lambda n: "http://" + "a" * n + ")\n",
+    "brackets": lambda n: "[" * n + "\n",
+    "list-items": lambda n: "\n".join(f"{i}. item" for i in range(n)) + "\n",
+    "duplicate-headings": lambda n: "\n\n".join("## Same" for _ in range(n)) + "\n",
+    "blank-runs": lambda n: "a" + " \n" * n + "b\n",
+}
+
+
+def fix(text: str, config: FixerConfig) -> str:
+    return fix_text(text, config)[0]
+
+
+def is_unstable(text: str, config: FixerConfig) -> bool:
+    once = fix(text, config)
+    return fix(once, config) != once
+
+
+def shrink(text: str, config: FixerConfig) -> str:
+    """Drop lines (then trailing characters) while the document stays unstable."""
+    lines = text.split("\n")
+    progress = True
+    while progress:
+        progress = False
+        for i in range(len(lines)):
+            candidate = lines[:i] + lines[i + 1:]
+            if candidate and is_unstable("\n".join(candidate), config):
+                lines = candidate
+                progress = True
+                break
+    return "\n".join(lines)
+
+
+def timed_fix(text: str, config: FixerConfig) -> Tuple[str, float]:
+    start = time.perf_counter()
+    fixed = fix(text, config)
+    return fixed, time.perf_counter() - start
+
+
+def check_idempotency(seed: int, iterations: int, max_lines: int) -> Tuple[List[dict], List[dict]]:
+    """Fuzz for non-idempotent inputs; also return per-input timings."""
+    rng = random.Random(seed)
+    failures, timings = [], []
+    for i in range(iterations):
+        config = FixerConfig(max_line_length=rng.choice([40, 80, 100]))
+        text = generate(rng, max_lines)
+        try:
+            once, elapsed = timed_fix(text, config)
+            twice = fix(once, config)
+        except Exception as e:
+            failures.append({"iteration": i, "input": text, "error": repr(e),
+                             "max_line_length": config.max_line_length})
+            continue
+        timings.append({"iteration": i, "chars": len(text), "seconds": elapsed, "input": text})
+        if twice != once:
+            failures.append({"iteration": i, "input": shrink(text, config),
+                             "first": once, "second": twice,
+                             "max_line_length": config.max_line_length})
+    return failures, timings
+
+
+def slow_inputs(timings: List[dict], factor: float, floor: float) -> List[dict]:
+    """Inputs that took ``factor`` times the median time per character (and > floor)."""
+    rates = [t["seconds"] / max(t["chars"], 1) for t in timings]
+    if not rates:
+        return []
+    median = statistics.median(rates)
+    return [t for t, rate in zip(timings, rates)
+            if t["seconds"] > floor and rate > factor * median]
+
+
+def check_scaling(base: int, steps: int, max_ratio: float, floor: float,
+                  only: Optional[List[str]] = None) -> List[dict]:
+    """Time each growable construct at doubling sizes and report the cost ratios."""
+    config = FixerConfig()
+    results = []
+    for name, make in SCALABLE.items():
+        if only and name not in only:
+            continue
+        sizes, times = [], []
+        for step in range(steps):
+            size = base * 2 ** step
+            text = make(size)
+            runs = [timed_fix(text, config)[1] for _ in range(3)]
+            sizes.append(size)
+            times.append(min(runs))
+        ratios = [b / a if a > 0 else 0.0 for a, b in zip(times, times[1:])]
+        # Judge the largest doubling, where constant overheads matter least
+        flagged = bool(ratios) and times[-1] > floor and ratios[-1] > max_ratio
+        results.append({"construct": name, "sizes": sizes, "seconds": times,
+                        "ratios": ratios, "super_linear": flagged})
+    return results
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Fuzz the markdown fixer for idempotency and scaling")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed (default: 0)")
+    parser.add_argument("--iterations", type=int, default=2000, help="Documents to generate (default: 2000)")
+    parser.add_argument("--max-lines", type=int, default=12, help="Lines per document (default: 12)")
+    parser.add_argument("--scale-base", type=int, default=250, help="Smallest scaling size (default: 250)")
+    parser.add_argument("--scale-steps", type=int, default=5, help="Doublings per construct (default: 5)")
+    parser.add_argument("--max-ratio", type=float, default=3.0,
+                        help="Flag a doubling that costs more than this factor (default: 3.0)")
+    parser.add_argument("--construct", action="append", help="Only scale-test these constructs")
+    parser.add_argument("--no-scaling", action="store_true", help="Skip the scaling check")
+    parser.add_argument("--json", metavar="PATH", help="Write the full results as JSON")
+    parser.add_argument("--save", metavar="DIR", help="Write each failing input to DIR")
+    args = parser.parse_args()
+
+    print("🎲 Markdown Fixer Fuzzer")
+    print("=" * 60)
+    print(f"Seed: {args.seed}  Iterations: {args.iterations}  Max lines: {args.max_lines}")
+    print("=" * 60)
+
+    start = time.perf_counter()
+    failures, timings = check_idempotency(args.seed, args.iterations, args.max_lines)
+    slow = slow_inputs(timings, factor=50.0, floor=0.01)
+    print(f"Idempotency: {len(failures)} failing of {args.iterations} "
+          f"({time.perf_counter() - start:.1f}s)")
+    for failure in failures[:10]:
+        print(f"  ❌ iteration {failure['iteration']} (max length {failure['max_line_length']}): "
+              f"{failure['input']!r}")
+        if "error" in failure:
+            print(f"     raised {failure['error']}")
+    if timings:
+        total = sum(t["seconds"] for t in timings)
+        slowest = max(timings, key=lambda t: t["seconds"])
+        print(f"Runtime: {total * 1000:.0f}ms total, slowest {slowest['seconds'] * 1000:.1f}ms "
+              f"({slowest['chars']} chars), {len(slow)} outliers")
+    for outlier in slow[:5]:
+        print(f"  🐢 iteration {outlier['iteration']}: {outlier['seconds'] * 1000:.1f}ms "
+              f"for {outlier['chars']} chars")
+
+    scaling = []
+    if not args.no_scaling:
+        scaling = check_scaling(args.scale_base, args.scale_steps, args.max_ratio, 0.005,
+                                args.construct)
+        print("Scaling (time ratio per doubling):")
+        for result in scaling:
+            marker = "❌" if result["super_linear"] else "✅"
+            ratios = " ".join(f"{r:.1f}" for r in result["ratios"])
+            print(f"  {marker} {result['construct']:<20} {ratios}   "
+                  f"({result['seconds'][-1] * 1000:.1f}ms at {result['sizes'][-1]})")
+
+    if args.save and failures:
+        out = Path(args.save)
+        out.mkdir(parents=True, exist_ok=True)
+        for failure in failures:
+            (out / f"seed{args.seed}-{failure['iteration']}.md").write_text(failure["input"], encoding="utf-8")
+        print(f"\n💾 Failing inputs written to {out}")
+
+    if args.json:
+        payload = {"seed": args.seed, "iterations": args.iterations, "failures": failures,
+                   "slow_inputs": [{k: v for k, v in t.items()} for t in slow],
+                   "timings": [{"iteration": t["iteration"], "chars": t["chars"],
+                                "seconds": t["seconds"]} for t in timings],
+                   "scaling": scaling}
+        Path(args.json).write_text(json.dumps(payload, indent=2), encoding="utf-8")
+        print(f"\n📄 Results written to {args.json}")
+
+    flagged = bool(failures or slow or any(r["super_linear"] for r in scaling))
+    if flagged:
+        print("\n❌ Fuzzer found problems")
+        sys.exit(1)
+    print("\n🎉 Idempotent and linear on every input")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,1026 @@
+#!/usr/bin/env python3
+"""
+Universal Markdown Fixer library
+
+The rule pipeline behind scripts/fix-markdown-universal.py, importable without
+any CLI side effects (scripts/ must be on sys.path)::
+
+    from markdown_fixer import FixerConfig, fix_text
+
+    fixed, report = fix_text(text, FixerConfig(max_line_length=120))
+    print(report.rules_fired)
+
+``fix_text`` is pure: it does no file I/O and prints nothing.
+
+With ``FixerConfig(lint=True)`` each rule also records what it fixes as a
+``Violation`` (markdownlint rule names, 1-based line and column in the
+original text) in the same pass, so one run can both report and fix.
+
+Rules are scheduled, not run in one fixed sweep: each rule declares which
+constructs it touches and which it watches, and after a rule changes the
+content only the rules watching what it touched are queued again, until
+nothing is pending. A single invocation therefore converges.
+
+Before any rule runs, one combined regex (``PRESCAN_PATTERNS``) looks for
+anything an enabled rule could change; clean documents return untouched.
+
+The line-local rules (MD013, MD034, MD049, MD007, MD029) compute each line
+with a pure function, and results are kept in ``LINE_MEMO``, a bounded LRU
+shared by every fixer in the process: boilerplate lines repeated across a
+doc tree are worked out once. ``LineMemo.save`` persists it between runs.
+"""
+
+import marshal
+import re
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from difflib import SequenceMatcher
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Dict, FrozenSet, Iterable, List, Optional, Set, TextIO, Tuple
+
+from _discovery import fingerprint
+from _profiling import phase
+from _writeback import WriteBatch, write_text_atomic
+
+
+@dataclass(frozen=True)
+class RuleSpec:
+    """A fixer rule and the constructs it reads and writes.
+
+    Constructs: ``text`` (line contents), ``blank`` (blank-line layout),
+    ``structure`` (new lines that may start headings, lists or fences),
+    ``headings``, ``lists``, ``fences`` and ``eof``.
+    """
+
+    id: str
+    alias: str
+    method: str
+    watches: FrozenSet[str]
+    touches: FrozenSet[str]
+    description: str = ""
+
+
+def _spec(rule_id: str, alias: str, method: str, watches: str, touches: str,
+          description: str) -> RuleSpec:
+    return RuleSpec(rule_id, alias, method, frozenset(watches.split()), frozenset(touches.split()),
+                    description)
+
+
+# Canonical order: when several rules are pending, the earliest runs first
+RULE_SPECS: List[RuleSpec] = [
+    _spec("MD009", "no-trailing-spaces", "_fix_trailing_spaces", "text", "blank",
+          "Trailing spaces"),
+    _spec("MD012", "no-multiple-blanks", "_fix_multiple_blank_lines", "blank", "blank",
+          "Multiple consecutive blank lines"),
+    _spec("MD013", "line-length", "_fix_line_length", "text", "text structure",
+          "Line length"),
+    _spec("MD022", "blanks-around-headings", "_fix_blank_lines_around_headings",
+          "headings structure", "blank", "Headings should be surrounded by blank lines"),
+    _spec("MD032", "blanks-around-lists", "_fix_blank_lines_around_lists",
+          "lists structure", "blank", "Lists should be surrounded by blank lines"),
+    _spec("MD031", "blanks-around-fences", "_fix_blank_lines_around_fences",
+          "fences structure", "blank", "Fenced code blocks should be surrounded by blank lines"),
+    _spec("MD040", "fenced-code-language", "_fix_fenced_code_language",
+          "fences structure", "fences", "Fenced code blocks should have a language specified"),
+    _spec("MD024", "no-duplicate-heading", "_fix_duplicate_headings",
+          "headings structure", "headings", "Multiple headings with the same content"),
+    _spec("MD007", "ul-indent", "_fix_list_indentation", "lists structure", "lists text",
+          "Unordered list indentation"),
+    _spec("MD029", "ol-prefix", "_fix_ordered_list_prefixes", "lists structure", "lists text",
+          "Ordered list item prefix"),
+    _spec("MD034", "no-bare-urls", "_fix_bare_urls", "text", "text", "Bare URL used"),
+    _spec("MD049", "emphasis-style", "_fix_emphasis_style", "text", "text", "Emphasis style"),
+    _spec("MD047", "single-trailing-newline", "_fix_file_ending", "text blank structure", "eof",
+          "Files should end with a single newline character"),
+]
+
+# Requeueing stops after this many runs per rule, should rules ever fight
+MAX_RULE_RUNS = 8
+
+# Detectors for the pre-scan, mirroring the rule implementations below. They
+# must stay conservative: if none matches, no rule fires. Line patterns are
+# tried at the start of every line; anywhere patterns must begin with a literal
+# character so the combined regex can skip straight to candidate positions.
+# MD024 and MD047 are checked in Python (see ``needs_fixing``).
+_WS = r"[^\S\n]"  # whitespace within a line
+# Every character str.isspace() accepts besides "\n" (what rstrip() strips)
+_WS_CHARS = "\t\x0b\x0c\r\x1c\x1d\x1e\x1f \x85\xa0\u1680" + \
+    "".join(map(chr, range(0x2000, 0x200b))) + "\u2028\u2029\u202f\u205f\u3000"
+_LIST_ITEM = rf"{_WS}*(?:[-*+]|\d+\.){_WS}"
+_HEADING = rf"#{{1,6}}{_WS}"
+_FENCE = rf"{_WS}*```"
+_AFTER_NONBLANK = r"(?<=[^\n]\n)"
+PRESCAN_LINE_PATTERNS: Dict[str, str] = {
+    "MD022": rf"{_AFTER_NONBLANK}{_HEADING}|{_HEADING}[^\n]*\n{_WS}*\S",
+    "MD032": rf"{_AFTER_NONBLANK}{_LIST_ITEM}|{_LIST_ITEM}[^\n]*\n(?!{_LIST_ITEM}){_WS}*\S",
+    "MD031": rf"{_AFTER_NONBLANK}{_FENCE}|{_FENCE}[^\n]*\n{_WS}*\S",
+    "MD040": rf"{_FENCE}{_WS}*$",
+    "MD007": rf"(?:{_WS}{{2}})*{_WS}(?:[-*+]|\d+\.){_WS}",
+    "MD029": rf"{_WS}*(?!1\. (?!{_WS}))\d+\.{_WS}",
+}
+PRESCAN_PATTERNS: Dict[str, str] = {
+    "MD009": "|".join(re.escape(c) + "$" for c in _WS_CHARS),
+    "MD012": r"\n\s*\n\s*\n",
+    "MD034": r"h(?<!\]\(h)(?<!<h)ttps?://",
+    "MD049": r"_[^_\n]+_",
+}
+_HEADING_TEXT = re.compile(r"^#{1,6}[^\S\n]+([^\n]+)$", re.MULTILINE)
+_MULTIPLE_BLANKS = re.compile(r'\n\s*\n\s*\n+')
+
+
+# A bare URL, matched atomically (lookahead + backreference) so it cannot
+# backtrack to a shorter prefix; trailing sentence punctuation is left outside.
+_BARE_URL = re.compile(
+    r"(?<!\]\()(?<![<\w])(?=(https?://[^\s<>\[\]()]*[^\s<>\[\]().,;:!?'\"]))\1(?![>\]])")
+_CODE_SPAN = re.compile(r"(`+).*?(?<!`)\1(?!`)")
+_CODE_SPAN_OR_URL = re.compile(r"(`+).*?(?<!`)\1(?!`)|<[^<>\s]+>|\]\([^)]*\)|https?://\S+")
+# Underscores only delimit emphasis when not inside a word (CommonMark flanking)
+_UNDERSCORE_STRONG = re.compile(r"(?<![\w_])__(?=[^\s_])([^_]+?)(?<=[^\s_])__(?![\w_])")
+_UNDERSCORE_EM = re.compile(r"(?<![\w_])_(?=[^\s_])([^_]+?)(?<=[^\s_])_(?![\w_])")
+
+
+def _outside_code_spans(line: str, transform: Callable[[str], str], protect_urls: bool = False) -> str:
+    """Apply ``transform`` to the parts of a line outside code spans (and URLs)."""
+    protected = _CODE_SPAN_OR_URL if protect_urls else _CODE_SPAN
+    if '`' not in line and not (protect_urls and ('://' in line or '](' in line or '<' in line)):
+        return transform(line)
+    parts = []
+    position = 0
+    for match in protected.finditer(line):
+        parts.append(transform(line[position:match.start()]))
+        parts.append(match.group(0))
+        position = match.end()
+    parts.append(transform(line[position:]))
+    return ''.join(parts)
+
+
+def _convert_underscore_emphasis(text: str) -> str:
+    text = _UNDERSCORE_STRONG.sub(r'**\1**', text)
+    return _UNDERSCORE_EM.sub(r'*\1*', text)
+
+
+# What a line-local rule makes of one line: (fixed line, or the lines it became;
+# fixes applied; lint flags as (column, detail) pairs)
+LineFix = Tuple[object, int, Tuple[Tuple[Optional[int], Optional[str]], ...]]
+
+
+def _wrap_line(line: str, limit: int) -> List[str]:
+    """Break an over-long line at sentence boundaries, then at word boundaries.
+    
+    Every resulting line fits unless it is a single word, so wrapping the
+    output again changes nothing.
+    """
+    pieces = [line]
+    if '. ' in line:
+        sentences = line.split('. ')
+        sentences = [sentence + '.' for sentence in sentences[:-1]] + [sentences[-1]]
+        pieces = [sentences[0]]
+        for sentence in sentences[1:]:
+            if len(pieces[-1]) + 1 + len(sentence) <= limit:
+                pieces[-1] += ' ' + sentence
+            else:
+                pieces.append(sentence)
+    
+    wrapped = []
+    for piece in pieces:
+        if len(piece) <= limit:
+            wrapped.append(piece)
+            continue
+        words = piece.split()
+        current = words[0] if words else ''
+        for word in words[1:]:
+            if len(current) + 1 + len(word) <= limit:
+                current += ' ' + word
+            else:
+                wrapped.append(current)
+                current = word
+        wrapped.append(current)
+    return wrapped
+
+
+def _line_length_line(line: str, limit: int) -> LineFix:
+    """MD013 for one line longer than ``limit``."""
+    # Don't break URLs, code blocks, or special lines
+    stripped = line.strip()
+    if (line.startswith('http') or
+        line.startswith('```') or
+        line.startswith('#') or
+        stripped.startswith('-') or
+        stripped.startswith('*') or
+        stripped.startswith(('1.', '2.', '3.', '4.', '5.', '6.', '7.', '8.', '9.'))):
+        return (line,), 0, ()
+    return tuple(_wrap_line(line, limit)), 1, ((limit + 1, f"Expected: {limit}; Actual: {len(line)}"),)
+
+
+def _bare_urls_line(line: str) -> LineFix:
+    """MD034 for one line containing ``://``."""
+    flags = []
+    
+    def wrap(match: "re.Match") -> str:
+        flags.append((line.find(match.group(1)) + 1, None))
+        return f'<{match.group(1)}>'
+    
+    # Each bare URL is wrapped where it was found, never by text replacement
+    fixed = _outside_code_spans(line, lambda text: _BARE_URL.sub(wrap, text))
+    return fixed, len(flags), tuple(flags)
+
+
+def _emphasis_line(line: str) -> LineFix:
+    """MD049 for one line outside fences containing ``_``."""
+    # Strong emphasis: __text__ -> **text**, emphasis: _text_ -> *text*.
+    # Intraword underscores (snake_case), code spans and URLs are left alone.
+    fixed = _outside_code_spans(line, _convert_underscore_emphasis, protect_urls=True)
+    if fixed == line:
+        return line, 0, ()
+    column = next(c for c, (a, b) in enumerate(zip(line, fixed)) if a != b) + 1
+    return fixed, 0, ((column, "Expected: asterisk; Actual: underscore"),)
+
+
+def _list_indent_line(line: str) -> LineFix:
+    """MD007/MD005 for one line that may be a list item."""
+    # Unordered items first, then ordered ones; either gets 2-space indentation
+    for item in (r'[-*+]\s+', r'\d+\.\s+'):
+        indent_match = re.match(rf'^(\s*){item}', line)
+        if indent_match:
+            indent = indent_match.group(1)
+            if len(indent) % 2 == 0:
+                break
+            # Fix odd indentation
+            new_indent = ' ' * (len(indent) + 1)
+            line = re.sub(rf'^(\s*)({item})', f'{new_indent}\\g<2>', line)
+            return line, 1, ((1, f"Expected: {len(new_indent)}; Actual: {len(indent)}"),)
+    return line, 0, ()
+
+
+def _ordered_prefix_line(line: str) -> LineFix:
+    """MD029 for one line that may be an ordered list item."""
+    # Fix ordered list prefixes to use 1. style
+    if not re.match(r'^\s*\d+\.\s+', line):
+        return line, 0, ()
+    fixed = re.sub(r'^(\s*)\d+\.\s+', r'\g<1>1. ', line)
+    if fixed == line:
+        return line, 0, ()
+    return fixed, 1, ((len(line) - len(line.lstrip()) + 1,
+                       f"Expected: 1; Actual: {line.split('.', 1)[0].strip()}"),)
+
+
+def _may_be_list_item(line: str) -> bool:
+    """Cheap filter before the list rules: the first non-blank character is a marker or digit."""
+    first = line.lstrip()[:1]
+    return first in ('-', '*', '+') or first.isdigit()
+
+
+class LineMemo:
+    """Bounded LRU of ``LineFix`` results keyed by (rule ID, line, rule parameters).
+
+    A hit replays the fix count and lint flags along with the text, so a
+    memoized line is indistinguishable from a computed one. Safe to share
+    between threads: a lookup that races an eviction is only a miss.
+    """
+
+    def __init__(self, maxsize: int = 65536):
+        self.maxsize = maxsize
+        self.entries: "OrderedDict[tuple, LineFix]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: tuple) -> Optional[LineFix]:
+        result = self.entries.get(key)
+        if result is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        try:
+            self.entries.move_to_end(key)
+        except KeyError:
+            pass  # Evicted by another thread in between; the result still stands
+        return result
+
+    def put(self, key: tuple, result: LineFix) -> None:
+        self.entries[key] = result
+        while len(self.entries) > self.maxsize:
+            try:
+                self.entries.popitem(last=False)
+            except KeyError:
+                break
+            self.evictions += 1
+
+    def resize(self, maxsize: int) -> None:
+        """Change the bound, dropping the least recently used entries beyond it."""
+        self.maxsize = maxsize
+        while len(self.entries) > max(maxsize, 0):
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                "entries": len(self.entries), "hit_rate": self.hits / lookups if lookups else 0.0}
+
+    def load(self, path: Path) -> None:
+        """Add the entries saved at ``path``, unless the rules changed since."""
+        try:
+            rules, items = marshal.loads(path.read_bytes())
+        except (OSError, EOFError, ValueError, TypeError):
+            return
+        if rules != _rules_fingerprint():
+            return
+        for key, result in items[-self.maxsize:] if self.maxsize > 0 else ():
+            self.entries.setdefault(key, result)
+
+    def save(self, path: Path) -> None:
+        """Persist the entries, least recently used first."""
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with WriteBatch(durable=False) as batch:
+                batch.stage(path, marshal.dumps((_rules_fingerprint(), list(self.entries.items()))))
+        except OSError:
+            pass  # A memo that cannot be saved only costs the next run its warm start
+
+
+@lru_cache(maxsize=None)
+def _rules_fingerprint() -> str:
+    # Saved results are only valid for the rule code that produced them
+    return fingerprint([Path(__file__)])
+
+
+# Shared by every fixer in the process unless one is given its own
+LINE_MEMO = LineMemo()
+
+
+@lru_cache(maxsize=None)
+def _compile_prescan(max_line_length: int, enabled: FrozenSet[str]) -> Tuple[Optional["re.Pattern"], Optional["re.Pattern"]]:
+    """Combine the enabled detectors into (search regex, first-line regex)."""
+    line = [PRESCAN_LINE_PATTERNS[rule_id] for rule_id in sorted(enabled) if rule_id in PRESCAN_LINE_PATTERNS]
+    if "MD013" in enabled:
+        # Same exemptions as _fix_line_length: URLs, fences, headings, list items
+        line.append(rf"(?!http|```|#|{_WS}*(?:[-*]|[1-9]\.))[^\n]{{{max_line_length + 1}}}")
+    anywhere = [PRESCAN_PATTERNS[rule_id] for rule_id in sorted(enabled) if rule_id in PRESCAN_PATTERNS]
+    line_source = "|".join(line)
+    branches = ([rf"\n(?:{line_source})"] if line else []) + anywhere
+    if not branches:
+        return None, None
+    # A flat alternation of literal-led branches gets a first-character prefilter
+    search = re.compile("|".join(branches), re.MULTILINE)
+    first_line = re.compile(line_source, re.MULTILINE) if line else None
+    return search, first_line
+
+
+def _rule_lookup() -> Dict[str, str]:
+    lookup = {}
+    for spec in RULE_SPECS:
+        lookup[spec.id.lower()] = spec.id
+        lookup[spec.alias] = spec.id
+    return lookup
+
+
+def resolve_rules(names: Iterable[str]) -> Set[str]:
+    """Map rule IDs or aliases (case-insensitive) to rule IDs."""
+    lookup = _rule_lookup()
+    resolved = set()
+    for name in names:
+        key = name.strip().lower()
+        if key not in lookup:
+            known = ", ".join(f"{s.id}/{s.alias}" for s in RULE_SPECS)
+            raise ValueError(f"unknown rule {name!r} (known: {known})")
+        resolved.add(lookup[key])
+    return resolved
+
+
+@dataclass(frozen=True)
+class FixerConfig:
+    """Settings that change what the fixer produces."""
+
+    max_line_length: int = 100
+    # MD013 limit inside fenced code blocks: None uses max_line_length, 0 leaves them alone
+    code_block_line_length: Optional[int] = None
+    # MD013 on table rows (markdownlint's ``tables``)
+    wrap_tables: bool = True
+    disabled: FrozenSet[str] = frozenset()
+    # Record a Violation for everything a rule fixes (see FixReport.violations)
+    lint: bool = False
+
+
+# Rule options under which a fixer rule would undo what markdownlint wants
+_CONFLICTING_STYLES = {"MD029": {"ordered", "zero"}, "MD049": {"underscore"}}
+
+
+def config_from_markdownlint(options: Dict[str, object]) -> FixerConfig:
+    """Translate a parsed .markdownlint.json into the fixer's settings.
+
+    Rules switched off there (or left off by ``"default": false``) are
+    disabled. MD013's ``line_length`` sets the wrap width, ``tables: false``
+    leaves table rows alone, and ``code_blocks: false`` or a
+    ``code_block_line_length`` of 0 leaves fenced code alone. MD029 and MD049
+    only ever rewrite to ``1.`` prefixes and asterisks, so they are disabled
+    when the config asks for another style. Keys naming rules the fixer does
+    not implement, and tags, are ignored.
+    """
+    lookup = _rule_lookup()
+    settings = {}
+    for key, value in options.items():
+        rule_id = lookup.get(key.lower())
+        if rule_id is not None:
+            settings[rule_id] = value
+    default = options.get("default", True) is not False
+    disabled = set()
+    for spec in RULE_SPECS:
+        value = settings.get(spec.id, default)
+        if value is False:
+            disabled.add(spec.id)
+        elif isinstance(value, dict) and value.get("style") in _CONFLICTING_STYLES.get(spec.id, ()):
+            disabled.add(spec.id)
+    line_length = settings.get("MD013")
+    options = {}
+    if isinstance(line_length, dict):
+        if isinstance(line_length.get("line_length"), int):
+            options["max_line_length"] = line_length["line_length"]
+        if line_length.get("code_blocks") is False:
+            options["code_block_line_length"] = 0
+        elif isinstance(line_length.get("code_block_line_length"), int):
+            options["code_block_line_length"] = line_length["code_block_line_length"]
+        if line_length.get("tables") is False:
+            options["wrap_tables"] = False
+    return FixerConfig(disabled=frozenset(disabled), **options)
+
+
+@dataclass(frozen=True)
+class Violation:
+    """One rule violation, located in the text as it was before fixing.
+
+    ``line`` and ``column`` are 1-based; ``column`` is None when the whole
+    line is at fault. ``detail`` follows markdownlint (``Expected: 100;
+    Actual: 120``).
+    """
+
+    rule: str
+    alias: str
+    description: str
+    line: int
+    column: Optional[int] = None
+    detail: Optional[str] = None
+
+
+@dataclass
+class FixReport:
+    """What a single ``fix_text`` call changed."""
+
+    changed: bool = False
+    rules_fired: List[str] = field(default_factory=list)
+    fixes_applied: int = 0
+    rule_runs: int = 0
+    # Only collected when the config asks for lint output
+    violations: Optional[List[Violation]] = None
+
+    def to_dict(self) -> Dict[str, object]:
+        result = {"changed": self.changed, "rules_fired": list(self.rules_fired),
+                  "fixes_applied": self.fixes_applied, "rule_runs": self.rule_runs}
+        if self.violations is not None:
+            result["violations"] = [asdict(violation) for violation in self.violations]
+        return result
+
+
+class UniversalMarkdownFixer:
+    """Universal markdown linter and fixer with comprehensive rule support."""
+    
+    def __init__(self, max_line_length: int = 100, batch: Optional[WriteBatch] = None,
+                 disabled: Iterable[str] = (), lint: bool = False,
+                 line_memo: Optional[LineMemo] = LINE_MEMO,
+                 code_block_line_length: Optional[int] = None, wrap_tables: bool = True):
+        self.max_line_length = max_line_length
+        self.code_block_line_length = code_block_line_length
+        self.wrap_tables = wrap_tables
+        self.batch = batch
+        # None (or a zero-sized memo) computes every line afresh
+        self.line_memo = line_memo if line_memo is not None and line_memo.maxsize > 0 else None
+        # Called as on_fixed(path, original, fixed) for every file fix_file reads
+        self.on_fixed: Optional[Callable[[Path, str, str], None]] = None
+        # With lint, called as on_violations(path, violations) for every file fix_file fixes
+        self.on_violations: Optional[Callable[[Path, List[Violation]], None]] = None
+        # Where per-file progress lines are printed (None: sys.stdout)
+        self.progress: Optional[TextIO] = None
+        self.lint = lint
+        # Violations found by the last fix, and the lint state of the fix in progress
+        self.last_violations: List[Violation] = []
+        self._rule: Optional[RuleSpec] = None
+        self._origin: List[int] = []
+        self._found: List[Violation] = []
+        self.disabled = frozenset(disabled)
+        self.fixes_applied = 0
+        self.files_processed = 0
+        self.rule_runs = 0
+        self.rules = [spec for spec in RULE_SPECS if spec.id not in self.disabled]
+        enabled = frozenset(spec.id for spec in self.rules)
+        self._prescan_regex, self._prescan_first_line = _compile_prescan(max_line_length, enabled)
+        self._check_duplicates = "MD024" in enabled
+        self._check_ending = "MD047" in enabled
+        self.prescan_skipped = 0
+        # For each rule, the rules to queue again when it changes the content
+        self._dependents = [
+            [j for j, other in enumerate(self.rules) if j != i and other.watches & spec.touches]
+            for i, spec in enumerate(self.rules)
+        ]
+    
+    @classmethod
+    def from_config(cls, config: FixerConfig, batch: Optional[WriteBatch] = None) -> "UniversalMarkdownFixer":
+        """Create a fixer from a ``FixerConfig``."""
+        return cls(max_line_length=config.max_line_length, batch=batch, disabled=config.disabled,
+                   lint=config.lint, code_block_line_length=config.code_block_line_length,
+                   wrap_tables=config.wrap_tables)
+    
+    @property
+    def config(self) -> FixerConfig:
+        return FixerConfig(max_line_length=self.max_line_length,
+                           code_block_line_length=self.code_block_line_length,
+                           wrap_tables=self.wrap_tables, disabled=self.disabled, lint=self.lint)
+        
+    def fix_file(self, file_path: Path) -> bool:
+        """Fix all markdownlint violations in a file."""
+        try:
+            with phase("read"), open(file_path, 'r', encoding='utf-8') as f:
+                content = f.read()
+            
+            original_content = content
+            content = self.fix_content(content)
+            if self.on_fixed is not None:
+                self.on_fixed(file_path, original_content, content)
+            if self.lint and self.on_violations is not None:
+                self.on_violations(file_path, self.last_violations)
+            
+            if content != original_content:
+                # Batched writes land together when the caller commits the batch
+                if self.batch is not None:
+                    self.batch.stage(file_path, content)
+                else:
+                    write_text_atomic(file_path, content)
+                return True
+            return False
+            
+        except Exception as e:
+            print(f"❌ Error processing {file_path}: {e}", file=self.progress)
+            return False
+    
+    def fix_content(self, content: str) -> str:
+        """Return markdown content with all violations fixed (no file I/O)."""
+        with phase("transform"):
+            return self._fix_all_violations(content)
+    
+    def fix_with_report(self, content: str) -> Tuple[str, FixReport]:
+        """Fix content in memory and report which rules changed it."""
+        report = FixReport()
+        fixes_before = self.fixes_applied
+        runs_before = self.rule_runs
+        with phase("transform"):
+            fixed = self._fix_all_violations(content, report.rules_fired)
+        report.changed = fixed != content
+        report.fixes_applied = self.fixes_applied - fixes_before
+        report.rule_runs = self.rule_runs - runs_before
+        if self.lint:
+            report.violations = list(self.last_violations)
+        return fixed, report
+    
+    def needs_fixing(self, content: str) -> bool:
+        """Cheap detection-only pass: could any enabled rule change ``content``?"""
+        if self._check_ending and (not content.endswith('\n') or
+                                   (len(content) > 1 and content[-2].isspace())):
+            return True
+        if self._prescan_first_line is not None and self._prescan_first_line.match(content):
+            return True
+        if self._prescan_regex is not None and self._prescan_regex.search(content):
+            return True
+        if self._check_duplicates:
+            headings = [text.strip() for text in _HEADING_TEXT.findall(content)]
+            if len(headings) != len(set(headings)):
+                return True
+        return False
+    
+    def _fix_all_violations(self, content: str, fired: Optional[List[str]] = None) -> str:
+        """Run the enabled rules to a fixpoint, recording the rules that fired.
+
+        Clean content (see ``needs_fixing``) is returned before any rule runs.
+        Otherwise every rule runs once in canonical order. A rule that changes
+        the content queues again only the rules watching what it touched, and
+        the earliest pending rule always runs next.
+
+        With ``lint`` on, rules report what they fix through ``_flag`` and
+        ``last_violations`` holds the result, sorted by line.
+        """
+        self.last_violations = []
+        if not self.needs_fixing(content):
+            self.prescan_skipped += 1
+            return content
+        found: List[Violation] = []
+        if self.lint:
+            self._origin = list(range(1, content.count('\n') + 2))
+            self._found = found
+        pending = [True] * len(self.rules)
+        runs = [0] * len(self.rules)
+        index = 0
+        while index < len(self.rules):
+            if not pending[index]:
+                index += 1
+                continue
+            pending[index] = False
+            runs[index] += 1
+            self.rule_runs += 1
+            spec = self.rules[index]
+            self._rule = spec
+            updated = getattr(self, spec.method)(content)
+            if updated == content:
+                index += 1
+                continue
+            if self.lint:
+                self._remap(content, updated)
+            content = updated
+            if fired is not None:
+                fired.append(spec.id)
+            next_index = index + 1
+            for dependent in self._dependents[index]:
+                if runs[dependent] < MAX_RULE_RUNS:
+                    pending[dependent] = True
+                    next_index = min(next_index, dependent)
+            index = next_index
+        
+        if self.lint:
+            # A rule queued again can report a line it already reported
+            self.last_violations = sorted(dict.fromkeys(found),
+                                          key=lambda v: (v.line, v.column or 0, v.rule))
+            self._rule = None
+            self._origin = []
+        return content
+    
+    def _flag(self, index: int, column: Optional[int] = None, detail: Optional[str] = None) -> None:
+        """Record a violation of the running rule at 0-based line ``index`` of its input."""
+        if not self.lint or self._rule is None:
+            return
+        spec = self._rule
+        line = self._origin[min(index, len(self._origin) - 1)]
+        self._found.append(Violation(spec.id, spec.alias, spec.description, line, column, detail))
+    
+    def _apply_line(self, rule_id: str, index: int, line: str,
+                    transform: Callable[..., LineFix], *params) -> object:
+        """``transform(line, *params)`` for line ``index``, served from the line memo if it can be."""
+        memo = self.line_memo
+        if memo is None:
+            result = transform(line, *params)
+        else:
+            key = (rule_id, line) + params
+            result = memo.get(key)
+            if result is None:
+                result = transform(line, *params)
+                memo.put(key, result)
+        fixed, fixes, flags = result
+        self.fixes_applied += fixes
+        if flags and self.lint:
+            for column, detail in flags:
+                self._flag(index, column, detail)
+        return fixed
+    
+    def _remap(self, before: str, after: str) -> None:
+        """Carry the original line numbers across one rule's edit.
+
+        Rewritten lines keep the number of the line they replace; lines a
+        rule inserted (blank lines, wrapped continuations) take the number of
+        the line above them.
+        """
+        old_lines = before.split('\n')
+        new_lines = after.split('\n')
+        if len(old_lines) == len(new_lines):
+            return  # Lines were rewritten in place
+        origin = None
+        if self._rule.touches <= {'blank', 'eof'}:
+            origin = self._remap_blanks(old_lines, new_lines)
+        if origin is None:
+            origin = []
+            matcher = SequenceMatcher(None, old_lines, new_lines, autojunk=False)
+            for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+                if tag == 'equal':
+                    origin.extend(self._origin[i1:i2])
+                elif tag == 'replace':
+                    origin.extend(self._origin[min(i1 + k, i2 - 1)] for k in range(j2 - j1))
+                elif tag == 'insert':
+                    above = self._origin[i1 - 1] if i1 > 0 else self._origin[0]
+                    origin.extend([above] * (j2 - j1))
+        self._origin = origin or [1]
+    
+    def _remap_blanks(self, old_lines: List[str], new_lines: List[str]) -> Optional[List[int]]:
+        """Linear ``_remap`` for rules that only add or drop blank lines (None if one did more)."""
+        origin = []
+        i = 0
+        for line in new_lines:
+            if i < len(old_lines) and old_lines[i] == line:
+                origin.append(self._origin[i])
+                i += 1
+                continue
+            if not line.strip():
+                origin.append(self._origin[max(i - 1, 0)])
+                continue
+            # A dropped run of blank lines
+            while i < len(old_lines) and not old_lines[i].strip():
+                i += 1
+            if i == len(old_lines) or old_lines[i] != line:
+                return None
+            origin.append(self._origin[i])
+            i += 1
+        return origin
+    
+    def _fix_trailing_spaces(self, content: str) -> str:
+        """Fix MD009: Trailing spaces."""
+        lines = content.split('\n')
+        fixed_lines = []
+        
+        for i, line in enumerate(lines):
+            # Remove trailing spaces
+            stripped = line.rstrip()
+            if self.lint and stripped != line:
+                self._flag(i, len(stripped) + 1, f"Expected: 0; Actual: {len(line) - len(stripped)}")
+            fixed_lines.append(stripped)
+        
+        return '\n'.join(fixed_lines)
+    
+    def _fix_multiple_blank_lines(self, content: str) -> str:
+        """Fix MD012: Multiple consecutive blank lines."""
+        # Replace multiple consecutive blank lines with single blank line
+        if self.lint:
+            for match in _MULTIPLE_BLANKS.finditer(content):
+                # Reported on the second blank line, as markdownlint does
+                blanks = match.group(0).count('\n') - 1
+                self._flag(content.count('\n', 0, match.start()) + 2, None,
+                           f"Expected: 1; Actual: {blanks}")
+        content = _MULTIPLE_BLANKS.sub('\n\n', content)
+        return content
+    
+    def _fix_line_length(self, content: str) -> str:
+        """Fix MD013: Line length by breaking at appropriate points."""
+        lines = content.split('\n')
+        fixed_lines = []
+        text_limit = self.max_line_length
+        code_limit = self.code_block_line_length if self.code_block_line_length is not None else text_limit
+        in_fence = False
+        
+        for i, line in enumerate(lines):
+            fence = line.strip().startswith('```')
+            code = in_fence or fence
+            limit = code_limit if code else text_limit
+            if fence:
+                in_fence = not in_fence
+            table = not code and not self.wrap_tables and line.lstrip().startswith('|')
+            if len(line) <= limit or limit == 0 or table:
+                fixed_lines.append(line)
+            else:
+                fixed_lines.extend(self._apply_line("MD013", i, line, _line_length_line, limit))
+        
+        return '\n'.join(fixed_lines)
+    
+    def _fix_blank_lines_around_headings(self, content: str) -> str:
+        """Fix MD022: Blank lines around headings."""
+        lines = content.split('\n')
+        fixed_lines = []
+        
+        for i, line in enumerate(lines):
+            # Check if this is a heading
+            if re.match(r'^#{1,6}\s+', line):
+                # Add blank line before heading (if not first line and previous line not blank)
+                if i > 0 and fixed_lines and fixed_lines[-1].strip():
+                    fixed_lines.append('')
+                    self._flag(i, None, "Expected: 1; Actual: 0; Above")
+                fixed_lines.append(line)
+                
+                # Add blank line after heading (if not last line and next line not blank)
+                if i < len(lines) - 1 and lines[i + 1].strip():
+                    fixed_lines.append('')
+                    self._flag(i, None, "Expected: 1; Actual: 0; Below")
+            else:
+                fixed_lines.append(line)
+        
+        return '\n'.join(fixed_lines)
+    
+    def _fix_blank_lines_around_lists(self, content: str) -> str:
+        """Fix MD032: Blank lines around lists."""
+        lines = content.split('\n')
+        fixed_lines = []
+        
+        for i, line in enumerate(lines):
+            # Check if this is a list item
+            if re.match(r'^\s*[-*+]\s+', line) or re.match(r'^\s*\d+\.\s+', line):
+                # Add blank line before list (if not first line and previous line not blank)
+                if i > 0 and fixed_lines and fixed_lines[-1].strip():
+                    fixed_lines.append('')
+                    self._flag(i)
+                fixed_lines.append(line)
+                
+                # Add blank line after list (if not last line and next line not blank and not list item)
+                if (i < len(lines) - 1 and 
+                    lines[i + 1].strip() and 
+                    not re.match(r'^\s*[-*+]\s+', lines[i + 1]) and
+                    not re.match(r'^\s*\d+\.\s+', lines[i + 1])):
+                    fixed_lines.append('')
+                    self._flag(i)
+            else:
+                fixed_lines.append(line)
+        
+        return '\n'.join(fixed_lines)
+    
+    def _fix_blank_lines_around_fences(self, content: str) -> str:
+        """Fix MD031: Blank lines around fenced code blocks."""
+        lines = content.split('\n')
+        fixed_lines = []
+        
+        for i, line in enumerate(lines):
+            # Check if this is a fenced code block
+            if line.strip().startswith('```'):
+                # Add blank line before fence (if not first line and previous line not blank)
+                if i > 0 and fixed_lines and fixed_lines[-1].strip():
+                    fixed_lines.append('')
+                    self._flag(i)
+                fixed_lines.append(line)
+                
+                # Add blank line after fence (if not last line and next line not blank)
+                if i < len(lines) - 1 and lines[i + 1].strip():
+                    fixed_lines.append('')
+                    self._flag(i)
+            else:
+                fixed_lines.append(line)
+        
+        return '\n'.join(fixed_lines)
+    
+    def _fix_fenced_code_language(self, content: str) -> str:
+        """Fix MD040: Fenced code blocks should have language specified."""
+        lines = content.split('\n')
+        fixed_lines = []
+        
+        for i, line in enumerate(lines):
+            # Check if this is a fenced code block without language
+            if line.strip() == '```':
+                # Try to infer language from context or use 'text'
+                language = 'text'
+                
+                # Look at the next few lines for hints
+                for j in range(i + 1, min(i + 5, len(lines))):
+                    next_line = lines[j].strip()
+                    if next_line == '```':
+                        break
+                    if any(keyword in next_line.lower() for keyword in ['bash', 'sh', 'shell']):
+                        language = 'bash'
+                        break
+                    elif any(keyword in next_line.lower() for keyword in ['javascript', 'js', 'typescript', 'ts']):
+                        language = 'javascript'
+                        break
+                    elif any(keyword in next_line.lower() for keyword in ['python', 'py']):
+                        language = 'python'
+                        break
+                    elif any(keyword in next_line.lower() for keyword in ['json']):
+                        language = 'json'
+                        break
+                    elif any(keyword in next_line.lower() for keyword in ['yaml', 'yml']):
+                        language = 'yaml'
+                        break
+                    elif any(keyword in next_line.lower() for keyword in ['html', 'xml']):
+                        language = 'html'
+                        break
+                    elif any(keyword in next_line.lower() for keyword in ['css']):
+                        language = 'css'
+                        break
+                    elif any(keyword in next_line.lower() for keyword in ['sql']):
+                        language = 'sql'
+                        break
+                
+                fixed_lines.append(f'```{language}')
+                self.fixes_applied += 1
+                self._flag(i)
+            else:
+                fixed_lines.append(line)
+        
+        return '\n'.join(fixed_lines)
+    
+    def _fix_duplicate_headings(self, content: str) -> str:
+        """Fix MD024: Duplicate headings by adding unique identifiers."""
+        lines = content.split('\n')
+        fixed_lines = []
+        heading_counts = {}
+        
+        for i, line in enumerate(lines):
+            # Check if this is a heading
+            heading_match = re.match(r'^(#{1,6})\s+(.+)$', line)
+            if heading_match:
+                level, text = heading_match.groups()
+                heading_text = text.strip()
+                
+                # Count occurrences
+                if heading_text in heading_counts:
+                    heading_counts[heading_text] += 1
+                    # Make heading unique
+                    line = f"{level} {heading_text} ({heading_counts[heading_text]})"
+                    self.fixes_applied += 1
+                    self._flag(i, None, f"Context: \"{heading_text}\"")
+                else:
+                    heading_counts[heading_text] = 1
+            
+            fixed_lines.append(line)
+        
+        return '\n'.join(fixed_lines)
+    
+    def _fix_list_indentation(self, content: str) -> str:
+        """Fix MD007/MD005: List indentation consistency."""
+        lines = content.split('\n')
+        fixed_lines = []
+        
+        for i, line in enumerate(lines):
+            if _may_be_list_item(line):
+                line = self._apply_line("MD007", i, line, _list_indent_line)
+            fixed_lines.append(line)
+        
+        return '\n'.join(fixed_lines)
+    
+    def _fix_ordered_list_prefixes(self, content: str) -> str:
+        """Fix MD029: Ordered list item prefix consistency."""
+        lines = content.split('\n')
+        fixed_lines = []
+        
+        for i, line in enumerate(lines):
+            if _may_be_list_item(line):
+                line = self._apply_line("MD029", i, line, _ordered_prefix_line)
+            fixed_lines.append(line)
+        
+        return '\n'.join(fixed_lines)
+    
+    def _fix_bare_urls(self, content: str) -> str:
+        """Fix MD034: Bare URLs should be wrapped in angle brackets or markdown links."""
+        lines = content.split('\n')
+        fixed_lines = []
+        
+        for i, line in enumerate(lines):
+            if '://' in line:
+                line = self._apply_line("MD034", i, line, _bare_urls_line)
+            fixed_lines.append(line)
+        
+        return '\n'.join(fixed_lines)
+    
+    def _fix_emphasis_style(self, content: str) -> str:
+        """Fix MD049: Emphasis style consistency (underscore to asterisk)."""
+        lines = content.split('\n')
+        fixed_lines = []
+        in_fence = False
+        
+        for i, line in enumerate(lines):
+            if line.strip().startswith('```'):
+                in_fence = not in_fence
+            elif not in_fence and '_' in line:
+                line = self._apply_line("MD049", i, line, _emphasis_line)
+            fixed_lines.append(line)
+        
+        return '\n'.join(fixed_lines)
+    
+    def _fix_file_ending(self, content: str) -> str:
+        """Fix MD047: Files should end with a single newline."""
+        # Remove trailing whitespace and ensure single newline at end
+        fixed = content.rstrip() + '\n'
+        if self.lint and fixed != content:
+            start = fixed.rfind('\n', 0, len(fixed) - 1) + 1
+            self._flag(fixed.count('\n') - 1, len(fixed) - start)
+        return fixed
+    
+    def process_directory(self, directory: Path, pattern: str = "*.md") -> Dict[str, int]:
+        """Process all markdown files in a directory."""
+        results = {"processed": 0, "fixed": 0, "errors": 0}
+        with phase("discovery"):
+            file_paths = [p for p in directory.rglob(pattern) if p.is_file()]
+        
+        for file_path in file_paths:
+            results["processed"] += 1
+            self.files_processed += 1
+            
+            if self.fix_file(file_path):
+                results["fixed"] += 1
+                print(f"✅ Fixed: {file_path}", file=self.progress)
+            else:
+                print(f"✅ No changes needed: {file_path}", file=self.progress)
+        
+        return results
+    
+    def process_files(self, file_paths: List[Path]) -> Dict[str, int]:
+        """Process specific markdown files."""
+        results = {"processed": 0, "fixed": 0, "errors": 0}
+        
+        for file_path in file_paths:
+            if file_path.is_file() and file_path.suffix == '.md':
+                results["processed"] += 1
+                self.files_processed += 1
+                
+                if self.fix_file(file_path):
+                    results["fixed"] += 1
+                    print(f"✅ Fixed: {file_path}", file=self.progress)
+                else:
+                    print(f"✅ No changes needed: {file_path}", file=self.progress)
+            else:
+                print(f"⚠️  Skipping non-markdown file: {file_path}", file=self.progress)
+        
+        return results
+
+
+def fix_text(text: str, config: Optional[FixerConfig] = None) -> Tuple[str, FixReport]:
+    """Fix markdown text in memory and report which rules fired."""
+    fixer = UniversalMarkdownFixer.from_config(config or FixerConfig())
+    return fixer.fix_with_report(text)
@@ -4,53 +4,157 @@
 Memory Manager Script
 
 Purpose: Manage the file-based memory system for AI assistant
-Usage: python scripts/memory-manager.py [command] [options]
+Usage: python scripts/memory-manager.py [--file PATH] [command] [options]
 
 Commands:
-  read - Read current memory
+  read - Read current memory (or one section: --section NAME / --path "Parent/Child")
   update - Update memory with new information
-  add - Add new information to memory
+  add - Add new information to memory (entries already in the section are skipped)
+  dedupe - Remove repeated entries within each section
   search - Search memory for specific information
+  related - Find the paragraphs most related to some text (TF-IDF cosine similarity)
+  sessions - Read dated sections in a date range (--since / --until / --last N)
   timestamp - Update last updated timestamp
+  shard --remove-combined / unshard - Split memory.md into memory/ (one file per ## category) or merge it back
+
+With memory/manifest.json present, every command works on the shards:
+writes touch only the shards they change, search and sections fan out
+across shards on a thread pool, and read prints the combined file.
+Sharding removes memory.md, which hooks and docs read directly, so shard
+refuses to run without --remove-combined.
+
+Any command accepts --profile[=PATH] and --trace-timings (see _profiling.py).
 """
 
+import heapq
 import os
 import sys
 import re
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
+from typing import List, Optional
+
+from _memory_entries import EntryIndex, dedupe_section
+from _memory_related import load_related
+from _memory_shards import ShardView, ShardedMemory, place, shard_dir
+from _memory_shards import read_ranges as read_shard_ranges, read_section as read_shard_section
+from _memory_snapshot import load_snapshot
+from _profiling import phase, run_main
+from _writeback import write_text_atomic
+
+
+def fan_out(function, items):
+    """``map`` over the shards, on a thread pool when there is more than one"""
+    items = list(items)
+    if len(items) < 2:
+        return [function(item) for item in items]
+    with ThreadPoolExecutor(max_workers=min(len(items), os.cpu_count() or 1)) as pool:
+        return list(pool.map(function, items))
 
 
 class MemoryManager:
-    def __init__(self):
+    def __init__(self, memory_file: Optional[Path] = None):
         self.project_root = Path(__file__).parent.parent
-        self.memory_file = self.project_root / "memory.md"
+        self.memory_file = Path(memory_file) if memory_file else self.project_root / "memory.md"
+        self.shards = ShardedMemory.load(shard_dir(self.memory_file))
     
     def read(self):
         """Read the current memory file"""
         try:
-            if not self.memory_file.exists():
-                print("Memory file does not exist. Creating initial memory...")
-                self.create_initial_memory()
-            
-            with open(self.memory_file, 'r', encoding='utf-8') as f:
-                return f.read()
+            return ''.join(self.read_parts())
         except Exception as e:
             print(f"Error reading memory file: {e}")
             return None
     
+    def read_parts(self):
+        """The memory text as one part, or one part per shard when sharded"""
+        if self.shards is None and not self.memory_file.exists():
+            print("Memory file does not exist. Creating initial memory...")
+            self.create_initial_memory()
+        
+        with phase("read"):
+            if self.shards is not None:
+                return self.shards.read()
+            with open(self.memory_file, 'r', encoding='utf-8') as f:
+                return [f.read()]
+    
+    def write_parts(self, parts, updated_parts):
+        """Write back the parts that changed (only the touched shards when sharded)"""
+        if self.shards is not None:
+            self.shards.write(parts, updated_parts)
+        elif updated_parts[0] != parts[0]:
+            write_text_atomic(self.memory_file, updated_parts[0])
+    
+    def views(self) -> List[ShardView]:
+        """Parsed structure of the memory file (or of each shard), reused while unchanged"""
+        if self.shards is None and not self.memory_file.exists():
+            print("Memory file does not exist. Creating initial memory...")
+            self.create_initial_memory()
+        with phase("read"):
+            paths = self.shards.paths if self.shards is not None else [self.memory_file]
+            return place(fan_out(load_snapshot, paths))
+    
+    def read_section(self, section=None, path=None):
+        """Read one section (heading and body) by name or by heading path.
+        
+        Only the section's bytes are read, located through the snapshot's
+        heading offsets. With duplicate names the first section is returned.
+        """
+        try:
+            views = self.views()
+            matches = [(number, index) for number, view in enumerate(views)
+                       for index in view.snapshot.find_headings(section, path, view.parents)]
+            if not matches:
+                return None
+            if len(matches) > 1:
+                others = ', '.join('"' + '/'.join(views[number].snapshot.heading_path(index, views[number].parents)) + '"'
+                                   for number, index in matches)
+                print(f"Note: {len(matches)} sections match ({others}); showing the first, "
+                      f"use --path to choose", file=sys.stderr)
+            with phase("read"):
+                return read_shard_section(views, *matches[0])
+        except Exception as e:
+            print(f"Error reading memory section: {e}")
+            return None
+    
+    def sessions(self, since=None, until=None, last=None):
+        """Dated sections (headers like "Name (2025-01-15)") within a date range.
+        
+        Dates are YYYY-MM-DD and inclusive; ``last`` keeps the most recent N.
+        The range is found by bisecting the snapshot's date index and only
+        the matching sections are read. Returns (date, section text) pairs,
+        oldest first.
+        """
+        try:
+            views = self.views()
+            dated = list(heapq.merge(*[[(date, number, index) for date, index in
+                                        view.snapshot.dated_headings(since, until, last)]
+                                       for number, view in enumerate(views)]))
+            if last is not None:
+                dated = dated[max(0, len(dated) - last):]
+            with phase("read"):
+                return [(date, read_shard_section(views, number, index)) for date, number, index in dated]
+        except Exception as e:
+            print(f"Error reading memory sessions: {e}")
+            return []
+    
     def update(self, section, content):
         """Update memory with new information"""
         try:
-            current_memory = self.read()
-            if not current_memory:
+            parts = self.read_parts()
+            if not ''.join(parts):
                 return False
             
-            # Simple update logic - replace section content
-            updated_memory = self.replace_section(current_memory, section, content)
+            # Simple update logic - replace section content (in every part that has it)
+            with phase("transform"):
+                pattern = self.section_pattern(section)
+                targets = [i for i, text in enumerate(parts) if re.search(pattern, text)] or [len(parts) - 1]
+                updated_parts = list(parts)
+                for i in targets:
+                    updated_parts[i] = self.replace_section(parts[i], section, content)
             
-            with open(self.memory_file, 'w', encoding='utf-8') as f:
-                f.write(updated_memory)
+            self.write_parts(parts, updated_parts)
             
             print(f"Updated memory section: {section}")
             return True
@@ -61,15 +165,31 @@ class MemoryManager:
     def add(self, section, content):
         """Add new information to memory"""
         try:
-            current_memory = self.read()
-            if not current_memory:
+            parts = self.read_parts()
+            if not ''.join(parts):
                 return False
             
             # Add content to existing section or create new section
-            updated_memory = self.add_to_section(current_memory, section, content)
+            with phase("transform"):
+                pattern = self.section_pattern(section)
+                target = next((i for i, text in enumerate(parts) if re.search(pattern, text)), len(parts) - 1)
+                match = re.search(pattern, parts[target])
+                entries = None
+                if match:
+                    # Skip entries the section already has (compared normalized, by hash)
+                    entries = EntryIndex.load(self.memory_file)
+                    fresh = entries.new_entries(section, match.group(1), content)
+                    if not fresh:
+                        print(f"Already in memory section: {section}")
+                        return True
+                    content = '\n'.join(line for chunk in fresh for line in chunk).strip('\n')
+                updated_parts = list(parts)
+                updated_parts[target] = self.add_to_section(parts[target], section, content)
             
-            with open(self.memory_file, 'w', encoding='utf-8') as f:
-                f.write(updated_memory)
+            self.write_parts(parts, updated_parts)
+            if entries is not None:
+                entries.record(section, self.append_to_section_text(match.group(1), content), fresh)
+                entries.save()
             
             print(f"Added to memory section: {section}")
             return True
@@ -80,24 +200,24 @@ class MemoryManager:
     def search(self, query):
         """Search memory for specific information"""
         try:
-            memory = self.read()
-            if not memory:
-                return []
-            
-            lines = memory.split('\n')
-            results = []
+            views = self.views()
             
-            for i, line in enumerate(lines):
-                if query.lower() in line.lower():
-                    # Get context (2 lines before and after)
+            with phase("transform"):
+                results = []
+                
+                # Each shard is searched on its own thread; lines are numbered in the combined view
+                per_view = fan_out(lambda view: view.snapshot.search_lines(query), views)
+                hits = [view.first_line + i for view, view_hits in zip(views, per_view)
+                        for i in view_hits if i < view.line_count]
+                # Get context (2 lines before and after)
+                contexts = read_shard_ranges(views, ((i - 2, i + 3) for i in hits))
+                
+                for i, context_lines in zip(hits, contexts):
                     start = max(0, i - 2)
-                    end = min(len(lines), i + 3)
-                    context = '\n'.join(lines[start:end])
-                    
                     results.append({
                         'line': i + 1,
-                        'content': line.strip(),
-                        'context': context
+                        'content': context_lines[i - start].strip(),
+                        'context': '\n'.join(context_lines)
                     })
             
             return results
@@ -105,9 +225,119 @@ class MemoryManager:
             print(f"Error searching memory: {e}")
             return []
     
+    def related(self, text, top_k=5):
+        """Paragraphs most related to ``text`` by TF-IDF cosine similarity
+        
+        When sharded, each shard has its own index and the best matches of
+        every shard are merged by score.
+        """
+        try:
+            views = self.views()
+            with phase("read"):
+                indexes = fan_out(lambda view: load_related(view.snapshot), views)
+            
+            with phase("transform"):
+                matches = []
+                for view, index in zip(views, indexes):
+                    for score, document in index.query(text, top_k):
+                        line, count, heading = index.unit(document)
+                        matches.append((-score, view.first_line + line, count, view, heading))
+                matches = sorted(matches, key=lambda match: match[:2])[:top_k]
+                paragraphs = read_shard_ranges(views, ((line, line + count) for _, line, count, _, _ in matches))
+                
+                results = []
+                for (score, line, _, view, heading), lines in zip(matches, paragraphs):
+                    section = view.snapshot.heading_path(heading, view.parents) if heading >= 0 else ()
+                    results.append({
+                        'score': -score,
+                        'line': line + 1,
+                        'section': '/'.join(section),
+                        'content': '\n'.join(lines)
+                    })
+            
+            return results
+        except Exception as e:
+            print(f"Error finding related memory: {e}")
+            return []
+    
+    def dedupe(self):
+        """Remove repeated entries within each section, keeping the first of each"""
+        try:
+            parts = self.read_parts()
+            if not ''.join(parts):
+                return 0
+            
+            with phase("transform"):
+                removed = 0
+                updated_parts = []
+                for memory in parts:
+                    pieces = []
+                    end = 0
+                    for match in re.finditer(self.section_pattern(), memory):
+                        text, count = dedupe_section(match.group(1))
+                        pieces.append(memory[end:match.start()])
+                        pieces.append(text)
+                        removed += count
+                        end = match.end()
+                    pieces.append(memory[end:])
+                    updated_parts.append(''.join(pieces))
+            
+            if removed:
+                self.write_parts(parts, updated_parts)
+            
+            return removed
+        except Exception as e:
+            print(f"Error deduplicating memory: {e}")
+            return 0
+    
+    def shard(self, remove_combined=False):
+        """Split the memory file into one file per top-level category
+        
+        The memory file itself is removed, so anything reading it directly
+        (hooks, docs) stops seeing memory; ``remove_combined`` must be set.
+        """
+        try:
+            if self.shards is not None:
+                print(f"Memory is already sharded in {self.shards.directory}")
+                return False
+            if not remove_combined:
+                print(f"Sharding removes {self.memory_file}, which hooks and docs read directly; "
+                      f"they must use 'memory-manager.py read' instead. "
+                      f"Re-run with --remove-combined to shard anyway.")
+                return False
+            memory = ''.join(self.read_parts())
+            self.shards = ShardedMemory.create(shard_dir(self.memory_file), memory)
+            self.memory_file.unlink()
+            print(f"Sharded memory into {len(self.shards.files)} files in {self.shards.directory}")
+            return True
+        except Exception as e:
+            print(f"Error sharding memory: {e}")
+            return False
+    
+    def unshard(self):
+        """Merge the shards back into a single memory file"""
+        try:
+            if self.shards is None:
+                print("Memory is not sharded")
+                return False
+            write_text_atomic(self.memory_file, ''.join(self.read_parts()))
+            self.shards.remove()
+            self.shards = None
+            print(f"Merged memory shards into {self.memory_file}")
+            return True
+        except Exception as e:
+            print(f"Error merging memory shards: {e}")
+            return False
+    
+    @staticmethod
+    def section_pattern(section=None):
+        """Pattern matching a "### **Section**" block (any section if None)"""
+        name = re.escape(section) if section is not None else r".*?"
+        return rf"(### \*\*{name}\*\*[\s\S]*?)(?=###|##|$)"
+    
     def replace_section(self, memory, section, new_content):
         """Replace a section in the memory file"""
-        section_pattern = rf"(### \*\*{re.escape(section)}\*\*[\s\S]*?)(?=###|##|$)"
+        section_pattern = self.section_pattern(section)
         replacement = f"### **{section}**\n\n{new_content}\n\n"
         
         if re.search(section_pattern, memory):
@@ -118,17 +348,22 @@ class MemoryManager:
     
     def add_to_section(self, memory, section, new_content):
         """Add content to an existing section"""
-        section_pattern = rf"(### \*\*{re.escape(section)}\*\*[\s\S]*?)(?=###|##|$)"
+        section_pattern = self.section_pattern(section)
         match = re.search(section_pattern, memory)
         
         if match:
-            existing_content = match.group(1)
-            updated_content = existing_content + f"\n{new_content}"
+            updated_content = self.append_to_section_text(match.group(1), new_content)
             return memory.replace(match.group(0), updated_content)
         else:
             # Section doesn't exist, create it
             return memory + f"\n\n### **{section}**\n\n{new_content}\n\n"
     
+    @staticmethod
+    def append_to_section_text(section_text, new_content):
+        """Section text with new content after its last line, keeping the blank lines before the next heading"""
+        body = section_text.rstrip('\n')
+        return body + f"\n{new_content}" + section_text[len(body):]
+    
     def create_initial_memory(self):
         """Create initial memory file if it doesn't exist"""
         today = datetime.now().strftime("%Y-%m-%d")
@@ -173,27 +408,25 @@ class MemoryManager:
 **Note**: This memory system is maintained by the AI assistant and updated throughout sessions to maintain context and knowledge continuity.
 """
         
-        with open(self.memory_file, 'w', encoding='utf-8') as f:
-            f.write(initial_memory)
+        write_text_atomic(self.memory_file, initial_memory)
         
         print("Created initial memory file")
     
     def update_timestamp(self):
         """Update the last updated timestamp"""
         try:
-            memory = self.read()
-            if not memory:
+            parts = self.read_parts()
+            if not ''.join(parts):
                 return False
             
             today = datetime.now().strftime("%Y-%m-%d")
-            updated_memory = re.sub(
+            updated_parts = [re.sub(
                 r'\*\*Last Updated\*\*: .*',
                 f'**Last Updated**: {today}',
                 memory
-            )
+            ) for memory in parts]
             
-            with open(self.memory_file, 'w', encoding='utf-8') as f:
-                f.write(updated_memory)
+            self.write_parts(parts, updated_parts)
             
             return True
         except Exception as e:
@@ -203,14 +436,8 @@ class MemoryManager:
     def list_sections(self):
         """List all sections in the memory file"""
         try:
-            memory = self.read()
-            if not memory:
-                return []
-            
-            # Find all section headers
-            section_pattern = r'### \*\*(.*?)\*\*'
-            sections = re.findall(section_pattern, memory)
-            return sections
+            # Section headers come from the parse snapshots (one per shard when sharded)
+            return [name for view in self.views() for name in view.snapshot.section_names()]
         except Exception as e:
             print(f"Error listing sections: {e}")
             return []
@@ -218,14 +445,33 @@ class MemoryManager:
 
 def main():
     """CLI Interface"""
+    memory_file = None
+    if len(sys.argv) > 2 and sys.argv[1] == '--file':
+        memory_file = Path(sys.argv[2])
+        del sys.argv[1:3]
+    
     if len(sys.argv) < 2:
         print_usage()
         return
     
     command = sys.argv[1]
-    memory_manager = MemoryManager()
+    memory_manager = MemoryManager(memory_file)
     
     if command == 'read':
+        if len(sys.argv) > 2:
+            if len(sys.argv) != 4 or sys.argv[2] not in ('--section', '--path'):
+                print("Usage: python scripts/memory-manager.py read [--section <name> | --path <parent/child>]")
+                sys.exit(1)
+            option, value = sys.argv[2], sys.argv[3]
+            if option == '--section':
+                section = memory_manager.read_section(section=value)
+            else:
+                section = memory_manager.read_section(path=value)
+            if section is None:
+                print(f"Section not found: {value}")
+                sys.exit(1)
+            print(section, end='')
+            return
         memory = memory_manager.read()
         if memory:
             print(memory)
@@ -250,6 +496,14 @@ def main():
         memory_manager.add(section, content)
         memory_manager.update_timestamp()
     
+    elif command == 'dedupe':
+        removed = memory_manager.dedupe()
+        if removed:
+            print(f"Removed {removed} duplicate entries")
+            memory_manager.update_timestamp()
+        else:
+            print("No duplicate entries found")
+    
     elif command == 'search':
         if len(sys.argv) < 3:
             print("Usage: python scripts/memory-manager.py search <query>")
@@ -266,10 +520,55 @@ def main():
         else:
             print(f"No results found for \"{query}\"")
     
+    elif command == 'related':
+        args = sys.argv[2:]
+        top_k = 5
+        if len(args) >= 2 and args[-2] == '--top' and args[-1].isdigit():
+            top_k = int(args[-1])
+            args = args[:-2]
+        if not args:
+            print("Usage: python scripts/memory-manager.py related <text> [--top K]")
+            sys.exit(1)
+        
+        text = ' '.join(args)
+        results = memory_manager.related(text, top_k)
+        
+        if results:
+            print(f"Top {len(results)} related notes for \"{text}\":")
+            for i, result in enumerate(results, 1):
+                print(f"\n{i}. Line {result['line']} ({result['score']:.3f}) {result['section']}")
+                print(result['content'])
+        else:
+            print(f"No related notes found for \"{text}\"")
+    
+    elif command == 'sessions':
+        options = parse_session_options(sys.argv[2:])
+        if options is None:
+            print("Usage: python scripts/memory-manager.py sessions [--since YYYY-MM-DD] "
+                  "[--until YYYY-MM-DD] [--last N]")
+            sys.exit(1)
+        
+        sessions = memory_manager.sessions(**options)
+        if sessions:
+            print('\n'.join(text for _, text in sessions), end='')
+        else:
+            print("No dated sessions found")
+    
     elif command == 'timestamp':
         memory_manager.update_timestamp()
         print("Updated timestamp")
     
+    elif command == 'shard':
+        if sys.argv[2:] not in ([], ['--remove-combined']):
+            print("Usage: python scripts/memory-manager.py shard --remove-combined")
+            sys.exit(1)
+        if not memory_manager.shard(remove_combined=sys.argv[2:] == ['--remove-combined']):
+            sys.exit(1)
+    
+    elif command == 'unshard':
+        if not memory_manager.unshard():
+            sys.exit(1)
+    
     elif command == 'sections':
         sections = memory_manager.list_sections()
         if sections:
@@ -284,31 +583,71 @@ def main():
         print_usage()
 
 
+def parse_session_options(args):
+    """Parse sessions' --since/--until/--last options; None if they are invalid"""
+    options = {}
+    if len(args) % 2:
+        return None
+    for flag, value in zip(args[::2], args[1::2]):
+        try:
+            if flag in ('--since', '--until'):
+                options[flag[2:]] = datetime.strptime(value, "%Y-%m-%d").strftime("%Y-%m-%d")
+            elif flag == '--last' and int(value) >= 0:
+                options['last'] = int(value)
+            else:
+                return None
+        except ValueError:
+            return None
+    return options
+
+
 def print_usage():
     """Print usage information"""
     print("""
 Memory Manager - File-based AI Memory System
 
-Usage: python scripts/memory-manager.py <command> [options]
+Usage: python scripts/memory-manager.py [--file PATH] <command> [options]
+
+Options:
+  --file PATH                - Memory file to use (default: memory.md in the repo root)
 
 Commands:
   read                    - Read current memory
+  read --section <name>      - Read one section
+  read --path <a/b>          - Read the section b under heading a (for duplicate names)
   update <section> <content> - Update memory section
-  add <section> <content>    - Add to memory section
+  add <section> <content>    - Add to memory section (skips entries it already has)
+  dedupe                     - Remove repeated entries within each section
   search <query>             - Search memory
+  related <text> [--top K]   - Find related notes (TF-IDF, top 5 by default)
+  sessions [--since DATE] [--until DATE] [--last N]
+                             - Read dated sections (YYYY-MM-DD, inclusive)
   timestamp                 - Update last updated timestamp
   sections                  - List all sections
+  shard --remove-combined    - Split memory into memory/ (one file per ## category);
+                               memory.md is removed, so hooks reading it must use read
+  unshard                    - Merge memory/ back into a single file
+
+Profiling (any command):
+  --profile[=PATH]           - Write cProfile stats and collapsed stacks (PATH.collapsed)
+  --trace-timings            - Print per-phase timings to stderr
 
 Examples:
   python scripts/memory-manager.py read
+  python scripts/memory-manager.py read --section "Active Issues"
+  python scripts/memory-manager.py read --path "Session Notes/Current Session (2025-01-15)"
   python scripts/memory-manager.py update "Current Session" "Working on CI/CD fixes"
   python scripts/memory-manager.py add "Session Notes" "Completed memory system setup"
   python scripts/memory-manager.py search "Steam"
+  python scripts/memory-manager.py related "pipeline keeps failing on deploy"
+  python scripts/memory-manager.py sessions --since 2025-01-08
+  python scripts/memory-manager.py sessions --last 3
   python scripts/memory-manager.py sections
+  python scripts/memory-manager.py search "Steam" --trace-timings
     """)
 
 
 if __name__ == "__main__":
-    main()
+    run_main(main)
 
 
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Tests for --staged in scripts/fix-markdown-universal.py
+
+Usage: python -m unittest discover -s scripts -p "test_*.py"  (or pytest scripts/test_fix_markdown_staged.py)
+"""
+
+import importlib.util
+import io
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from _writeback import WriteBatch  # noqa: E402
+from markdown_fixer import UniversalMarkdownFixer, fix_text  # noqa: E402
+
+
+def load_fixer_cli():
+    """Import fix-markdown-universal.py as a module."""
+    spec = importlib.util.spec_from_file_location(
+        "fix_markdown_universal", Path(__file__).parent / "fix-markdown-universal.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+CLI = load_fixer_cli()
+BROKEN = "# Title\nSee http://example.com for details\n"
+FIXED = fix_text(BROKEN)[0]
+
+
+@unittest.skipIf(shutil.which("git") is None, "git is not installed")
+class StagedTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = Path(tmp.name)
+        self.git("init", "-q")
+        self.doc = self.root / "doc.md"
+
+    def git(self, *args: str) -> str:
+        return subprocess.run(["git", "-c", "user.name=test", "-c", "user.email=test@example.com", *args],
+                              cwd=self.root, check=True, capture_output=True, text=True).stdout
+
+    def staged(self, path: str) -> str:
+        return self.git("show", f":{path}")
+
+    def fix_staged(self, dry_run: bool = False) -> dict:
+        with WriteBatch(durable=False) as batch:
+            fixer = UniversalMarkdownFixer(batch=batch)
+            fixer.progress = io.StringIO()
+            results = CLI.process_staged(fixer, self.root, ["*.md"], dry_run)
+            if dry_run:
+                batch.discard()
+        return results
+
+    def test_fully_staged_file_is_fixed_in_index_and_working_tree(self):
+        self.doc.write_text(BROKEN, encoding="utf-8")
+        self.git("add", "doc.md")
+        results = self.fix_staged()
+        self.assertEqual(results, {"processed": 1, "fixed": 1, "errors": 0})
+        self.assertNotEqual(FIXED, BROKEN)
+        self.assertEqual(self.staged("doc.md"), FIXED)
+        self.assertEqual(self.doc.read_text(encoding="utf-8"), FIXED)
+
+    def test_partially_staged_file_is_fixed_in_index_only(self):
+        self.doc.write_text(BROKEN, encoding="utf-8")
+        self.git("add", "doc.md")
+        unstaged = BROKEN + "Not staged yet\n"
+        self.doc.write_text(unstaged, encoding="utf-8")
+        self.fix_staged()
+        self.assertEqual(self.staged("doc.md"), FIXED)
+        self.assertEqual(self.doc.read_text(encoding="utf-8"), unstaged)
+
+    def test_dry_run_leaves_index_and_working_tree(self):
+        self.doc.write_text(BROKEN, encoding="utf-8")
+        self.git("add", "doc.md")
+        results = self.fix_staged(dry_run=True)
+        self.assertEqual(results["fixed"], 1)
+        self.assertEqual(self.staged("doc.md"), BROKEN)
+        self.assertEqual(self.doc.read_text(encoding="utf-8"), BROKEN)
+
+    def test_clean_and_unstaged_files_are_left_alone(self):
+        self.doc.write_text(FIXED, encoding="utf-8")
+        (self.root / "other.md").write_text(BROKEN, encoding="utf-8")
+        self.git("add", "doc.md")
+        results = self.fix_staged()
+        self.assertEqual(results, {"processed": 1, "fixed": 0, "errors": 0})
+        self.assertEqual((self.root / "other.md").read_text(encoding="utf-8"), BROKEN)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Tests for scripts/markdown_fixer.py
+
+Usage: python -m unittest discover -s scripts -p "test_*.py"  (or pytest scripts/test_markdown_fixer.py)
+"""
+
+import sys
+import unittest
+from dataclasses import replace
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from markdown_fixer import FixerConfig, UniversalMarkdownFixer, config_from_markdownlint, fix_text  # noqa: E402
+
+
+LONG = " ".join(["word"] * 30)
+TABLE = "| Column | " + " | ".join(["cell value"] * 12) + " |"
+DOCUMENT = f"# Title\n\n{TABLE}\n\n```text\n{LONG}\n```\n\n{LONG}\n"
+
+
+def fix(text: str, options: dict) -> str:
+    # Only MD013, so the fence and table lines are exactly what it left
+    config = config_from_markdownlint({"default": False, "MD013": {"line_length": 40, **options}})
+    fixer = UniversalMarkdownFixer.from_config(config)
+    fixer.line_memo = None
+    return fixer.fix_content(text)
+
+
+class LineLengthOptionsTest(unittest.TestCase):
+    def test_tables_false_leaves_table_rows(self):
+        fixed = fix(DOCUMENT, {"tables": False})
+        self.assertIn(TABLE, fixed.split("\n"))
+        self.assertNotIn(LONG, fixed.split("\n"))
+
+    def test_tables_default_wraps_table_rows(self):
+        self.assertNotIn(TABLE, fix(DOCUMENT, {}).split("\n"))
+
+    def test_code_block_line_length_zero_leaves_fenced_lines(self):
+        fixed = fix(DOCUMENT, {"code_block_line_length": 0})
+        self.assertIn(f"```text\n{LONG}\n```", fixed)
+        self.assertNotIn(f"\n\n{LONG}\n", fixed)
+
+    def test_code_blocks_false_leaves_fenced_lines(self):
+        self.assertIn(f"```text\n{LONG}\n```", fix(DOCUMENT, {"code_blocks": False}))
+
+    def test_code_block_line_length_default_wraps_fenced_lines(self):
+        self.assertNotIn(f"```text\n{LONG}\n```", fix(DOCUMENT, {}))
+
+    def test_options_survive_config_round_trip(self):
+        config = config_from_markdownlint({"MD013": {"code_block_line_length": 0, "tables": False}})
+        self.assertEqual(config.code_block_line_length, 0)
+        self.assertFalse(config.wrap_tables)
+        self.assertEqual(UniversalMarkdownFixer.from_config(config).config, config)
+
+    def test_skipped_lines_are_not_reported(self):
+        config = config_from_markdownlint({"default": False, "MD013": {"line_length": 40, "tables": False,
+                                                                       "code_block_line_length": 0}})
+        fixer = UniversalMarkdownFixer.from_config(replace(config, lint=True))
+        fixer.line_memo = None
+        fixer.fix_content(DOCUMENT)
+        lines = {v.line for v in fixer.last_violations if v.rule == "MD013"}
+        self.assertEqual(lines, {DOCUMENT.split("\n").index(LONG, 6) + 1})
+
+
+class SchedulingTest(unittest.TestCase):
+    def assertSettles(self, text: str, max_line_length: int):
+        config = FixerConfig(max_line_length=max_line_length)
+        fixed, _ = fix_text(text, config)
+        self.assertEqual(fix_text(fixed, config)[0], fixed)
+
+    def test_list_indent_requeues_line_length(self):
+        # MD007 pushes the item past the limit; MD013 has to run again
+        self.assertSettles("                           +  and worker", 40)
+
+    def test_fuzzer_counterexamples_settle(self):
+        # Shrunk inputs fuzz-markdown-fixer.py reported before the fix above
+        for text, max_line_length in [
+            ("                           +  and worker", 40),
+            ("     + a worker and sim dragon sim" + " ." * 60 + " ", 80),
+        ]:
+            with self.subTest(text=text):
+                self.assertSettles(text, max_line_length)
+
+
+class FixCountTest(unittest.TestCase):
+    def test_ordered_prefix_counts_only_changed_lines(self):
+        config = config_from_markdownlint({"default": False, "MD029": True})
+        fixer = UniversalMarkdownFixer.from_config(config)
+        fixer.line_memo = None
+        self.assertEqual(fixer.fix_content("1. one\n1. two\n3. three\n"), "1. one\n1. two\n1. three\n")
+        self.assertEqual(fixer.fixes_applied, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
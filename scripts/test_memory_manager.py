@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Tests for scripts/memory-manager.py
+
+Usage: python -m unittest discover -s scripts -p "test_*.py"  (or pytest scripts/test_memory_manager.py)
+"""
+
+import contextlib
+import importlib.util
+import io
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from _memory_snapshot import CACHE_DIR_ENV  # noqa: E402
+
+
+def load_memory_manager():
+    """Import MemoryManager from memory-manager.py."""
+    spec = importlib.util.spec_from_file_location(
+        "memory_manager", Path(__file__).parent / "memory-manager.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.MemoryManager
+
+
+MemoryManager = load_memory_manager()
+
+MEMORY = """# Memory
+
+**Last Updated**: 2025-01-01
+
+---
+
+## 🧠 **Memory Categories**
+
+### **Project Context**
+- **Name**: Draconia Chronicles
+- Tech: TypeScript
+
+---
+
+## 📝 **Session Notes**
+
+### **Session (2025-01-15)**
+- Fixed CI
+- Added tests
+- fixed ci.
+
+Some notes
+over two lines.
+"""
+
+
+class MemoryTestCase(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = Path(tmp.name)
+        # Snapshots and entry indexes stay in the temp dir
+        patch = mock.patch.dict(os.environ, {CACHE_DIR_ENV: str(self.root / "cache")})
+        patch.start()
+        self.addCleanup(patch.stop)
+        self.memory_file = self.root / "memory.md"
+        self.memory_file.write_text(MEMORY, encoding="utf-8")
+
+    def manager(self):
+        return MemoryManager(self.memory_file)
+
+    def call(self, method, *args):
+        """Call a MemoryManager method with a fresh manager, as a CLI run would."""
+        with contextlib.redirect_stdout(io.StringIO()):
+            return getattr(self.manager(), method)(*args)
+
+    def text(self) -> str:
+        return self.memory_file.read_text(encoding="utf-8")
+
+
+class AddTest(MemoryTestCase):
+    def test_add_appends_new_entries(self):
+        self.assertTrue(self.call("add", "Project Context", "- Engine: PixiJS"))
+        context = self.text().split("### **Project Context**")[1].split("## 📝")[0]
+        self.assertIn("- Engine: PixiJS\n", context)
+        self.assertIn("- Tech: TypeScript\n", context)
+
+    def test_add_skips_entries_already_in_the_section(self):
+        self.call("add", "Project Context", "- Tech: TypeScript")
+        self.call("add", "Project Context", "* **Tech**:  typescript.")
+        self.assertEqual(self.text(), MEMORY)
+
+    def test_add_keeps_only_the_new_entries(self):
+        self.call("add", "Session (2025-01-15)", "- Added tests\n- Shipped build")
+        self.assertIn("over two lines.\n- Shipped build\n", self.text())
+        self.assertEqual(self.text().count("Added tests"), 1)
+
+    def test_add_after_an_edit_elsewhere_still_dedupes(self):
+        self.call("add", "Project Context", "- Engine: PixiJS")
+        self.call("update_timestamp")
+        self.call("add", "Project Context", "- Engine: PixiJS")
+        self.assertEqual(self.text().count("Engine: PixiJS"), 1)
+
+
+class DedupeTest(MemoryTestCase):
+    def test_dedupe_keeps_the_first_of_each_entry(self):
+        self.assertEqual(self.call("dedupe"), 1)
+        self.assertEqual(self.text(), MEMORY.replace("- fixed ci.\n", ""))
+
+    def test_dedupe_keeps_the_blank_line_before_the_next_heading(self):
+        self.memory_file.write_text(MEMORY.replace("- Tech: TypeScript\n", "- Tech: TypeScript\n- tech: typescript\n"),
+                                    encoding="utf-8")
+        self.assertEqual(self.call("dedupe"), 2)
+        self.assertEqual(self.text(), MEMORY.replace("- fixed ci.\n", ""))
+
+    def test_dedupe_is_a_no_op_the_second_time(self):
+        self.call("dedupe")
+        deduped = self.text()
+        self.assertEqual(self.call("dedupe"), 0)
+        self.assertEqual(self.text(), deduped)
+
+    def test_dedupe_compares_whole_paragraphs(self):
+        self.memory_file.write_text(MEMORY + "\nSome notes\nover two lines.\n\nSome notes\n", encoding="utf-8")
+        self.assertEqual(self.call("dedupe"), 2)
+        self.assertEqual(self.text().count("over two lines."), 1)
+        self.assertIn("\nSome notes\n", self.text().split("over two lines.")[1])
+
+
+class ShardTest(MemoryTestCase):
+    def shard(self):
+        self.assertTrue(self.call("shard", True))
+
+    def test_shard_refuses_without_remove_combined(self):
+        self.assertFalse(self.call("shard"))
+        self.assertEqual(self.text(), MEMORY)
+        self.assertIsNone(self.manager().shards)
+
+    def test_shard_unshard_round_trip(self):
+        self.shard()
+        self.assertFalse(self.memory_file.exists())
+        manager = self.manager()
+        self.assertGreater(len(manager.shards.files), 1)
+        self.assertEqual(self.call("read"), MEMORY)
+        self.assertTrue(self.call("unshard"))
+        self.assertEqual(self.text(), MEMORY)
+        self.assertIsNone(self.manager().shards)
+        self.assertFalse(manager.shards.manifest_path.exists())
+
+    def test_sharded_reads_match_the_single_file(self):
+        expected = (self.call("list_sections"), self.call("search", "ci"),
+                    self.call("read_section", "Session (2025-01-15)"))
+        self.shard()
+        self.assertEqual((self.call("list_sections"), self.call("search", "ci"),
+                          self.call("read_section", "Session (2025-01-15)")), expected)
+
+    def test_sharded_writes_survive_unshard(self):
+        self.call("add", "Project Context", "- Engine: PixiJS")
+        self.call("dedupe")
+        expected = self.text()
+        self.memory_file.write_text(MEMORY, encoding="utf-8")
+        self.shard()
+        self.call("add", "Project Context", "- Engine: PixiJS")
+        self.call("add", "Project Context", "- Engine: PixiJS")
+        self.assertEqual(self.call("dedupe"), 1)
+        self.call("unshard")
+        self.assertEqual(self.text(), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Tests for scripts/_writeback.py
+
+Usage: python -m unittest discover -s scripts -p "test_*.py"  (or pytest scripts/test_writeback.py)
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+import _writeback  # noqa: E402
+from _writeback import WriteBatch, write_text_atomic  # noqa: E402
+
+
+class WriteBatchTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = Path(tmp.name)
+        self.a = self.root / "a.md"
+        self.b = self.root / "b.md"
+        self.new = self.root / "new.md"
+        self.a.write_text("a before\n", encoding="utf-8")
+        self.b.write_text("b before\n", encoding="utf-8")
+
+    def assertNoSiblings(self):
+        # Temp files and backups are dot-prefixed siblings
+        self.assertEqual(sorted(p.name for p in self.root.iterdir()),
+                         sorted(p.name for p in (self.a, self.b, self.new) if p.exists()))
+
+    def test_commit_swaps_every_file(self):
+        with WriteBatch(durable=False) as batch:
+            batch.stage(self.a, "a after\n")
+            batch.stage(self.new, b"new\n")
+            self.assertEqual(self.a.read_text(encoding="utf-8"), "a before\n")
+        self.assertEqual(self.a.read_text(encoding="utf-8"), "a after\n")
+        self.assertEqual(self.new.read_bytes(), b"new\n")
+        self.assertEqual(batch.committed, [self.a, self.new])
+        self.assertNoSiblings()
+
+    def test_failed_replace_rolls_back_swapped_files(self):
+        real_replace = os.replace
+        calls = []
+
+        def replace(src, dst):
+            calls.append(dst)
+            if len(calls) == 3:
+                raise OSError("disk full")
+            return real_replace(src, dst)
+
+        batch = WriteBatch(durable=False)
+        batch.stage(self.a, "a after\n")
+        batch.stage(self.new, "new\n")
+        batch.stage(self.b, "b after\n")
+        with mock.patch.object(_writeback.os, "replace", replace):
+            with self.assertRaises(OSError):
+                batch.commit()
+        self.assertEqual(self.a.read_text(encoding="utf-8"), "a before\n")
+        self.assertEqual(self.b.read_text(encoding="utf-8"), "b before\n")
+        self.assertFalse(self.new.exists())
+        self.assertNoSiblings()
+
+    def test_exception_in_block_discards_staged_files(self):
+        with self.assertRaises(RuntimeError):
+            with WriteBatch(durable=False) as batch:
+                batch.stage(self.a, "a after\n")
+                raise RuntimeError("stop")
+        self.assertEqual(self.a.read_text(encoding="utf-8"), "a before\n")
+        self.assertNoSiblings()
+
+    def test_restaging_a_path_keeps_only_the_last_content(self):
+        with WriteBatch(durable=False) as batch:
+            batch.stage(self.a, "first\n")
+            batch.stage(self.a, "second\n")
+        self.assertEqual(self.a.read_text(encoding="utf-8"), "second\n")
+        self.assertNoSiblings()
+
+    def test_write_text_atomic(self):
+        write_text_atomic(self.a, "replaced\n")
+        self.assertEqual(self.a.read_text(encoding="utf-8"), "replaced\n")
+        self.assertNoSiblings()
+
+
+if __name__ == "__main__":
+    unittest.main()